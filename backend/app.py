@@ -1,5 +1,7 @@
+import hmac
 from pathlib import Path
 from flask import Flask, request, jsonify, render_template
+from flask_compress import Compress
 import config
 
 from services import (
@@ -11,19 +13,54 @@ from services import (
     applications_bp,
     auth_bp,
     tailor_bp,
+    agent_runs_bp,
+    agent_stream_bp,
 )
+from services import fetch_cache
+from services.agent_runs import QueueFull, enqueue_run, ensure_agent_runs_table, start_workers
 from services.auth import ensure_password_column
-from services.agent import run_agent_for_user
+from services.jobs import ensure_ingest_schema, ensure_job_list_indexes
+from services.json_provider import OrjsonProvider
+from services.response_cache import ensure_resource_versions_table
+from graph.features import ensure_job_features_table
+from graph.match_store import ensure_match_tables
+from graph.near_dups import ensure_near_dup_tables
+from graph.rerank_cache import ensure_rerank_cache_table
+from graph.retrieval import ensure_search_index
+from services.agent import run_agent_for_user, run_agent_for_users
+from services.warmup import start_warm_up
 
 # --- app setup ---
 
 TEMPLATES_DIR = Path(__file__).parent.parent / 'frontend' / 'templates'
 app = Flask(__name__, template_folder=str(TEMPLATES_DIR))
 app.secret_key = config.SECRET_KEY
+app.json = OrjsonProvider(app)
+
+# compressed after the view (and after response_cache stored the plain body);
+# streamed responses such as /agent/stream are left alone so events aren't buffered
+app.config.update(
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    COMPRESS_MIN_SIZE=config.COMPRESS_MIN_SIZE,
+    COMPRESS_STREAMS=False,
+)
+Compress(app)
 
 # --- startup migrations ---
 
 ensure_password_column()
+ensure_job_features_table()
+ensure_match_tables()
+ensure_search_index()
+ensure_rerank_cache_table()
+ensure_agent_runs_table()
+ensure_ingest_schema()
+ensure_job_list_indexes()
+ensure_near_dup_tables()
+ensure_resource_versions_table()
+
+# upstream responses left on disk by earlier runs
+fetch_cache.prune()
 
 # --- register blueprints ---
 
@@ -35,6 +72,17 @@ app.register_blueprint(profiles_bp)
 app.register_blueprint(applications_bp)
 app.register_blueprint(auth_bp)
 app.register_blueprint(tailor_bp)
+app.register_blueprint(agent_runs_bp)
+app.register_blueprint(agent_stream_bp)
+
+# --- warm-up (graph, skill matcher, TF-IDF index, LLM client) ---
+
+if config.WARM_UP_ON_STARTUP:
+    start_warm_up()
+
+# --- async agent workers ---
+
+start_workers()
 
 # --- template routes ---
 
@@ -97,6 +145,28 @@ def run_agent():
             "message": "user_id is required"
         }), 400
 
+    # async mode: queue the run and let the client poll /agent/runs/<id>
+    if data.get("async"):
+        try:
+            run_id = enqueue_run(user_id)
+        except QueueFull as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 429
+        except LookupError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 404
+
+        return jsonify({
+            "status": "queued",
+            "user_id": user_id,
+            "run_id": run_id,
+            "status_url": f"/agent/runs/{run_id}"
+        }), 202
+
     result = run_agent_for_user(user_id)
 
     return jsonify({
@@ -105,6 +175,31 @@ def run_agent():
         **result
     })
 
+@app.route('/agent/batch', methods=['POST'])
+def run_agent_batch():
+    token = request.headers.get("X-Admin-Token", "")
+    if not config.ADMIN_TOKEN or not hmac.compare_digest(token, config.ADMIN_TOKEN):
+        return jsonify({
+            "status": "error",
+            "message": "admin token required"
+        }), 403
+
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get("user_ids")
+
+    if user_ids is not None and not isinstance(user_ids, list):
+        return jsonify({
+            "status": "error",
+            "message": "user_ids must be a list"
+        }), 400
+
+    result = run_agent_for_users(user_ids)
+
+    return jsonify({
+        "status": "success",
+        **result
+    })
+
 # --- run app ---
 
 if __name__ == '__main__':
@@ -0,0 +1,133 @@
+"""Serialization time and bytes on the wire for the large list responses.
+
+Compares Flask's default JSON provider (plus the isoformat-per-row pass
+/applications used to need) with OrjsonProvider, then the size of the body with
+brotli / gzip at the levels the app uses. Rows are synthetic but shaped like
+GET /jobs, GET /applications and /jobs/google/<user_id>, so no database is
+needed; their small vocabulary makes them compress better than real postings.
+
+    cd backend && python bench_json.py [--rows 200] [--repeat 50]
+"""
+import argparse
+import datetime
+import gzip
+import random
+import time
+import uuid
+
+import brotli
+from flask import Flask
+
+from services.json_provider import OrjsonProvider
+
+WORDS = ("python backend engineer remote data platform senior staff cloud api "
+         "kubernetes team product design build scale customers hybrid").split()
+
+
+def _text(n: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(n))
+
+
+def _ts(days_ago: float) -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_ago)
+
+
+def jobs_rows(n: int) -> list[dict]:
+    return [{
+        "id": uuid.uuid4(),
+        "external_id": str(random.randint(10**6, 10**7)),
+        "source": random.choice(["Remotive", "google_jobs"]),
+        "title": _text(4).title(),
+        "company": _text(2).title(),
+        "location": "Remote",
+        "location_raw": "Worldwide",
+        "is_remote": True,
+        "remote_type": "remote",
+        "category": "Software Development",
+        "url": f"https://example.com/jobs/{i}",
+        "salary_text": None,
+        "posted_at_text": "3 days ago",
+        "posted_at": _ts(3),
+        "ingested_at": _ts(i / 100),
+        "last_seen_at": _ts(0),
+    } for i in range(n)]
+
+
+def application_rows(n: int) -> list[dict]:
+    return [{
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "job_posting_id": uuid.uuid4(),
+        "status": "saved",
+        "draft_path": None,
+        "created_at": _ts(i / 10),
+        "title": _text(4).title(),
+        "company": _text(2).title(),
+        "location": "Remote",
+        "remote_type": "remote",
+    } for i in range(n)]
+
+
+def google_rows(n: int) -> list[dict]:
+    rows = []
+    for i in range(n):
+        raw = {
+            "title": _text(4),
+            "company_name": _text(2),
+            "description": _text(400),
+            "detected_extensions": {"posted_at": "3 days ago", "schedule_type": "Full-time"},
+            "job_highlights": [{"title": "Qualifications", "items": [_text(12) for _ in range(8)]}],
+            "apply_options": [{"title": "LinkedIn", "link": f"https://example.com/apply/{i}"}],
+        }
+        rows.append({"title": raw["title"], "company": raw["company_name"], "description": raw["description"], "raw_json": raw})
+    return rows
+
+
+def isoformat_rows(rows: list[dict]) -> list[dict]:
+    # what applications.py did per row before the orjson provider
+    return [{k: (v.isoformat() if hasattr(v, "isoformat") else v) for k, v in r.items()} for r in rows]
+
+
+def timed(fn, repeat: int) -> tuple[float, bytes]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return (time.perf_counter() - start) / repeat * 1000, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    default_app, orjson_app = Flask("default"), Flask("orjson")
+    orjson_app.json = OrjsonProvider(orjson_app)
+
+    payloads = {
+        "/jobs": {"status": "success", "jobs": jobs_rows(args.rows)},
+        "/applications": {"status": "success", "applications": application_rows(args.rows)},
+        "/jobs/google": {"status": "success", "jobs": google_rows(args.rows // 4)},
+    }
+
+    print(f"{'endpoint':<14}{'default ms':>12}{'orjson ms':>11}{'raw KB':>9}{'gzip KB':>9}{'br KB':>8}")
+    for name, payload in payloads.items():
+        key = next(k for k in payload if k != "status")
+
+        def before():
+            body = {**payload, key: isoformat_rows(payload[key])} if name == "/applications" else payload
+            return default_app.json.response(body).get_data()
+
+        def after():
+            return orjson_app.json.response(payload).get_data()
+
+        before_ms, _ = timed(before, args.repeat)
+        after_ms, body = timed(after, args.repeat)
+        gz = gzip.compress(body, compresslevel=6)
+        br = brotli.compress(body, quality=4)
+        print(f"{name:<14}{before_ms:>12.2f}{after_ms:>11.2f}{len(body) / 1024:>9.1f}{len(gz) / 1024:>9.1f}{len(br) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,72 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(__file__).parent.parent / ".env")
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+# idle connections older than this are pinged before being handed out
+DB_POOL_CHECK_SECONDS = float(os.getenv("DB_POOL_CHECK_SECONDS", "30"))
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SECRET_KEY = os.getenv("SUPABASE_SECRET_KEY")
 SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "application-drafts")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # gemini | fake
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+LLM_FAKE_LATENCY_SECONDS = float(os.getenv("LLM_FAKE_LATENCY_SECONDS", "0"))
+RERANK_CHUNK_SIZE = int(os.getenv("RERANK_CHUNK_SIZE", "5"))
+RERANK_CONCURRENCY = int(os.getenv("RERANK_CONCURRENCY", "4"))
+RERANK_DEADLINE_SECONDS = float(os.getenv("RERANK_DEADLINE_SECONDS", "20"))
+RERANK_CACHE_TTL_HOURS = float(os.getenv("RERANK_CACHE_TTL_HOURS", "168"))
 
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
 SERPAPI_BASE_URL = os.getenv("SERPAPI_BASE_URL", "https://serpapi.com/search.json")
+# upstream feed responses are cached on disk and revalidated once stale
+FETCH_CACHE_DIR = os.getenv("FETCH_CACHE_DIR", str(Path(__file__).parent / ".cache" / "http"))
+REMOTIVE_CACHE_TTL_SECONDS = float(os.getenv("REMOTIVE_CACHE_TTL_SECONDS", "3600"))
+SERPAPI_CACHE_TTL_SECONDS = float(os.getenv("SERPAPI_CACHE_TTL_SECONDS", "21600"))
+# entries unused for this long, or the oldest ones past the size budget, are deleted
+FETCH_CACHE_MAX_AGE_HOURS = float(os.getenv("FETCH_CACHE_MAX_AGE_HOURS", "168"))
+FETCH_CACHE_MAX_TOTAL_MB = float(os.getenv("FETCH_CACHE_MAX_TOTAL_MB", "500"))
+# jobs parsed / normalized / COPYed per step of an ingest — bounds its memory
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+# estimated Jaccard similarity at which a new posting merges into a same-company one; 0 = off
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+# per-run NDJSON snapshots of what ingest wrote ("none" turns them off)
+SNAPSHOT_SINK = os.getenv("SNAPSHOT_SINK", "ndjson")
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", str(Path(__file__).parent / ".cache" / "snapshots"))
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", "20"))
+SNAPSHOT_MAX_FILE_MB = float(os.getenv("SNAPSHOT_MAX_FILE_MB", "50"))
+SNAPSHOT_MAX_TOTAL_MB = float(os.getenv("SNAPSHOT_MAX_TOTAL_MB", "500"))
+# batches waiting for the snapshot writer before new ones are dropped
+SNAPSHOT_QUEUE_MAX = int(os.getenv("SNAPSHOT_QUEUE_MAX", "64"))
+# GET /jobs, /applications, /profiles/<id>: how stale another process's writes may look
+# (ETag versions are re-read from Postgres this often; 0 = no response caching)
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+# brotli / gzip for responses at least this big (SSE streams are never compressed)
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
 
-SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me-in-production")
\ No newline at end of file
+SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me-in-production")
+# job_matches rows inserted per user per run (best first); 0 = every scored job.
+# Rows past the cut are still updated if they already exist.
+PERSIST_TOP_N = int(os.getenv("PERSIST_TOP_N", "0"))
+# async /agent runs (Postgres-backed queue + in-process workers)
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", "2"))
+AGENT_QUEUE_MAX = int(os.getenv("AGENT_QUEUE_MAX", "100"))
+AGENT_QUEUE_POLL_SECONDS = float(os.getenv("AGENT_QUEUE_POLL_SECONDS", "2"))
+AGENT_RUN_STALE_MINUTES = float(os.getenv("AGENT_RUN_STALE_MINUTES", "30"))
+# a run whose worker keeps dying is failed after this many claims
+AGENT_RUN_MAX_ATTEMPTS = int(os.getenv("AGENT_RUN_MAX_ATTEMPTS", "3"))
+# GET /agent/stream gives up (with an "error" event) after this long
+AGENT_STREAM_MAX_SECONDS = float(os.getenv("AGENT_STREAM_MAX_SECONDS", "900"))
+# warm the agent pipeline in a background thread when the app starts
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "true").lower() not in ("0", "false", "no")
+# shared secret for admin-only endpoints (X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+SKILLS_TAXONOMY_PATH = os.getenv("SKILLS_TAXONOMY_PATH", str(Path(__file__).parent / "graph" / "data" / "skills.json"))
+AGENT_CANDIDATE_LIMIT = int(os.getenv("AGENT_CANDIDATE_LIMIT", "2000"))
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", str(Path(__file__).parent / ".cache" / "job_index.pkl"))
\ No newline at end of file
@@ -0,0 +1,35 @@
+import uuid
+
+import psycopg2
+import pytest
+
+import config
+
+
+@pytest.fixture
+def db_cursor():
+    """
+    A cursor inside a transaction that is rolled back afterwards, so tests can
+    write freely. Skips when DATABASE_URL isn't reachable.
+    """
+    try:
+        conn = psycopg2.connect(config.DATABASE_URL, connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"database not available: {e}")
+
+    cur = conn.cursor()
+    try:
+        yield cur
+    finally:
+        cur.close()
+        conn.rollback()
+        conn.close()
+
+
+@pytest.fixture
+def test_user(db_cursor) -> str:
+    db_cursor.execute(
+        "INSERT INTO users (id, email, first_name, created_at) VALUES (gen_random_uuid(), %s, 'Test', now()) RETURNING id",
+        (f"pytest-{uuid.uuid4().hex}@example.com",),
+    )
+    return str(db_cursor.fetchone()[0])
@@ -0,0 +1,241 @@
+"""Process-wide Postgres connection pool.
+
+Every module checks connections out with
+
+    with connection() as conn:
+        cur = conn.cursor()
+        ...
+        conn.commit()
+
+instead of opening (and TLS-handshaking) a new connection per call. The pool
+holds at most DB_POOL_MAX connections, pre-opens DB_POOL_MIN, blocks up to
+DB_POOL_TIMEOUT_SECONDS when exhausted, and pings connections that sat idle
+longer than DB_POOL_CHECK_SECONDS before handing them out. Uncommitted work
+is rolled back on return, so callers still commit explicitly.
+"""
+import io
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+import config
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, dsn: str, minconn: int, maxconn: int, timeout: float, check_after: float):
+        self.dsn = dsn
+        self.minconn = max(minconn, 0)
+        self.maxconn = max(maxconn, 1)
+        self.timeout = timeout
+        self.check_after = check_after
+
+        self._cond = threading.Condition()
+        self._idle: list[tuple[object, float]] = []  # (connection, last returned), LIFO
+        self._size = 0
+        self._in_use = 0
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn)
+
+    def fill(self):
+        """Open connections up to minconn."""
+        while True:
+            with self._cond:
+                if self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def _healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    self._size += 1
+                    conn, last_used = None, 0.0
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f"no database connection free after {self.timeout}s")
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            wait = time.perf_counter() - started
+            if waited:
+                self._waits += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+        if conn is not None and self._healthy(conn, last_used):
+            return conn
+
+        if conn is not None:
+            # stale / broken — replace it in the same slot
+            self._close(conn)
+            with self._cond:
+                self._discarded += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, discard: bool = False):
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed:
+                self._size -= 1
+                self._discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if discard:
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "min": self.minconn,
+                "max": self.maxconn,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_ms_total": round(self._wait_total * 1000, 3),
+                "wait_ms_avg": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+            }
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                config.DATABASE_URL,
+                minconn=config.DB_POOL_MIN,
+                maxconn=config.DB_POOL_MAX,
+                timeout=config.DB_POOL_TIMEOUT_SECONDS,
+                check_after=config.DB_POOL_CHECK_SECONDS,
+            )
+        return _pool
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_rows(cur, table: str, columns: list[str], rows):
+    """COPY rows (tuples of python values) into table using the text format."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
+
+@contextmanager
+def connection():
+    """Check a connection out of the pool for the duration of the block."""
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        # the connection itself may be gone — don't hand it out again
+        pool.putconn(conn, discard=True)
+        raise
+    except BaseException:
+        pool.putconn(conn)
+        raise
+    else:
+        pool.putconn(conn)
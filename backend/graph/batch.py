@@ -0,0 +1,179 @@
+"""Cohort matching: score many users against their candidate postings at once.
+
+Each user's candidates are retrieved exactly as load_jobs_node does (full-text
++ preference match, top AGENT_CANDIDATE_LIMIT). A chunk of users is then
+scored against the union of its candidates with one users × jobs similarity
+product and one users × jobs matched-skill product, each user keeping only
+its own candidates. Results go to job_matches through COPY + set-based merges.
+
+Batch runs are heuristic only (no LLM rerank). They write heuristic_score /
+heuristic_rationale and leave score / rationale alone where /agent stored a
+reranked value. They record the same fingerprint + watermark as /agent, so
+later per-user runs stay incremental.
+
+    python -m graph.batch                   # every user with a profile
+    python -m graph.batch --user <uuid> ...
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+import config
+from database import connection
+from graph.job_index import get_job_index
+from graph.match_store import (
+    clear_unscored_matches,
+    current_fingerprint,
+    ensure_match_tables,
+    save_run_state,
+    upsert_job_matches,
+)
+from graph.retrieval import candidate_clauses, fetch_jobs
+from graph.scoring import JobMatrix, score_batch
+from graph.skills import extract_skills, get_skill_matcher
+
+# users per similarity product — bounds the dense users × jobs arrays
+USER_CHUNK = 64
+
+
+def _load_profiles(cur, user_ids: list[str] | None) -> list[dict]:
+    query = """
+        SELECT u.id, p.resume_text, p.preferences_json
+        FROM users u
+        JOIN profiles p ON p.user_id = u.id
+    """
+    if user_ids is None:
+        cur.execute(query + " ORDER BY u.id")
+    else:
+        cur.execute(query + " WHERE u.id = ANY(%s::uuid[]) ORDER BY u.id", (list(user_ids),))
+
+    profiles = []
+    for r in cur.fetchall():
+        prefs = r[2] if isinstance(r[2], dict) else json.loads(r[2] or "{}")
+        profiles.append({
+            "user_id": str(r[0]),
+            "resume_text": r[1] or "",
+            "preferences": prefs,
+        })
+    return profiles
+
+
+def _candidate_ids(cur, resume_skills, preferences: dict) -> list[str]:
+    """The posting ids load_jobs_node would score for this user, best first."""
+    where, order, params = candidate_clauses(resume_skills, preferences)
+    cur.execute(f"""
+        SELECT jp.id::text
+        FROM job_postings jp
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT %(limit)s
+    """, {**params, "limit": config.AGENT_CANDIDATE_LIMIT})
+    return [r[0] for r in cur.fetchall()]
+
+
+def run_batch(user_ids: list[str] | None = None, chunk_size: int = USER_CHUNK) -> dict:
+    """
+    Score every user in user_ids (default: all users with a profile) against
+    their candidate postings and store the results. Returns counts + throughput.
+    """
+    started = time.perf_counter()
+    # may fit the index from the database — before this run holds a connection
+    index = get_job_index()
+    vocabulary = get_skill_matcher().vocabulary
+
+    with connection() as conn:
+        cur = conn.cursor()
+        try:
+            # same snapshot semantics as load_jobs_node
+            cur.execute("SELECT now()")
+            watermark = cur.fetchone()[0]
+
+            profiles = _load_profiles(cur, user_ids)
+            loaded = time.perf_counter()
+
+            written = 0
+            pairs = 0
+            postings = set()
+            for start in range(0, len(profiles), chunk_size):
+                chunk = profiles[start:start + chunk_size]
+                skill_sets = [extract_skills(p["resume_text"]) for p in chunk]
+                candidates = [_candidate_ids(cur, skill_sets[u], p["preferences"]) for u, p in enumerate(chunk)]
+
+                # the chunk's candidates together — one matrix, one similarity product
+                union = sorted({job_id for ids in candidates for job_id in ids})
+                jobs = fetch_jobs(conn, "jp.id = ANY(%(ids)s::uuid[])", "jp.id", {"ids": union}) if union else []
+                postings.update(union)
+
+                index.ensure(jobs)
+                job_ids = [job["id"] for job in jobs]
+                position = {str(job_id): i for i, job_id in enumerate(job_ids)}
+                matrix = JobMatrix(jobs, vocabulary)
+
+                similarities = index.similarity_matrix([p["resume_text"] for p in chunk], job_ids)
+                matched = matrix.cohort_matched_counts(skill_sets)
+
+                for u, profile in enumerate(chunk):
+                    rows = np.fromiter((position[i] for i in candidates[u] if i in position), dtype=np.int64)
+                    pairs += len(rows)
+                    scored = score_batch(
+                        matrix,
+                        skill_sets[u],
+                        profile["preferences"],
+                        similarities[u],
+                        matched_counts=matched[u],
+                        rows=rows,
+                    )
+                    for j in scored:
+                        j["heuristic_score"] = j["score"]
+                        j["heuristic_rationale"] = j["rationale"]
+                    # rank order, so PERSIST_TOP_N keeps the best ones
+                    scored.sort(key=lambda x: x["score"], reverse=True)
+
+                    written += upsert_job_matches(cur, profile["user_id"], scored, keep_reranked=True)
+                    # every candidate was scored: this is a full run for the user
+                    clear_unscored_matches(cur, profile["user_id"], [j["job_postings_id"] for j in scored])
+                    save_run_state(
+                        cur,
+                        profile["user_id"],
+                        current_fingerprint(profile["resume_text"], profile["preferences"]),
+                        watermark,
+                    )
+
+                conn.commit()
+
+        finally:
+            cur.close()
+
+    elapsed = time.perf_counter() - started
+    scoring = max(time.perf_counter() - loaded, 1e-9)
+
+    return {
+        "users": len(profiles),
+        # distinct postings scored for at least one user
+        "jobs": len(postings),
+        "matches_written": written,
+        "load_seconds": round(loaded - started, 3),
+        "score_seconds": round(scoring, 3),
+        "total_seconds": round(elapsed, 3),
+        "users_per_sec": round(len(profiles) / scoring, 2),
+        # (user, candidate) pairs scored per second
+        "jobs_per_sec": round(pairs / scoring, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a cohort of users against their candidate postings.")
+    parser.add_argument("--user", action="append", dest="users", metavar="USER_ID",
+                        help="user id to score (repeatable; default: every user with a profile)")
+    parser.add_argument("--chunk-size", type=int, default=USER_CHUNK)
+    args = parser.parse_args()
+
+    ensure_match_tables()
+    stats = run_batch(args.users, chunk_size=args.chunk_size)
+    print(
+        f"scored {stats['users']} users over {stats['jobs']} jobs in {stats['total_seconds']}s "
+        f"({stats['users_per_sec']} users/sec, {stats['jobs_per_sec']} jobs/sec), "
+        f"{stats['matches_written']} matches written"
+    )
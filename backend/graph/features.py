@@ -0,0 +1,144 @@
+"""Per-posting features the agent needs on every run, computed once at ingest.
+
+job_posting_features holds the cleaned title + description, the extracted
+skill set and the lowercased preference fields for each job_postings row, so
+load_jobs_node never has to pull raw HTML descriptions or re-run clean_text /
+extract_skills per run.
+
+Backfill existing rows from backend/ with:
+
+    python -m graph.features            # rows without features (or stale skills)
+    python -m graph.features --all      # recompute everything
+"""
+import argparse
+
+from psycopg2.extras import execute_values
+
+from database import connection
+from graph.skills import extract_skills, get_skill_matcher
+from graph.text import job_document
+
+
+def ensure_job_features_table():
+    """Run once at startup to create job_posting_features if it doesn't exist."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS job_posting_features (
+                    job_posting_id UUID PRIMARY KEY REFERENCES job_postings(id) ON DELETE CASCADE,
+                    cleaned_text   TEXT NOT NULL DEFAULT '',
+                    skills         TEXT[] NOT NULL DEFAULT '{}',
+                    location_norm  TEXT NOT NULL DEFAULT '',
+                    category_norm  TEXT NOT NULL DEFAULT '',
+                    skills_version TEXT,
+                    computed_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+            """)
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def compute_job_features(title: str | None, description: str | None,
+                         location: str | None, category: str | None) -> dict:
+    return {
+        "cleaned_text": job_document(title, description),
+        # skills come from the raw text, same as scoring always did
+        "skills": sorted(extract_skills(f"{title} {description}")),
+        "location_norm": (location or "").lower(),
+        "category_norm": (category or "").lower(),
+    }
+
+
+def refresh_job_features(cur, job_ids: list[str]) -> dict[str, dict]:
+    """
+    (Re)compute and store features for job_ids inside the caller's transaction.
+    Returns {job_posting_id: features}.
+    """
+    if not job_ids:
+        return {}
+
+    c = cur.connection.cursor()
+    c.execute("""
+        SELECT id, title, description,
+               COALESCE(location_normalized, location),
+               COALESCE(category, schedule_type)
+        FROM job_postings
+        WHERE id = ANY(%s::uuid[])
+    """, (list(job_ids),))
+
+    features = {
+        str(r[0]): compute_job_features(r[1], r[2], r[3], r[4])
+        for r in c.fetchall()
+    }
+
+    if features:
+        execute_values(c, """
+            INSERT INTO job_posting_features
+                (job_posting_id, cleaned_text, skills, location_norm, category_norm, skills_version, computed_at)
+            VALUES %s
+            ON CONFLICT (job_posting_id) DO UPDATE SET
+                cleaned_text = EXCLUDED.cleaned_text,
+                skills = EXCLUDED.skills,
+                location_norm = EXCLUDED.location_norm,
+                category_norm = EXCLUDED.category_norm,
+                skills_version = EXCLUDED.skills_version,
+                computed_at = now()
+        """, [
+            (jid, f["cleaned_text"], f["skills"], f["location_norm"], f["category_norm"],
+             get_skill_matcher().fingerprint)
+            for jid, f in features.items()
+        ], template="(%s, %s, %s, %s, %s, %s, now())")
+
+    c.close()
+    return features
+
+
+def backfill_job_features(recompute_all: bool = False, batch_size: int = 500) -> int:
+    """Compute features for postings that have none (or were built from an older skill taxonomy)."""
+    with connection() as conn:
+        cur = conn.cursor()
+        done = 0
+
+        try:
+            # with --all, anything computed before this point gets recomputed
+            cur.execute("SELECT now()")
+            started_at = cur.fetchone()[0] if recompute_all else None
+            conn.commit()
+
+            while True:
+                cur.execute("""
+                    SELECT jp.id FROM job_postings jp
+                    LEFT JOIN job_posting_features f ON f.job_posting_id = jp.id
+                    WHERE f.job_posting_id IS NULL
+                       OR f.skills_version IS DISTINCT FROM %s
+                       OR f.computed_at <= %s
+                    ORDER BY jp.id
+                    LIMIT %s
+                """, (get_skill_matcher().fingerprint, started_at, batch_size))
+
+                ids = [str(r[0]) for r in cur.fetchall()]
+                if not ids:
+                    break
+
+                refresh_job_features(cur, ids)
+                conn.commit()
+                done += len(ids)
+
+            return done
+
+        finally:
+            cur.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill job_posting_features.")
+    parser.add_argument("--all", action="store_true", help="recompute features for every posting")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    ensure_job_features_table()
+    count = backfill_job_features(recompute_all=args.all, batch_size=args.batch_size)
+    print(f"computed features for {count} postings")
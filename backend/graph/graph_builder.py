@@ -1,156 +1,146 @@
 import json
-import re
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-import psycopg2
 from langgraph.graph import StateGraph, END
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from google import genai
 
+from graph import rerank_cache
+from graph.job_index import get_job_index
+from graph.match_store import (
+    WATERMARK_OVERLAP,
+    clear_unscored_matches,
+    current_fingerprint,
+    is_unchanged,
+    load_reusable_matches,
+    load_run_state,
+    save_run_state,
+    upsert_job_matches,
+)
+from graph.retrieval import candidate_clauses, fetch_jobs
+from graph.scoring import JobMatrix, score_batch
+from graph.skills import extract_skills, get_skill_matcher
 from graph.state import AgentState
-from services.db import DATABASE_URL
+from services import llm
 import config
+from database import connection
 
 # ─── config ───────────────────────────────────────────────────────────────────
 
 top_n = 5
 num_ranked_jobs = 20
-GEMINI_MODEL = config.GEMINI_MODEL
 
+# ─── helpers ──────────────────────────────────────────────────────────────────
 
-def _gemini_client():
-    if not config.GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY is not set")
-    return genai.Client(api_key=config.GEMINI_API_KEY)
+def _load_job_texts(job_ids: list[str]) -> dict[str, str]:
+    if not job_ids:
+        return {}
 
-# ─── helpers ──────────────────────────────────────────────────────────────────
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT job_posting_id, cleaned_text
+            FROM job_posting_features
+            WHERE job_posting_id = ANY(%s::uuid[])
+        """, (list(job_ids),))
+        rows = cur.fetchall()
+        cur.close()
 
-def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
-
-
-def clean_text(text: str) -> str:
-    if not text:
-        return ""
-    text = re.sub(r"<[^>]+>", " ", text)
+    return {str(r[0]): r[1] for r in rows}
 
-    noise = [
-        "style", "color", "border", "box", "font", "width", "height",
-        "div", "li", "h1", "h2", "h3", "h4", "h5"
-    ]
-    for word in noise:
-        text = re.sub(rf"\b{word}\b", " ", text, flags=re.IGNORECASE)
-
-    text = re.sub(r"\s+", " ", text)
-    return text.lower().strip()
-
-
-TECH_SKILLS = {
-    "python", "javascript", "typescript", "java", "ruby", "go", "rust", "c\\+\\+", "c#",
-    "swift", "kotlin", "scala", "r",
-    "django", "flask", "fastapi", "react", "angular", "vue", "next\\.js", "rails",
-    "spring", "tensorflow", "pytorch", "keras", "scikit", "pandas", "numpy",
-    "docker", "kubernetes", "terraform", "ansible", "jenkins", "github actions",
-    "aws", "gcp", "azure", "linux", "nginx",
-    "sql", "postgresql", "mysql", "mongodb", "redis", "elasticsearch",
-    "spark", "kafka", "airflow", "dbt", "mlflow", "nlp", "llm", "rag",
-    "ml", "ai", "machine learning", "deep learning", "data engineering",
-    "devops", "security", "robotics", "ros", "ios", "android",
-    "agile", "scrum", "ci/cd", "rest", "graphql", "microservices", "tdd",
-}
-
-
-def extract_skills(text: str) -> set[str]:
-    found = set()
-    lowered = (text or "").lower()
-
-    for skill in TECH_SKILLS:
-        if re.search(rf"\b{skill}\b", lowered):
-            found.add(re.sub(r"\\", "", skill))
-
-    return found
-
-
-def compute_composite_score(
-    resume_text: str,
-    job_text: str,
-    resume_skills: set[str],
-    job_skills: set[str],
-    preferences: dict,
-    job: dict,
-) -> tuple[float, str]:
-
-    # TF-IDF (40 pts)
-    cleaned_resume = clean_text(resume_text)
-    cleaned_job = clean_text(job_text)
-
-    if cleaned_resume and cleaned_job:
-        tfidf = TfidfVectorizer(stop_words="english", ngram_range=(1, 2)) \
-            .fit_transform([cleaned_resume, cleaned_job])
-        cos_sim = cosine_similarity(tfidf[0], tfidf[1])[0][0]
-    else:
-        cos_sim = 0.0
-
-    tfidf_score = round(cos_sim * 40, 2)
-
-    # Skills (40 pts)
-    matched_skills = resume_skills & job_skills
-    missing_skills = job_skills - resume_skills
-
-    skill_score = round((len(matched_skills) / len(job_skills)) * 40, 2) if job_skills else 0.0
-
-    # Preferences (20 pts)
-    pref_score = 0
-    pref_notes = []
-
-    pref_location = (preferences.get("location") or "").lower()
-    job_location = (job.get("location") or "").lower()
-
-    if pref_location and job_location:
-        if pref_location in job_location or job_location in pref_location:
-            pref_score += 10
-            pref_notes.append(f"location match ({job_location})")
-        elif "remote" in job_location:
-            pref_score += 5
-            pref_notes.append("remote available")
-
-    wants_remote = preferences.get("remote")
-    if wants_remote is True and "remote" in job_location:
-        pref_score += 5
-        pref_notes.append("remote preferred ✓")
-    elif wants_remote is False and "remote" not in job_location:
-        pref_score += 5
-        pref_notes.append("on-site preferred ✓")
-
-    pref_type = (preferences.get("job_type") or "").lower()
-    job_cat = (job.get("category") or "").lower()
-
-    if pref_type and job_cat and (pref_type in job_cat or job_cat in pref_type):
-        pref_score += 5
-        pref_notes.append(f"type match ({job_cat})")
-
-    pref_score = min(pref_score, 20)
-
-    total = round(tfidf_score + skill_score + pref_score, 2)
-
-    strength = (
-        "strong match" if total >= 75 else
-        "moderate match" if total >= 50 else
-        "weak match"
-    )
 
-    rationale = [
-        f"[{strength} — {total}/100]",
-        f"matched skills: {', '.join(sorted(matched_skills))}" if matched_skills else "no direct skill overlap",
-    ]
+def _rerank_chunk(resume_excerpt: str, chunk: list[dict]) -> dict[str, dict]:
+    prompt = f"""
+Resume:
+{resume_excerpt}
 
-    if missing_skills:
-        rationale.append(f"missing: {', '.join(sorted(missing_skills)[:5])}")
+Jobs:
+{json.dumps(chunk)}
 
-    if pref_notes:
-        rationale.append(f"prefs: {'; '.join(pref_notes)}")
+Return JSON list of {{job_postings_id, score, rationale}}
+"""
+
+    data = json.loads(llm.generate(prompt, purpose="rerank"))
+    if not isinstance(data, list):
+        raise ValueError(f"rerank returned {type(data).__name__}, expected a list")
+
+    ids = {pj["id"] for pj in chunk}
+    results = {}
+    for d in data:
+        if not isinstance(d, dict) or d.get("job_postings_id") not in ids:
+            continue
+        # an item without a usable score is dropped, so its job keeps the heuristic score
+        if isinstance(d.get("score"), bool):
+            continue
+        try:
+            score = float(d.get("score"))
+        except (TypeError, ValueError):
+            continue
+        if not math.isfinite(score):
+            continue
+        results[d["job_postings_id"]] = {
+            "job_postings_id": d["job_postings_id"],
+            "score": score,
+            "rationale": str(d.get("rationale") or ""),
+        }
+    return results
+
+
+def _rerank_concurrently(resume_excerpt: str, prompt_jobs: list[dict]) -> tuple[dict[str, dict], dict]:
+    """
+    Send prompt_jobs to the LLM in chunks of RERANK_CHUNK_SIZE, at most
+    RERANK_CONCURRENCY at a time. A chunk that raises or runs longer than
+    RERANK_DEADLINE_SECONDS is dropped; the rest are merged.
+    Returns ({job_postings_id: llm result}, {"total", "failed", "errors"}).
+    """
+    size = max(config.RERANK_CHUNK_SIZE, 1)
+    chunks = [prompt_jobs[i:i + size] for i in range(0, len(prompt_jobs), size)]
+    deadline = config.RERANK_DEADLINE_SECONDS
+    workers = max(min(config.RERANK_CONCURRENCY, len(chunks)), 1)
+
+    started: dict[int, float] = {}
+
+    def run(i: int):
+        started[i] = time.monotonic()
+        return _rerank_chunk(resume_excerpt, chunks[i])
+
+    results: dict[str, dict] = {}
+    errors: list[str] = []
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rerank")
+    futures = {executor.submit(run, i): i for i in range(len(chunks))}
+    pending = set(futures)
+    # a stuck chunk holds its worker, so cap the whole fan-out as well
+    give_up = time.monotonic() + deadline * -(-len(chunks) // workers)
 
-    return total, " | ".join(rationale)
+    try:
+        while pending:
+            now = time.monotonic()
+            expiries = [started[futures[f]] + deadline for f in pending if futures[f] in started]
+            wake = min(expiries + [give_up])
+            done, pending = wait(pending, timeout=max(wake - now, 0), return_when=FIRST_COMPLETED)
+
+            for f in done:
+                try:
+                    results.update(f.result())
+                except Exception as e:
+                    errors.append(str(e))
+
+            now = time.monotonic()
+            expired = {
+                f for f in pending
+                if now >= give_up or (futures[f] in started and now >= started[futures[f]] + deadline)
+            }
+            for f in expired:
+                f.cancel()
+                errors.append(f"rerank chunk timed out after {deadline}s")
+            pending -= expired
+    finally:
+        # never block the request on a straggler — it finishes in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, {"total": len(chunks), "failed": len(errors), "errors": errors}
 
 
 # ─── nodes ────────────────────────────────────────────────────────────────────
@@ -161,20 +151,20 @@ def load_profile_node(state: AgentState) -> AgentState:
         state["error"] = "no user_id"
         return state
 
-    conn = get_db_connection()
-    cur = conn.cursor()
+    with connection() as conn:
+        cur = conn.cursor()
 
-    cur.execute("""
-        SELECT u.id, u.email, u.first_name, u.last_name,
-               p.resume_text, p.preferences_json
-        FROM users u
-        JOIN profiles p ON p.user_id = u.id
-        WHERE u.id = %s
-    """, (user_id,))
+        cur.execute("""
+            SELECT u.id, u.email, u.first_name, u.last_name,
+                   p.resume_text, p.preferences_json
+            FROM users u
+            JOIN profiles p ON p.user_id = u.id
+            WHERE u.id = %s
+        """, (user_id,))
 
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+        row = cur.fetchone()
+        run_state = load_run_state(cur, user_id) if row else None
+        cur.close()
 
     if not row:
         state["error"] = "user not found"
@@ -192,36 +182,48 @@ def load_profile_node(state: AgentState) -> AgentState:
     state["preferences"] = prefs
     state["resume_skills"] = list(extract_skills(state["resume_text"]))
 
+    # anything the heuristic score depends on — if it moved, rescore every posting
+    fingerprint = current_fingerprint(state["resume_text"], prefs)
+    state["profile_fingerprint"] = fingerprint
+    state["incremental_since"] = (
+        run_state["watermark"]
+        if run_state and run_state["profile_fingerprint"] == fingerprint
+        else None
+    )
+
     return state
 
 
 def load_jobs_node(state: AgentState) -> AgentState:
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT id, title, company,
-               COALESCE(location_normalized, location),
-               description,
-               COALESCE(apply_url, url),
-               COALESCE(category, schedule_type)
-        FROM job_postings
-    """)
-
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
-
-    jobs = [{
-        "id": r[0],
-        "title": r[1],
-        "company": r[2],
-        "location": r[3],
-        "description": r[4],
-        "url": r[5],
-        "category": r[6],
-    } for r in rows]
+    since = state.get("incremental_since")
+    cutoff = since - WATERMARK_OVERLAP if since else None
+
+    with connection() as conn:
+        cur = conn.cursor()
+
+        # the next incremental run picks up everything touched after this snapshot
+        cur.execute("SELECT now()")
+        state["watermark"] = cur.fetchone()[0]
+
+        # narrow the pool inside Postgres (full-text match on the resume's skills,
+        # ranked by ts_rank + preference boosts), then score only the top candidates
+        # incremental run: only postings whose content changed since the last one
+        # (re-ingesting an unchanged posting only bumps last_seen_at)
+        only = "COALESCE(jp.content_updated_at, jp.last_seen_at, jp.ingested_at) > %(cutoff)s" if cutoff else None
+        where, order, params = candidate_clauses(state.get("resume_skills", []), state.get("preferences", {}), only)
+        if cutoff:
+            params["cutoff"] = cutoff
+
+        jobs = fetch_jobs(conn, where, order, params, limit=config.AGENT_CANDIDATE_LIMIT)
+
+        reused_matches, reused_jobs = (
+            load_reusable_matches(cur, state["user_id"], cutoff) if cutoff else ([], [])
+        )
+
+        cur.close()
 
+    state["reused_matches"] = reused_matches
+    state["reused_jobs"] = reused_jobs
     state["candidate_jobs"] = jobs
     return state
 
@@ -232,22 +234,21 @@ def score_jobs_node(state: AgentState) -> AgentState:
     jobs = state.get("candidate_jobs", [])
     resume_skills = set(state.get("resume_skills", []))
 
-    scored = []
-
-    for job in jobs:
-        job_text = f"{job['title']} {job['description']}"
-        job_skills = extract_skills(job_text)
+    # one sparse product against the corpus index instead of a vectorizer fit per job
+    index = get_job_index()
+    index.ensure(jobs)
+    similarities = index.similarities(resume_text, [job["id"] for job in jobs])
 
-        score, rationale = compute_composite_score(
-            resume_text, job_text, resume_skills, job_skills, prefs, job
-        )
+    # skills + preferences for the whole candidate set in a few array ops
+    matrix = JobMatrix(jobs, get_skill_matcher().vocabulary)
+    scored = score_batch(matrix, resume_skills, prefs, similarities)
+    for j in scored:
+        j["heuristic_score"] = j["score"]
+        j["heuristic_rationale"] = j["rationale"]
 
-        if score > 0:
-            scored.append({
-                "job_postings_id": job["id"],
-                "score": score,
-                "rationale": rationale,
-            })
+    # merge in the stored scores of postings that didn't change since the last run
+    rescored = {job["id"] for job in jobs}
+    scored += [m for m in state.get("reused_matches", []) if m["job_postings_id"] not in rescored]
 
     scored.sort(key=lambda x: x["score"], reverse=True)
     state["scored_jobs"] = scored
@@ -256,52 +257,68 @@ def score_jobs_node(state: AgentState) -> AgentState:
 
 def llm_rerank_node(state: AgentState) -> AgentState:
     scored = state.get("scored_jobs", [])
-    jobs = {j["id"]: j for j in state.get("candidate_jobs", [])}
+    jobs = {j["id"]: j for j in state.get("reused_jobs", []) + state.get("candidate_jobs", [])}
 
     pool = scored[:num_ranked_jobs]
     if not pool:
         return state
 
-    prompt_jobs = []
+    # reused matches only carry metadata — fetch the text for the ones in the pool
+    texts = _load_job_texts([j["job_postings_id"] for j in pool if "text" not in jobs.get(j["job_postings_id"], {})])
+
+    prompt_jobs = {}
     for j in pool:
         job = jobs.get(j["job_postings_id"], {})
-        prompt_jobs.append({
+        prompt_jobs[j["job_postings_id"]] = {
             "id": j["job_postings_id"],
             "title": job.get("title"),
-            "description": (job.get("description") or "")[:800],
-        })
-
-    prompt = f"""
-Resume:
-{state.get("resume_text", "")[:1500]}
-
-Jobs:
-{json.dumps(prompt_jobs)}
-
-Return JSON list of {{job_postings_id, score, rationale}}
-"""
-
-    try:
-        res = _gemini_client().models.generate_content(
-            model=GEMINI_MODEL,
-            contents=prompt
-        )
-        data = json.loads(res.text)
-    except Exception as e:
-        state["error"] = str(e)
-        return state
-
-    llm_map = {d["job_postings_id"]: d for d in data}
-
+            "description": (job.get("text") or texts.get(j["job_postings_id"]) or "")[:800],
+        }
+
+    # reuse LLM scores for (resume, posting text, model) combinations we've already sent
+    resume_excerpt = state.get("resume_text", "")[:1500]
+    resume_key = rerank_cache.resume_hash(resume_excerpt)
+    job_keys = {jid: rerank_cache.job_hash(pj) for jid, pj in prompt_jobs.items()}
+
+    with connection() as conn:
+        cur = conn.cursor()
+        llm_map = rerank_cache.lookup(cur, resume_key, llm.model_name(), job_keys)
+        cur.close()
+
+    misses = [pj for jid, pj in prompt_jobs.items() if jid not in llm_map]
+    state["rerank_cache"] = {"hits": len(llm_map), "misses": len(misses)}
+
+    if misses:
+        # no pooled connection is held while the LLM calls are in flight
+        fresh, chunks = _rerank_concurrently(resume_excerpt, misses)
+        state["rerank_chunks"] = chunks
+
+        with connection() as conn:
+            cur = conn.cursor()
+            rerank_cache.store(cur, resume_key, llm.model_name(), [
+                (jid, job_keys[jid], d["score"], d.get("rationale"))
+                for jid, d in fresh.items()
+            ])
+            conn.commit()
+            cur.close()
+        llm_map.update(fresh)
+
+        # same as before chunking: the rerank only counts as failed if nothing came back
+        if chunks["failed"] == chunks["total"]:
+            state["error"] = chunks["errors"][0]
+
+    # jobs whose chunk failed or timed out keep their heuristic score
     reranked = []
     for j in pool:
         jid = j["job_postings_id"]
         if jid in llm_map:
             reranked.append({
-                "job_postings_id": jid,
+                **j,
                 "score": round(0.7 * llm_map[jid]["score"] + 0.3 * j["score"], 2),
                 "rationale": llm_map[jid]["rationale"],
             })
+        else:
+            reranked.append(j)
 
     reranked.sort(key=lambda x: x["score"], reverse=True)
     state["scored_jobs"] = reranked + scored[num_ranked_jobs:]
@@ -310,25 +327,22 @@ Return JSON list of {{job_postings_id, score, rationale}}
 
 
 def persist_results_node(state: AgentState) -> AgentState:
-    conn = get_db_connection()
-    cur = conn.cursor()
+    if not state.get("user_profile"):
+        return state
 
-    for j in state.get("scored_jobs", []):
-        cur.execute("""
-            INSERT INTO job_matches (user_id, job_posting_id, score, rationale)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (user_id, job_posting_id)
-            DO UPDATE SET score = EXCLUDED.score, rationale = EXCLUDED.rationale
-        """, (
-            state["user_id"],
-            j["job_postings_id"],
-            float(j["score"]),
-            j["rationale"],
-        ))
-
-    conn.commit()
-    cur.close()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor()
+
+        # reused rows whose stored values didn't move need no write
+        scored = state.get("scored_jobs", [])
+        upsert_job_matches(cur, state["user_id"], [j for j in scored if not is_unchanged(j)])
+        if not state.get("incremental_since"):
+            clear_unscored_matches(cur, state["user_id"], [j["job_postings_id"] for j in scored])
+
+        save_run_state(cur, state["user_id"], state["profile_fingerprint"], state.get("watermark"))
+
+        conn.commit()
+        cur.close()
 
     return state
 
@@ -346,23 +360,40 @@ def response_node(state: AgentState) -> AgentState:
 
 # ─── graph ────────────────────────────────────────────────────────────────────
 
+# node order — also what progress reporting counts against
+PIPELINE = [
+    ("load_profile", load_profile_node),
+    ("load_jobs", load_jobs_node),
+    ("score_jobs", score_jobs_node),
+    ("llm_rerank", llm_rerank_node),
+    ("persist", persist_results_node),
+    ("response", response_node),
+]
+
+
 def build_graph():
     g = StateGraph(AgentState)
 
-    g.add_node("load_profile", load_profile_node)
-    g.add_node("load_jobs", load_jobs_node)
-    g.add_node("score_jobs", score_jobs_node)
-    g.add_node("llm_rerank", llm_rerank_node)
-    g.add_node("persist", persist_results_node)
-    g.add_node("response", response_node)
+    for name, node in PIPELINE:
+        g.add_node(name, node)
+
+    g.set_entry_point(PIPELINE[0][0])
+
+    for (name, _), (next_name, _) in zip(PIPELINE, PIPELINE[1:]):
+        g.add_edge(name, next_name)
+    g.add_edge(PIPELINE[-1][0], END)
+
+    return g.compile()
+
 
-    g.set_entry_point("load_profile")
+_graph = None
+_graph_lock = threading.Lock()
 
-    g.add_edge("load_profile", "load_jobs")
-    g.add_edge("load_jobs", "score_jobs")
-    g.add_edge("score_jobs", "llm_rerank")
-    g.add_edge("llm_rerank", "persist")
-    g.add_edge("persist", "response")
-    g.add_edge("response", END)
 
-    return g.compile()
\ No newline at end of file
+def get_graph():
+    """The compiled graph, built once per process and shared by every run."""
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            _graph = build_graph()
+        return _graph
@@ -0,0 +1,303 @@
+"""Corpus-wide TF-IDF index over job_postings.
+
+The vectorizer is fitted once over every posting and the L2-normalised
+document matrix is kept in memory (and pickled to disk), so scoring a resume
+against all jobs is one sparse matrix-vector product instead of one
+vectorizer fit per job.
+
+Ingest adds postings with the vocabulary frozen. Once enough have piled up,
+the full refit runs on a background thread; the request that triggered it
+doesn't wait, and the incremental index keeps serving until the swap.
+"""
+import os
+import pickle
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import config
+from database import connection
+from graph.text import clean_text, job_document
+
+# postings added on top of a frozen vocabulary before we refit from scratch
+REFIT_RATIO = 0.2
+
+
+def _new_vectorizer() -> TfidfVectorizer:
+    return TfidfVectorizer(stop_words="english", ngram_range=(1, 2))
+
+
+class JobIndex:
+    def __init__(self):
+        self.vectorizer: TfidfVectorizer | None = None
+        self.matrix = sp.csr_matrix((0, 0))
+        self.ids: list[str] = []
+        self.rows: dict[str, int] = {}
+        self.fitted_size = 0
+        self.added_since_fit = 0
+        # changes on every full fit (idf moves for every posting)
+        self.generation: str | None = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("generation", None)
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def needs_refit(self) -> bool:
+        return self.vectorizer is None or self.added_since_fit > REFIT_RATIO * max(self.fitted_size, 1)
+
+    def fit(self, docs: list[tuple[str, str]]):
+        """Fit the vocabulary + idf on the whole corpus. docs are (job_id, cleaned text)."""
+        vectorizer = _new_vectorizer()
+        ids = [str(jid) for jid, _ in docs]
+
+        try:
+            matrix = vectorizer.fit_transform([text for _, text in docs]).tocsr()
+        except ValueError:
+            # empty corpus / only stop words — nothing to index yet
+            vectorizer, matrix, ids = None, sp.csr_matrix((0, 0)), []
+
+        if vectorizer is not None:
+            # only needed for introspection and bloats the pickle
+            vectorizer.stop_words_ = None
+
+        with self._lock:
+            self.vectorizer = vectorizer
+            self.matrix = matrix
+            self.ids = ids
+            self.rows = {jid: i for i, jid in enumerate(ids)}
+            self.fitted_size = len(ids)
+            self.added_since_fit = 0
+            self.generation = uuid.uuid4().hex
+
+    def upsert(self, docs: list[tuple[str, str]]):
+        """Add or replace postings using the current vocabulary (no refit)."""
+        if not docs or self.vectorizer is None:
+            return
+
+        new_ids = [str(jid) for jid, _ in docs]
+        vectorizer = self.vectorizer
+        new_rows = vectorizer.transform([text for _, text in docs]).tocsr()
+
+        with self._lock:
+            if self.vectorizer is not vectorizer:
+                # refitted meanwhile: these rows have the old vocabulary's columns
+                new_rows = self.vectorizer.transform([text for _, text in docs]).tocsr()
+
+            replaced = set(new_ids)
+            keep = [i for i, jid in enumerate(self.ids) if jid not in replaced]
+            ids = [self.ids[i] for i in keep] + new_ids
+            matrix = sp.vstack([self.matrix[keep], new_rows], format="csr")
+
+            self.added_since_fit += len(new_ids) - (len(self.ids) - len(keep))
+            self.matrix = matrix
+            self.ids = ids
+            self.rows = {jid: i for i, jid in enumerate(ids)}
+
+    def ensure(self, jobs: list[dict]) -> int:
+        """Index any of jobs (candidate_jobs dicts) that aren't in the index yet."""
+        missing = [
+            (job["id"], job["text"])
+            for job in jobs
+            if str(job["id"]) not in self.rows
+        ]
+        self.upsert(missing)
+        return len(missing)
+
+    def similarities(self, resume_text: str, job_ids: list[str]) -> np.ndarray:
+        """Cosine similarity of the resume to each job in job_ids (0.0 if unindexed)."""
+        return self.similarity_matrix([resume_text], job_ids)[0]
+
+    def similarity_matrix(self, resume_texts: list[str], job_ids: list[str]) -> np.ndarray:
+        """users × jobs cosine similarities in one sparse product (0.0 if unindexed)."""
+        sims = np.zeros((len(resume_texts), len(job_ids)))
+        cleaned = [clean_text(text) for text in resume_texts]
+
+        with self._lock:
+            vectorizer, matrix, rows = self.vectorizer, self.matrix, self.rows
+
+        if vectorizer is None or not any(cleaned) or not job_ids:
+            return sims
+
+        positions = [(i, rows.get(str(jid))) for i, jid in enumerate(job_ids)]
+        positions = [(i, r) for i, r in positions if r is not None]
+        if not positions:
+            return sims
+
+        out_idx = np.array([i for i, _ in positions])
+        row_idx = np.array([r for _, r in positions])
+
+        # rows are l2-normalised, so the dot product is the cosine similarity;
+        # an empty resume transforms to a zero row and scores 0 everywhere
+        resume_vecs = vectorizer.transform(cleaned)
+        sims[:, out_idx] = (resume_vecs @ matrix[row_idx].T).toarray()
+        return sims
+
+    def save(self, path: Path):
+        """Pickle a consistent snapshot to a private temp file, then rename it over path."""
+        with self._lock:
+            # fields are only ever replaced, never mutated, so a shallow copy is a snapshot
+            snapshot = JobIndex.__new__(JobIndex)
+            snapshot.__setstate__(self.__getstate__())
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path: Path) -> "JobIndex | None":
+        try:
+            with open(path, "rb") as f:
+                index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        return index if isinstance(index, cls) else None
+
+
+# ─── corpus loading ───────────────────────────────────────────────────────────
+
+def _fetch_documents(job_ids: list[str] | None = None) -> list[tuple[str, str]]:
+    with connection() as conn:
+        cur = conn.cursor()
+
+        # prefer the cleaned text from the feature store; only ship raw descriptions for rows without one
+        query = """
+            SELECT jp.id, f.cleaned_text,
+                   CASE WHEN f.cleaned_text IS NULL THEN jp.title END,
+                   CASE WHEN f.cleaned_text IS NULL THEN jp.description END
+            FROM job_postings jp
+            LEFT JOIN job_posting_features f ON f.job_posting_id = jp.id
+        """
+        if job_ids is None:
+            cur.execute(query)
+        else:
+            cur.execute(query + " WHERE jp.id = ANY(%s::uuid[])", (list(job_ids),))
+
+        rows = cur.fetchall()
+        cur.close()
+
+    return [
+        (str(r[0]), r[1] if r[1] is not None else job_document(r[2], r[3]))
+        for r in rows
+    ]
+
+
+def build_job_index() -> JobIndex:
+    index = JobIndex()
+    index.fit(_fetch_documents())
+    return index
+
+
+# ─── process-wide index ───────────────────────────────────────────────────────
+
+_index: JobIndex | None = None
+_index_lock = threading.Lock()
+# ids refreshed while a background refit runs (None: no refit running)
+_refit_pending: list[str] | None = None
+
+
+def _index_path() -> Path:
+    return Path(config.JOB_INDEX_PATH)
+
+
+def get_job_index() -> JobIndex:
+    """Return the process-wide index, loading it from disk or fitting it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = JobIndex.load(_index_path())
+            if _index is None or _index.vectorizer is None:
+                _index = build_job_index()
+                _index.save(_index_path())
+        return _index
+
+
+def rebuild_job_index() -> JobIndex:
+    global _index
+    index = build_job_index()
+    index.save(_index_path())
+    with _index_lock:
+        _index = index
+    return index
+
+
+def _refit():
+    global _index, _refit_pending
+    try:
+        index = build_job_index()
+        # postings ingested after build_job_index read the table go in on top
+        while True:
+            with _index_lock:
+                pending, _refit_pending = _refit_pending, []
+                if not pending:
+                    _index = index
+                    _refit_pending = None
+                    break
+            for start in range(0, len(pending), 500):
+                index.upsert(_fetch_documents(pending[start:start + 500]))
+        index.save(_index_path())
+    except Exception:
+        with _index_lock:
+            _refit_pending = None  # the next ingest past the threshold tries again
+
+
+def refit_in_background() -> bool:
+    """Start a full refit on a background thread unless one is running. Returns whether it started."""
+    global _refit_pending
+    with _index_lock:
+        if _refit_pending is not None:
+            return False
+        _refit_pending = []
+    threading.Thread(target=_refit, name="job-index-refit", daemon=True).start()
+    return True
+
+
+def refresh_job_index(job_ids: list[str], chunk_size: int = 500):
+    """
+    Incrementally index freshly ingested / updated postings, chunk_size
+    documents at a time, and save the index once at the end.
+    Once enough postings were added with a frozen vocabulary, a full refit
+    is started in the background (see refit_in_background).
+    Does nothing if no index has been built yet — the first agent run will fit it.
+    """
+    global _index
+    if not job_ids:
+        return
+
+    with _index_lock:
+        if _index is None:
+            _index = JobIndex.load(_index_path())
+        index = _index
+        if _refit_pending is not None:
+            _refit_pending.extend(job_ids)
+
+    if index is None:
+        return
+
+    for start in range(0, len(job_ids), chunk_size):
+        index.upsert(_fetch_documents(job_ids[start:start + chunk_size]))
+
+    with _index_lock:
+        # a refit that finished meanwhile has saved a newer index
+        current = index is _index
+    if current:
+        index.save(_index_path())
+
+    if index.needs_refit:
+        refit_in_background()
@@ -0,0 +1,244 @@
+"""job_matches bookkeeping for incremental agent runs.
+
+Each user gets a row in agent_run_state with a fingerprint of everything the
+heuristic score depends on (resume, preferences, skill taxonomy, scoring
+version, TF-IDF fit) and a watermark over the postings' content_updated_at
+(last_seen_at / ingested_at for rows older than content hashes). While the
+fingerprint is unchanged, only postings past the watermark are rescored;
+every other (user, posting) pair reuses the heuristic score already stored
+in job_matches. A full run clears the heuristic score of every row it didn't
+rewrite, so rows scored against an older profile are never reused.
+"""
+import datetime
+import hashlib
+import json
+
+import config
+from database import connection, copy_rows
+from graph.job_index import get_job_index
+from graph.scoring import SCORING_VERSION
+from graph.skills import get_skill_matcher
+
+# postings this close below the watermark are rescored anyway, in case an
+# ingest that started before our last run committed after it
+WATERMARK_OVERLAP = datetime.timedelta(minutes=10)
+
+
+def ensure_match_tables():
+    """Run once at startup to add the incremental-run columns and state table."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                ALTER TABLE job_matches
+                    ADD COLUMN IF NOT EXISTS heuristic_score DOUBLE PRECISION,
+                    ADD COLUMN IF NOT EXISTS heuristic_rationale TEXT;
+
+                CREATE TABLE IF NOT EXISTS agent_run_state (
+                    user_id             UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+                    profile_fingerprint TEXT NOT NULL,
+                    watermark           TIMESTAMPTZ,
+                    updated_at          TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+            """)
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def profile_fingerprint(resume_text: str, preferences: dict, *versions) -> str:
+    payload = json.dumps(
+        [resume_text or "", preferences or {}, [str(v) for v in versions]],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def current_fingerprint(resume_text: str, preferences: dict) -> str:
+    """Fingerprint against the scoring version, skill taxonomy and TF-IDF fit in use right now."""
+    return profile_fingerprint(
+        resume_text,
+        preferences,
+        SCORING_VERSION,
+        get_skill_matcher().fingerprint,
+        get_job_index().generation,
+    )
+
+
+def upsert_job_matches(
+    cur,
+    user_id: str,
+    matches: list[dict],
+    top_n: int | None = None,
+    keep_reranked: bool = False,
+) -> int:
+    """
+    Write one user's scored entries (in rank order) with a COPY into a temp
+    table and two set-based merges.
+
+    With top_n, only the first top_n entries are inserted; the rest only
+    update rows that already exist, so job_matches doesn't grow as
+    users × jobs. Rows whose stored values are identical are left alone.
+    With keep_reranked (heuristic-only writers such as graph.batch), rows
+    whose score / rationale came from the LLM rerank keep them and only get
+    the new heuristic_score / heuristic_rationale.
+    Returns the number of rows inserted or updated.
+    """
+    if not matches:
+        return 0
+
+    top_n = config.PERSIST_TOP_N if top_n is None else top_n
+
+    def final(table: str, column: str, new: str) -> str:
+        if not keep_reranked:
+            return new
+        # a row was reranked when its score / rationale differ from its own heuristic ones
+        return f"""CASE WHEN ({table}.score, {table}.rationale)
+                              IS NOT DISTINCT FROM ({table}.heuristic_score, {table}.heuristic_rationale)
+                         THEN {new} ELSE {table}.{column} END"""
+
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS job_matches_stage (
+            job_posting_id      UUID,
+            score               DOUBLE PRECISION,
+            rationale           TEXT,
+            heuristic_score     DOUBLE PRECISION,
+            heuristic_rationale TEXT,
+            keep                BOOLEAN
+        ) ON COMMIT DELETE ROWS;
+
+        TRUNCATE job_matches_stage;
+    """)
+
+    copy_rows(cur, "job_matches_stage", [
+        "job_posting_id", "score", "rationale", "heuristic_score", "heuristic_rationale", "keep",
+    ], (
+        (str(m["job_postings_id"]), float(m["score"]), m["rationale"],
+         float(m["heuristic_score"]), m["heuristic_rationale"], not top_n or i < top_n)
+        for i, m in enumerate(matches)
+    ))
+
+    score = final("job_matches", "score", "EXCLUDED.score")
+    rationale = final("job_matches", "rationale", "EXCLUDED.rationale")
+    cur.execute(f"""
+        INSERT INTO job_matches (user_id, job_posting_id, score, rationale, heuristic_score, heuristic_rationale)
+        SELECT %(user_id)s, job_posting_id, score, rationale, heuristic_score, heuristic_rationale
+        FROM job_matches_stage
+        WHERE keep
+        ON CONFLICT (user_id, job_posting_id) DO UPDATE SET
+            score = {score},
+            rationale = {rationale},
+            heuristic_score = EXCLUDED.heuristic_score,
+            heuristic_rationale = EXCLUDED.heuristic_rationale
+        WHERE (job_matches.score, job_matches.rationale, job_matches.heuristic_score, job_matches.heuristic_rationale)
+              IS DISTINCT FROM
+              ({score}, {rationale}, EXCLUDED.heuristic_score, EXCLUDED.heuristic_rationale)
+    """, {"user_id": user_id})
+    written = cur.rowcount
+
+    score = final("jm", "score", "s.score")
+    rationale = final("jm", "rationale", "s.rationale")
+    cur.execute(f"""
+        UPDATE job_matches jm SET
+            score = {score},
+            rationale = {rationale},
+            heuristic_score = s.heuristic_score,
+            heuristic_rationale = s.heuristic_rationale
+        FROM job_matches_stage s
+        WHERE NOT s.keep
+          AND jm.user_id = %(user_id)s
+          AND jm.job_posting_id = s.job_posting_id
+          AND (jm.score, jm.rationale, jm.heuristic_score, jm.heuristic_rationale)
+              IS DISTINCT FROM
+              ({score}, {rationale}, s.heuristic_score, s.heuristic_rationale)
+    """, {"user_id": user_id})
+
+    return written + cur.rowcount
+
+
+def load_run_state(cur, user_id: str) -> dict | None:
+    cur.execute("""
+        SELECT profile_fingerprint, watermark
+        FROM agent_run_state
+        WHERE user_id = %s
+    """, (user_id,))
+    row = cur.fetchone()
+    return {"profile_fingerprint": row[0], "watermark": row[1]} if row else None
+
+
+def save_run_state(cur, user_id: str, fingerprint: str, watermark):
+    cur.execute("""
+        INSERT INTO agent_run_state (user_id, profile_fingerprint, watermark, updated_at)
+        VALUES (%s, %s, %s, now())
+        ON CONFLICT (user_id) DO UPDATE SET
+            profile_fingerprint = EXCLUDED.profile_fingerprint,
+            watermark = EXCLUDED.watermark,
+            updated_at = now()
+    """, (user_id, fingerprint, watermark))
+
+
+def clear_unscored_matches(cur, user_id: str, scored_ids) -> int:
+    """
+    After a full run: rows for postings it didn't score (no longer candidates,
+    or scoring 0) lose their heuristic score, so later incremental runs don't
+    reuse what an older profile produced. score / rationale stay for display.
+    """
+    cur.execute("""
+        UPDATE job_matches SET heuristic_score = NULL, heuristic_rationale = NULL
+        WHERE user_id = %s
+          AND heuristic_score IS NOT NULL
+          AND NOT (job_posting_id = ANY(%s::uuid[]))
+    """, (user_id, [str(i) for i in scored_ids]))
+    return cur.rowcount
+
+
+def load_reusable_matches(cur, user_id: str, cutoff) -> tuple[list[dict], list[dict]]:
+    """
+    Stored matches for postings not touched since cutoff.
+    Returns (scored entries, lightweight job metadata for them).
+    """
+    cur.execute("""
+        SELECT jm.job_posting_id, jm.heuristic_score, jm.heuristic_rationale,
+               jm.score, jm.rationale,
+               jp.title, jp.company,
+               COALESCE(jp.location_normalized, jp.location),
+               COALESCE(jp.apply_url, jp.url),
+               COALESCE(jp.category, jp.schedule_type)
+        FROM job_matches jm
+        JOIN job_postings jp ON jp.id = jm.job_posting_id
+        WHERE jm.user_id = %s
+          AND jm.heuristic_score IS NOT NULL
+          AND COALESCE(jp.content_updated_at, jp.last_seen_at, jp.ingested_at, '-infinity') <= %s
+    """, (user_id, cutoff))
+
+    matches, jobs = [], []
+    for r in cur.fetchall():
+        matches.append({
+            "job_postings_id": r[0],
+            "score": r[1],
+            "rationale": r[2],
+            "heuristic_score": r[1],
+            "heuristic_rationale": r[2],
+            "stored_score": r[3],
+            "stored_rationale": r[4],
+            "reused": True,
+        })
+        jobs.append({
+            "id": r[0],
+            "title": r[5],
+            "company": r[6],
+            "location": r[7],
+            "url": r[8],
+            "category": r[9],
+        })
+
+    return matches, jobs
+
+
+def is_unchanged(match: dict) -> bool:
+    """A reused match whose stored row already holds exactly this score + rationale."""
+    return bool(match.get("reused")) and (
+        match["score"] == match["stored_score"] and match["rationale"] == match["stored_rationale"]
+    )
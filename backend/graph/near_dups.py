@@ -0,0 +1,225 @@
+"""MinHash / LSH index for near-duplicate postings.
+
+canonical_key only catches reposts whose normalized title, company and
+location are identical. Here every posting also gets a MinHash signature of
+the 5-word shingles of its title + description (tags stripped), cut into LSH bands.
+Each band is hashed together with the normalized company and location into
+one bucket id, stored in job_posting_lsh, so the same role at another office
+of a multi-location employer is never a candidate (remote postings share one
+location, "remote"). Ingest looks up a new job's buckets through that
+table's primary key, so finding candidates costs a few index probes however
+big the corpus is. A candidate counts as a duplicate when the estimated
+Jaccard similarity of the two signatures is at least NEAR_DUP_THRESHOLD.
+Jobs without a company, or too short to shingle, are never near-matched.
+
+16 bands × 8 rows put the LSH curve's midpoint around 0.7, so a pair at 0.8
+similarity becomes a candidate ~95% of the time. Much lower thresholds would
+need more, shorter bands.
+
+Ingest keeps the index in step for the postings it writes. Backfill
+postings that predate it (or were indexed before buckets carried the
+location) from backend/ with:
+
+    python -m graph.near_dups
+"""
+import argparse
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from database import connection, copy_rows
+
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_WORDS = 5
+# fewer distinct shingles than this and the estimate is too noisy to merge on
+MIN_SHINGLES = 10
+
+_rng = np.random.default_rng(20240601)
+# multiply-shift hashing: (a * x + b) mod 2^64, top 32 bits; a odd
+_PERM_A = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+
+def ensure_near_dup_tables():
+    """Run once at startup to create the signature and LSH bucket tables."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS job_posting_minhash (
+                    job_posting_id UUID PRIMARY KEY REFERENCES job_postings(id) ON DELETE CASCADE,
+                    company_key    TEXT NOT NULL,
+                    signature      BIGINT[] NOT NULL,
+                    computed_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+
+                -- NULL: indexed with company-only buckets, left for the backfill
+                ALTER TABLE job_posting_minhash ADD COLUMN IF NOT EXISTS location_key TEXT;
+
+                CREATE TABLE IF NOT EXISTS job_posting_lsh (
+                    bucket         BIGINT NOT NULL,
+                    job_posting_id UUID NOT NULL REFERENCES job_postings(id) ON DELETE CASCADE,
+                    PRIMARY KEY (bucket, job_posting_id)
+                );
+
+                CREATE INDEX IF NOT EXISTS job_posting_lsh_posting_idx
+                    ON job_posting_lsh (job_posting_id);
+
+                -- estimated Jaccard similarity: share of positions where two signatures agree
+                CREATE OR REPLACE FUNCTION minhash_similarity(a BIGINT[], b BIGINT[])
+                RETURNS FLOAT8 LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                    SELECT count(*) FILTER (WHERE x = y)::float8 / greatest(cardinality(a), 1)
+                    FROM unnest(a, b) AS u(x, y)
+                $$;
+            """)
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def company_key(company: str | None) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (company or "").lower()).strip()
+
+
+def location_key(location: str | None, remote_type: str | None) -> str:
+    """Where the job is: "remote" for any remote posting, else the normalized location."""
+    if remote_type == "remote":
+        return "remote"
+    return company_key(location)
+
+
+def minhash_signature(title: str | None, description: str | None) -> np.ndarray | None:
+    """NUM_PERM minimum hashes over the posting's word shingles, or None if it's too short."""
+    # tags stripped, not the full clean_text pass — this runs for every ingested job
+    text = re.sub(r"<[^>]+>", " ", f"{title or ''} {description or ''}").lower()
+    words = re.findall(r"[a-z0-9]+", text)
+    if len(words) < SHINGLE_WORDS:
+        return None
+
+    word_hashes = {w: zlib.crc32(w.encode("utf-8")) for w in set(words)}
+    ids = np.fromiter((word_hashes[w] for w in words), dtype=np.uint64, count=len(words))
+
+    with np.errstate(over="ignore"):
+        # polynomial hash over each window of SHINGLE_WORDS words, folded to 32 bits
+        n = len(words) - SHINGLE_WORDS + 1
+        shingles = np.zeros(n, dtype=np.uint64)
+        for k in range(SHINGLE_WORDS):
+            shingles = shingles * _SHINGLE_BASE + ids[k:k + n]
+        shingles = np.unique(shingles >> np.uint64(32))
+        if len(shingles) < MIN_SHINGLES:
+            return None
+
+        # in place: one (NUM_PERM, shingles) buffer instead of three
+        hashed = np.multiply.outer(_PERM_A, shingles)
+        hashed += _PERM_B[:, None]
+        hashed >>= np.uint64(32)
+    return hashed.min(axis=1)
+
+
+def lsh_buckets(company: str, location: str, signature: np.ndarray) -> list[int]:
+    """One bucket id per band; company and location are part of the key, so other employers or offices never collide."""
+    buckets = []
+    for band in range(LSH_BANDS):
+        h = hashlib.blake2b(digest_size=8)
+        h.update(f"{company}|{location}|{band}|".encode("utf-8"))
+        h.update(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+        buckets.append(int.from_bytes(h.digest(), "big", signed=True))
+    return buckets
+
+
+def pg_array(values) -> str | None:
+    """Array literal for COPY text format."""
+    if values is None:
+        return None
+    return "{" + ",".join(str(int(v)) for v in values) + "}"
+
+
+def near_dup_keys(title: str | None, company: str | None, location: str | None,
+                  remote_type: str | None, description: str | None) -> tuple:
+    """(company_key, location_key, signature, buckets); the last two are None when the posting can't be matched."""
+    key, where = company_key(company), location_key(location, remote_type)
+    signature = minhash_signature(title, description) if key else None
+    if signature is None:
+        return key, where, None, None
+    return key, where, signature, lsh_buckets(key, where, signature)
+
+
+def refresh_near_dup_index(cur, job_ids: list[str]) -> int:
+    """
+    (Re)compute signatures and buckets for job_ids from what's stored in
+    job_postings, inside the caller's transaction. Returns rows indexed.
+    """
+    if not job_ids:
+        return 0
+
+    c = cur.connection.cursor()
+    c.execute("""
+        SELECT id::text, title, company, location_normalized, remote_type, description
+        FROM job_postings
+        WHERE id = ANY(%s::uuid[])
+    """, (list(job_ids),))
+
+    signatures, buckets = [], []
+    for posting_id, title, company, location, remote_type, description in c.fetchall():
+        key, where, signature, bands = near_dup_keys(title, company, location, remote_type, description)
+        if signature is None:
+            continue
+        signatures.append((posting_id, key, where, pg_array(signature)))
+        buckets.extend((bucket, posting_id) for bucket in bands)
+
+    c.execute("DELETE FROM job_posting_lsh WHERE job_posting_id = ANY(%s::uuid[])", (list(job_ids),))
+    c.execute("DELETE FROM job_posting_minhash WHERE job_posting_id = ANY(%s::uuid[])", (list(job_ids),))
+    copy_rows(c, "job_posting_minhash", ["job_posting_id", "company_key", "location_key", "signature"], signatures)
+    copy_rows(c, "job_posting_lsh", ["bucket", "job_posting_id"], buckets)
+
+    c.close()
+    return len(signatures)
+
+
+def backfill_near_dup_index(batch_size: int = 500) -> int:
+    """Index postings that have never been through refresh_near_dup_index, or predate location keys."""
+    with connection() as conn:
+        cur = conn.cursor()
+        done = 0
+
+        try:
+            last_id = "00000000-0000-0000-0000-000000000000"
+            while True:
+                # postings too short to sign stay unindexed, so walk by id
+                cur.execute("""
+                    SELECT jp.id::text FROM job_postings jp
+                    LEFT JOIN job_posting_minhash m ON m.job_posting_id = jp.id
+                    WHERE (m.job_posting_id IS NULL OR m.location_key IS NULL)
+                      AND jp.id > %s::uuid
+                    ORDER BY jp.id
+                    LIMIT %s
+                """, (last_id, batch_size))
+
+                ids = [r[0] for r in cur.fetchall()]
+                if not ids:
+                    break
+
+                done += refresh_near_dup_index(cur, ids)
+                conn.commit()
+                last_id = ids[-1]
+
+            return done
+
+        finally:
+            cur.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the near-duplicate (MinHash / LSH) index.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    ensure_near_dup_tables()
+    count = backfill_near_dup_index(batch_size=args.batch_size)
+    print(f"indexed {count} postings")
@@ -0,0 +1,100 @@
+"""Postgres cache for Gemini rerank results.
+
+Keyed by (resume hash, job_posting_id, job content hash, model): a cached LLM
+score is reused until the resume, the posting text sent to the model, or
+GEMINI_MODEL changes, or the entry is older than RERANK_CACHE_TTL_HOURS.
+Only the raw LLM score is stored — the blend with the heuristic score is
+recomputed on every run.
+"""
+import hashlib
+import json
+
+from psycopg2.extras import execute_values
+
+import config
+from database import connection
+
+
+def ensure_rerank_cache_table():
+    """Run once at startup to create the rerank cache."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS llm_rerank_cache (
+                    resume_hash    TEXT NOT NULL,
+                    job_posting_id UUID NOT NULL REFERENCES job_postings(id) ON DELETE CASCADE,
+                    job_hash       TEXT NOT NULL,
+                    model          TEXT NOT NULL,
+                    score          DOUBLE PRECISION NOT NULL,
+                    rationale      TEXT,
+                    created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    PRIMARY KEY (resume_hash, job_posting_id, job_hash, model)
+                );
+
+                CREATE INDEX IF NOT EXISTS llm_rerank_cache_created_at_idx
+                    ON llm_rerank_cache (created_at);
+            """)
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def resume_hash(resume_text: str) -> str:
+    return hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+
+
+def job_hash(prompt_job: dict) -> str:
+    """Hash of exactly what the model sees for a job (title + truncated description)."""
+    payload = json.dumps(
+        {"title": prompt_job.get("title"), "description": prompt_job.get("description")},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(cur, resume_key: str, model: str, job_keys: dict[str, str]) -> dict[str, dict]:
+    """
+    Fresh cache entries for job_keys ({job_posting_id: job hash}).
+    Returns {job_posting_id: {"score", "rationale"}}.
+    """
+    if not job_keys:
+        return {}
+
+    cur.execute("""
+        SELECT c.job_posting_id, c.score, c.rationale
+        FROM llm_rerank_cache c
+        JOIN unnest(%s::uuid[], %s::text[]) AS k(job_posting_id, job_hash)
+          ON k.job_posting_id = c.job_posting_id AND k.job_hash = c.job_hash
+        WHERE c.resume_hash = %s
+          AND c.model = %s
+          AND c.created_at > now() - %s * interval '1 hour'
+    """, (list(job_keys), list(job_keys.values()), resume_key, model, config.RERANK_CACHE_TTL_HOURS))
+
+    return {str(r[0]): {"score": r[1], "rationale": r[2]} for r in cur.fetchall()}
+
+
+def store(cur, resume_key: str, model: str, entries: list[tuple[str, str, float, str]]):
+    """Save (job_posting_id, job hash, score, rationale) rows and drop expired ones."""
+    if not entries:
+        return
+
+    execute_values(cur, """
+        INSERT INTO llm_rerank_cache (resume_hash, job_posting_id, job_hash, model, score, rationale)
+        VALUES %s
+        ON CONFLICT (resume_hash, job_posting_id, job_hash, model) DO UPDATE SET
+            score = EXCLUDED.score,
+            rationale = EXCLUDED.rationale,
+            created_at = now()
+    """, [(resume_key, jid, jhash, model, float(score), rationale) for jid, jhash, score, rationale in entries])
+
+    evict_expired(cur)
+
+
+def evict_expired(cur) -> int:
+    cur.execute("""
+        DELETE FROM llm_rerank_cache
+        WHERE created_at <= now() - %s * interval '1 hour'
+    """, (config.RERANK_CACHE_TTL_HOURS,))
+    return cur.rowcount
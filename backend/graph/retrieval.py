@@ -0,0 +1,252 @@
+"""Candidate retrieval inside Postgres, ahead of the composite scorer.
+
+job_postings gets a generated, GIN-indexed tsvector over title + description.
+load_jobs_node matches it against every surface form of the resume's skills,
+ranks by ts_rank plus small location / category / remote boosts and keeps the
+top AGENT_CANDIDATE_LIMIT rows, so the Python side of /agent is
+bounded by the candidate limit instead of the table size.
+
+Each way of matching is its own branch (tsquery, skills feature, location,
+job type) with its own ORDER BY / LIMIT, and the branches are combined with
+UNION before the full rank is applied. One OR across all of them would stop
+the planner from using the GIN indexes, and every run would scan the table.
+
+Skills whose names lean on a symbol the text search parser drops ("c++" and
+"c#" both become c) are matched against the skills the feature store
+extracted at ingest instead. Postings that only match a preference are
+candidates too, since preferences alone are worth up to 20 points.
+"""
+import re
+
+import config
+from database import connection
+from graph.features import refresh_job_features
+from graph.skills import get_skill_matcher
+
+# weights mirror the scorer: preferences are worth half of the skill points
+LOCATION_BOOST = 0.25
+REMOTE_BOOST = 0.125
+CATEGORY_BOOST = 0.125
+# a symbol-bearing skill found by the feature store, in place of its ts_rank
+SYMBOL_SKILL_BOOST = 0.25
+
+# symbols only between letters / digits ("node.js", "ci/cd", "scikit-learn"):
+# the parser keeps those as one token; leading / trailing ones it drops
+_TSQUERY_SAFE = re.compile(r"[a-z0-9]+(?:[ ./-][a-z0-9]+)*")
+
+
+def ensure_search_index():
+    """Run once at startup to add the full-text search column + GIN index."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                ALTER TABLE job_postings
+                    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+                    GENERATED ALWAYS AS (
+                        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+                        setweight(to_tsvector('english', COALESCE(description, '')), 'B')
+                    ) STORED;
+
+                CREATE INDEX IF NOT EXISTS job_postings_search_tsv_idx
+                    ON job_postings USING GIN (search_tsv);
+
+                CREATE INDEX IF NOT EXISTS job_posting_features_skills_idx
+                    ON job_posting_features USING GIN (skills);
+            """)
+            conn.commit()
+
+            # location / job type branches still work without pg_trgm, just unindexed
+            try:
+                cur.execute("""
+                    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+                    CREATE INDEX IF NOT EXISTS job_postings_location_trgm_idx
+                        ON job_postings USING gin (LOWER(COALESCE(location_normalized, location, '')) gin_trgm_ops);
+
+                    CREATE INDEX IF NOT EXISTS job_postings_job_type_trgm_idx
+                        ON job_postings USING gin (LOWER(COALESCE(category, schedule_type, '')) gin_trgm_ops);
+                """)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+            cur.close()
+    except Exception:
+        pass
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _tsquery_safe(term: str) -> bool:
+    return bool(_TSQUERY_SAFE.fullmatch(term))
+
+
+def skill_search_query(resume_skills) -> str:
+    """websearch_to_tsquery text: any surface form of any resume skill the parser keeps intact."""
+    terms = get_skill_matcher().terms
+    phrases = sorted({
+        term
+        for skill in resume_skills
+        for term in terms.get(skill, [skill])
+        if _tsquery_safe(term)
+    })
+    return " OR ".join(f'"{p}"' for p in phrases)
+
+
+def symbol_skills(resume_skills) -> list[str]:
+    """Resume skills with a surface form the tsquery can't express ("c++", "c#", ".net")."""
+    terms = get_skill_matcher().terms
+    return sorted({
+        skill
+        for skill in resume_skills
+        if not all(_tsquery_safe(term) for term in terms.get(skill, [skill]))
+    })
+
+
+def candidate_clauses(resume_skills, preferences: dict, only: str | None = None,
+                      limit: int | None = None) -> tuple[str, str, dict]:
+    """
+    Build the WHERE and ORDER BY for candidate retrieval over job_postings jp.
+    only (SQL over jp) narrows every branch, e.g. to recently changed
+    postings; each branch keeps at most limit rows (AGENT_CANDIDATE_LIMIT).
+    Returns (where_sql, order_sql, named params).
+    """
+    params: dict = {"branch_limit": limit or config.AGENT_CANDIDATE_LIMIT}
+    # (FROM, WHERE, ORDER BY) per branch
+    branches: list[tuple[str, str, str]] = []
+    boosts: list[tuple[str, float]] = []
+
+    rank = "0"
+    tsquery = skill_search_query(resume_skills)
+    if tsquery:
+        params["tsquery"] = tsquery
+        rank = "ts_rank(jp.search_tsv, websearch_to_tsquery('english', %(tsquery)s), 32)"
+        branches.append((
+            "job_postings jp",
+            "jp.search_tsv @@ websearch_to_tsquery('english', %(tsquery)s)",
+            f"{rank} DESC, jp.ingested_at DESC NULLS LAST",
+        ))
+
+    symbols = symbol_skills(resume_skills)
+    if symbols:
+        params["symbol_skills"] = symbols
+        branches.append((
+            "job_posting_features f JOIN job_postings jp ON jp.id = f.job_posting_id",
+            "f.skills && %(symbol_skills)s::text[]",
+            "jp.ingested_at DESC NULLS LAST",
+        ))
+        expr = """EXISTS (
+            SELECT 1 FROM job_posting_features f
+            WHERE f.job_posting_id = jp.id AND f.skills && %(symbol_skills)s::text[]
+        )"""
+        boosts.append((expr, SYMBOL_SKILL_BOOST))
+
+    # same "either contains the other" rule as the scorer
+    location = (preferences.get("location") or "").strip().lower()
+    if location:
+        params["location"] = location
+        params["location_like"] = f"%{_escape_like(location)}%"
+        contains = "LOWER(COALESCE(jp.location_normalized, jp.location, '')) LIKE %(location_like)s"
+        contained = """(COALESCE(jp.location_normalized, jp.location, '') <> ''
+                AND POSITION(LOWER(COALESCE(jp.location_normalized, jp.location)) IN %(location)s) > 0)"""
+        branches += [("job_postings jp", w, "jp.ingested_at DESC NULLS LAST") for w in (contains, contained)]
+        boosts.append((f"({contains} OR {contained})", LOCATION_BOOST))
+
+    job_type = (preferences.get("job_type") or "").strip().lower()
+    if job_type:
+        params["job_type"] = job_type
+        params["job_type_like"] = f"%{_escape_like(job_type)}%"
+        contains = "LOWER(COALESCE(jp.category, jp.schedule_type, '')) LIKE %(job_type_like)s"
+        contained = """(COALESCE(jp.category, jp.schedule_type, '') <> ''
+                AND POSITION(LOWER(COALESCE(jp.category, jp.schedule_type)) IN %(job_type)s) > 0)"""
+        branches += [("job_postings jp", w, "jp.ingested_at DESC NULLS LAST") for w in (contains, contained)]
+        boosts.append((f"({contains} OR {contained})", CATEGORY_BOOST))
+
+    # remote is too broad to filter on (Remotive is all remote) — rank only
+    remote = preferences.get("remote")
+    if remote is True:
+        boosts.append(("jp.remote_type = 'remote'", REMOTE_BOOST))
+    elif remote is False:
+        boosts.append(("jp.remote_type IS DISTINCT FROM 'remote'", REMOTE_BOOST))
+
+    # a posting is a candidate if it matches a skill or a preference: one with no
+    # skill overlap can still earn the 20 preference points plus its TF-IDF share.
+    # Each branch contributes at most branch_limit rows, ranked on what it
+    # matched; the full rank then picks the final limit from their union.
+    if branches:
+        union = "\n            UNION\n            ".join(
+            f"(SELECT jp.id FROM {source} WHERE ({match}) AND ({only or 'TRUE'}) "
+            f"ORDER BY {order} LIMIT %(branch_limit)s)"
+            for source, match, order in branches
+        )
+        where = f"jp.id IN (\n            {union}\n        )"
+    else:
+        where = only or "TRUE"
+    order = " + ".join(
+        [rank] + [f"(CASE WHEN {expr} THEN {weight} ELSE 0 END)" for expr, weight in boosts]
+    )
+
+    return where, f"{order} DESC, jp.ingested_at DESC NULLS LAST", params
+
+
+def fetch_jobs(
+    conn,
+    where: str = "TRUE",
+    order: str = "jp.ingested_at DESC NULLS LAST",
+    params: dict | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """
+    Load postings over job_postings jp as candidate_jobs dicts, with their
+    precomputed features. Postings ingested before the feature store existed
+    get their features computed (and committed) on the way.
+    """
+    cur = conn.cursor()
+
+    # cleaned text / skills / normalized prefs were computed at ingest time
+    cur.execute(f"""
+        SELECT jp.id, jp.title, jp.company,
+               COALESCE(jp.location_normalized, jp.location),
+               COALESCE(jp.apply_url, jp.url),
+               COALESCE(jp.category, jp.schedule_type),
+               f.cleaned_text, f.skills, f.location_norm, f.category_norm
+        FROM job_postings jp
+        LEFT JOIN job_posting_features f ON f.job_posting_id = jp.id
+        WHERE {where}
+        ORDER BY {order}
+        {"LIMIT %(limit)s" if limit else ""}
+    """, {**(params or {}), "limit": limit})
+
+    rows = cur.fetchall()
+
+    missing = [str(r[0]) for r in rows if r[6] is None]
+    computed = refresh_job_features(cur, missing)
+    if computed:
+        conn.commit()
+
+    cur.close()
+
+    jobs = []
+    for r in rows:
+        features = computed.get(str(r[0])) or {
+            "cleaned_text": r[6],
+            "skills": r[7],
+            "location_norm": r[8],
+            "category_norm": r[9],
+        }
+        jobs.append({
+            "id": r[0],
+            "title": r[1],
+            "company": r[2],
+            "location": r[3],
+            "url": r[4],
+            "category": r[5],
+            "text": features["cleaned_text"] or "",
+            "skills": features["skills"] or [],
+            "location_norm": features["location_norm"] or "",
+            "category_norm": features["category_norm"] or "",
+        })
+
+    return jobs
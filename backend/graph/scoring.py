@@ -0,0 +1,286 @@
+"""Composite job score: TF-IDF (40) + skills (40) + preferences (20).
+
+compute_composite_score scores one job. score_batch computes the same numbers
+for a whole candidate set with a handful of NumPy operations: skills are
+bitmasks over an indexed vocabulary and location/category are integer-coded
+columns. Both must agree exactly — test_scoring.py checks this.
+"""
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from graph.text import clean_text
+
+# bump whenever the formula changes so incremental runs rescore everything
+SCORING_VERSION = 1
+
+# set bits per byte value, for popcounts over packed skill masks
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _location_notes(pref_location: str, job_location: str, wants_remote) -> tuple[int, list[str]]:
+    score = 0
+    notes = []
+
+    if pref_location and job_location:
+        if pref_location in job_location or job_location in pref_location:
+            score += 10
+            notes.append(f"location match ({job_location})")
+        elif "remote" in job_location:
+            score += 5
+            notes.append("remote available")
+
+    if wants_remote is True and "remote" in job_location:
+        score += 5
+        notes.append("remote preferred ✓")
+    elif wants_remote is False and "remote" not in job_location:
+        score += 5
+        notes.append("on-site preferred ✓")
+
+    return score, notes
+
+
+def _category_notes(pref_type: str, job_cat: str) -> tuple[int, list[str]]:
+    if pref_type and job_cat and (pref_type in job_cat or job_cat in pref_type):
+        return 5, [f"type match ({job_cat})"]
+    return 0, []
+
+
+def format_rationale(total: float, matched_skills, missing_skills, pref_notes: list[str]) -> str:
+    strength = (
+        "strong match" if total >= 75 else
+        "moderate match" if total >= 50 else
+        "weak match"
+    )
+
+    rationale = [
+        f"[{strength} — {total}/100]",
+        f"matched skills: {', '.join(sorted(matched_skills))}" if matched_skills else "no direct skill overlap",
+    ]
+
+    if missing_skills:
+        rationale.append(f"missing: {', '.join(sorted(missing_skills)[:5])}")
+
+    if pref_notes:
+        rationale.append(f"prefs: {'; '.join(pref_notes)}")
+
+    return " | ".join(rationale)
+
+
+def compute_composite_score(
+    resume_text: str,
+    job_text: str,
+    resume_skills: set[str],
+    job_skills: set[str],
+    preferences: dict,
+    job: dict,
+    cos_sim: float | None = None,
+) -> tuple[float, str]:
+
+    # TF-IDF (40 pts) — cos_sim comes from the corpus index when scoring a run;
+    # without it we fall back to a one-off pairwise fit
+    if cos_sim is None:
+        cleaned_resume = clean_text(resume_text)
+        cleaned_job = clean_text(job_text)
+
+        if cleaned_resume and cleaned_job:
+            tfidf = TfidfVectorizer(stop_words="english", ngram_range=(1, 2)) \
+                .fit_transform([cleaned_resume, cleaned_job])
+            cos_sim = cosine_similarity(tfidf[0], tfidf[1])[0][0]
+        else:
+            cos_sim = 0.0
+
+    tfidf_score = round(cos_sim * 40, 2)
+
+    # Skills (40 pts)
+    matched_skills = resume_skills & job_skills
+    missing_skills = job_skills - resume_skills
+
+    skill_score = round((len(matched_skills) / len(job_skills)) * 40, 2) if job_skills else 0.0
+
+    # Preferences (20 pts)
+    pref_location = (preferences.get("location") or "").lower()
+    job_location = (job.get("location") or "").lower()
+    loc_score, loc_notes = _location_notes(pref_location, job_location, preferences.get("remote"))
+
+    pref_type = (preferences.get("job_type") or "").lower()
+    job_cat = (job.get("category") or "").lower()
+    cat_score, cat_notes = _category_notes(pref_type, job_cat)
+
+    pref_score = min(loc_score + cat_score, 20)
+    pref_notes = loc_notes + cat_notes
+
+    total = round(tfidf_score + skill_score + pref_score, 2)
+
+    return total, format_rationale(total, matched_skills, missing_skills, pref_notes)
+
+
+# ─── batch scoring ────────────────────────────────────────────────────────────
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """Vectorised round(x, 2) that agrees with Python's round() bit for bit."""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+
+    # np.round rounds x * 100 in binary, Python rounds the exact decimal value.
+    # They can only disagree when x * 100 lands on (or next to) a .5 tie.
+    scaled = values * 100
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties:
+        rounded[i] = round(float(values[i]), 2)
+
+    return rounded
+
+
+def _factorize(values: list[str]) -> tuple[np.ndarray, list[str]]:
+    uniques: dict[str, int] = {}
+    codes = np.fromiter(
+        (uniques.setdefault(v, len(uniques)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(uniques)
+
+
+class JobMatrix:
+    """
+    Columnar view of candidate_jobs for batch scoring: packed skill bitmasks
+    over an indexed vocabulary plus integer-coded location / category columns.
+    Jobs need "id", "skills", "location_norm" and "category_norm".
+    """
+
+    def __init__(self, jobs: list[dict], vocabulary: list[str] | None = None):
+        self.jobs = jobs
+        self.ids = [job["id"] for job in jobs]
+
+        vocab = list(vocabulary or [])
+        seen = set(vocab)
+        for job in jobs:
+            for skill in job["skills"]:
+                if skill not in seen:
+                    seen.add(skill)
+                    vocab.append(skill)
+
+        self.vocabulary = vocab
+        self.skill_index = {s: i for i, s in enumerate(vocab)}
+
+        n = len(jobs)
+        width = max(len(vocab), 1)
+        skill_sets = [set(job["skills"]) for job in jobs]
+        self.skill_counts = np.fromiter((len(s) for s in skill_sets), dtype=np.int64, count=n)
+
+        # (job, skill) pairs only — never a dense jobs × vocabulary array
+        rows = np.repeat(np.arange(n), self.skill_counts)
+        cols = np.fromiter(
+            (self.skill_index[s] for skills in skill_sets for s in skills),
+            dtype=np.int64,
+            count=len(rows),
+        )
+        # same layout as np.packbits(axis=1): bit 7 of byte 0 is skill 0
+        self.skill_bits = np.zeros((n, (width + 7) // 8), dtype=np.uint8)
+        np.bitwise_or.at(self.skill_bits, (rows, cols >> 3), (0x80 >> (cols & 7)).astype(np.uint8))
+        # same membership as a sparse jobs × vocabulary matrix, for cohort products
+        self.skill_matrix = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(n, width),
+        )
+
+        self.location_codes, self.locations = _factorize([job["location_norm"] or "" for job in jobs])
+        self.category_codes, self.categories = _factorize([job["category_norm"] or "" for job in jobs])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def skill_mask(self, skills) -> np.ndarray:
+        bits = np.zeros(max(len(self.vocabulary), 1), dtype=bool)
+        idx = [self.skill_index[s] for s in skills if s in self.skill_index]
+        bits[idx] = True
+        return np.packbits(bits)
+
+    def matched_counts(self, resume_skills) -> np.ndarray:
+        overlap = self.skill_bits & self.skill_mask(resume_skills)
+        return _POPCOUNT[overlap].sum(axis=1, dtype=np.int64)
+
+    def cohort_matched_counts(self, skill_sets: list) -> np.ndarray:
+        """users × jobs matched-skill counts for many resumes in one sparse product."""
+        rows, cols = [], []
+        for u, skills in enumerate(skill_sets):
+            for s in set(skills):
+                if s in self.skill_index:
+                    rows.append(u)
+                    cols.append(self.skill_index[s])
+
+        users = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(len(skill_sets), self.skill_matrix.shape[1]),
+        )
+        return (users @ self.skill_matrix.T).toarray()
+
+
+def score_batch(
+    matrix: JobMatrix,
+    resume_skills: set[str],
+    preferences: dict,
+    similarities: np.ndarray,
+    matched_counts: np.ndarray | None = None,
+    rows: np.ndarray | None = None,
+) -> list[dict]:
+    """
+    compute_composite_score for every job in matrix at once (or only the
+    matrix rows in rows). Returns the scored entries (score > 0) in matrix
+    order, unsorted.
+    """
+    if not len(matrix):
+        return []
+
+    if matched_counts is None:
+        matched_counts = matrix.matched_counts(resume_skills)
+
+    # TF-IDF (40 pts)
+    tfidf_score = round2(np.asarray(similarities, dtype=np.float64) * 40)
+
+    # Skills (40 pts)
+    counts = matrix.skill_counts
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skill_score = np.where(counts > 0, round2((matched_counts / counts) * 40), 0.0)
+
+    # Preferences (20 pts) — evaluated once per distinct location / category
+    pref_location = (preferences.get("location") or "").lower()
+    wants_remote = preferences.get("remote")
+    pref_type = (preferences.get("job_type") or "").lower()
+
+    loc = [_location_notes(pref_location, v, wants_remote) for v in matrix.locations]
+    cat = [_category_notes(pref_type, v) for v in matrix.categories]
+
+    loc_scores = np.array([s for s, _ in loc], dtype=np.int64)
+    cat_scores = np.array([s for s, _ in cat], dtype=np.int64)
+    pref_score = np.minimum(loc_scores[matrix.location_codes] + cat_scores[matrix.category_codes], 20)
+
+    totals = round2(tfidf_score + skill_score + pref_score)
+
+    keep = totals > 0
+    if rows is not None:
+        selected = np.zeros(len(matrix), dtype=bool)
+        selected[rows] = True
+        keep &= selected
+
+    scored = []
+    for i in np.flatnonzero(keep):
+        job = matrix.jobs[i]
+        total = float(totals[i])
+        job_skills = set(job["skills"])
+        matched = job_skills & resume_skills
+
+        scored.append({
+            "job_postings_id": job["id"],
+            "score": total,
+            "rationale": format_rationale(
+                total,
+                matched,
+                job_skills - matched,
+                loc[matrix.location_codes[i]][1] + cat[matrix.category_codes[i]][1],
+            ),
+        })
+
+    return scored
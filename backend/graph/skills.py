@@ -0,0 +1,93 @@
+"""Single-pass skill extraction.
+
+The skill taxonomy (canonical skill → synonyms) lives in data/skills.json and
+is compiled once into one regex shaped like a trie, so finding every skill in
+a text is one scan whose cost doesn't grow with the size of the dictionary.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+
+import config
+
+# bump whenever the matching rules change, so stored skills count as stale
+MATCHER_VERSION = 2
+
+
+def load_skill_taxonomy(path: str | Path) -> dict[str, list[str]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _trie_regex(terms: list[str]) -> str:
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def walk(node: dict) -> str:
+        branches = []
+        for ch in sorted(k for k in node if k):
+            # any run of whitespace counts as the single space in a multi-word term
+            token = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(token + walk(node[ch]))
+
+        if not branches:
+            return ""
+
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # greedy optional group → the longest term wins, shorter ones on backtrack
+        return f"(?:{body})?" if "" in node else body
+
+    return walk(trie)
+
+
+class SkillMatcher:
+    def __init__(self, taxonomy: dict[str, list[str]]):
+        self.canonical: dict[str, str] = {}
+        self.terms: dict[str, list[str]] = {}
+        for skill, synonyms in taxonomy.items():
+            for term in [skill, *synonyms]:
+                term = " ".join(term.lower().split())
+                if term and self.canonical.setdefault(term, skill) == skill:
+                    self.terms.setdefault(skill, []).append(term)
+
+        self.vocabulary = sorted(taxonomy)
+        self.fingerprint = hashlib.md5(
+            json.dumps([MATCHER_VERSION, taxonomy], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+        # the lookahead makes matches overlap, so "django rest framework" yields
+        # both django and rest, like the old one-regex-per-skill loop did.
+        # A term never starts right after a dot: "node.js" is one token, not
+        # "node" + a bare "js" (which is a javascript synonym)
+        self._pattern = re.compile(
+            rf"(?<![\w.])(?=({_trie_regex(list(self.canonical))})(?!\w))"
+        )
+
+    def extract(self, text: str) -> set[str]:
+        lowered = (text or "").lower()
+        return {
+            self.canonical[" ".join(m.group(1).split())]
+            for m in self._pattern.finditer(lowered)
+        }
+
+
+_matcher: SkillMatcher | None = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = SkillMatcher(load_skill_taxonomy(config.SKILLS_TAXONOMY_PATH))
+        return _matcher
+
+
+def extract_skills(text: str) -> set[str]:
+    return get_skill_matcher().extract(text)
@@ -1,4 +1,5 @@
-from typing import TypedDict, List, Dict, Any
+from datetime import datetime
+from typing import TypedDict, List, Dict, Any, Optional
 
 
 class ScoredJob(TypedDict):
@@ -17,13 +18,22 @@ class AgentState(TypedDict, total=False):
     preferences: Dict[str, Any]
     resume_skills: List[str]
 
+    # incremental runs
+    profile_fingerprint: str
+    incremental_since: Optional[datetime]
+    watermark: Optional[datetime]
+
     # jobs
     candidate_jobs: List[Dict[str, Any]]
+    reused_jobs: List[Dict[str, Any]]
     jobs_list: List[Dict[str, Any]]
 
     # scoring
     scored_jobs: List[ScoredJob]
+    reused_matches: List[ScoredJob]
     matched_jobs: List[ScoredJob]
+    rerank_cache: Dict[str, int]
+    rerank_chunks: Dict[str, Any]
 
     # output
     final_response: str
@@ -0,0 +1,22 @@
+import re
+
+
+def clean_text(text: str) -> str:
+    if not text:
+        return ""
+    text = re.sub(r"<[^>]+>", " ", text)
+
+    noise = [
+        "style", "color", "border", "box", "font", "width", "height",
+        "div", "li", "h1", "h2", "h3", "h4", "h5"
+    ]
+    for word in noise:
+        text = re.sub(rf"\b{word}\b", " ", text, flags=re.IGNORECASE)
+
+    text = re.sub(r"\s+", " ", text)
+    return text.lower().strip()
+
+
+def job_document(title: str | None, description: str | None) -> str:
+    """Cleaned text a posting is indexed and scored on (title + description)."""
+    return clean_text(f"{title or ''} {description or ''}")
@@ -8,6 +8,8 @@ from .profiles import profiles_bp
 from .applications import applications_bp
 from .auth import auth_bp
 from .tailor import tailor_bp
+from .agent_runs import agent_runs_bp
+from .agent_stream import agent_stream_bp
 
 __all__ = [
     "health_bp",
@@ -18,4 +20,6 @@ __all__ = [
     "applications_bp",
     "auth_bp",
     "tailor_bp",
+    "agent_runs_bp",
+    "agent_stream_bp",
 ]
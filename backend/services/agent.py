@@ -1,20 +1,13 @@
 # services/agent.py
-from graph.graph_builder import build_graph
-# from graph.graph_builder import MOCK_JOBS, USE_MOCK  # import for fallback in mock mode
-
-def run_agent_for_user(user_id: str) -> dict:
-    """
-    Runs the agent for a given user_id and returns a normalized dict.
-    Ensures that jobs_list, matched_jobs, and user_profile are always populated.
-    """
-    graph = build_graph()
-    state = graph.invoke({"user_id": user_id})
+import time
 
-    scored_jobs = state.get("matched_jobs", state.get("scored_jobs", []))
-    response = state.get("final_response", "no strong matches found")
+from graph.batch import run_batch
+from graph.graph_builder import get_graph
+# from graph.graph_builder import MOCK_JOBS, USE_MOCK  # import for fallback in mock mode
 
-    # build a lookup so we can enrich each match with title/company/location
-    job_lookup = {j["id"]: j for j in state.get("candidate_jobs", [])}
+def matched_jobs_for(state: dict, scored_jobs: list[dict]) -> list[dict]:
+    """Enrich scored entries with title/company/location from the run's job lists."""
+    job_lookup = {j["id"]: j for j in state.get("reused_jobs", []) + state.get("candidate_jobs", [])}
 
     matched_jobs = []
     for j in scored_jobs:
@@ -28,8 +21,50 @@ def run_agent_for_user(user_id: str) -> dict:
             "score":    j.get("score", 0),
             "rationale": j.get("rationale", ""),
         })
+    return matched_jobs
+
+
+def run_agent_for_user(user_id: str, on_progress=None) -> dict:
+    """
+    Runs the agent for a given user_id and returns a normalized dict.
+    Ensures that jobs_list, matched_jobs, and user_profile are always populated.
+    on_progress(node_name, state), if given, is called after every graph node.
+    """
+    started = time.perf_counter()
+    graph = get_graph()
+    setup = time.perf_counter()
+
+    state = {"user_id": user_id}
+    for chunk in graph.stream(state, stream_mode="updates"):
+        for node, update in chunk.items():
+            state.update(update or {})
+            if on_progress:
+                on_progress(node, state)
+    finished = time.perf_counter()
+
+    scored_jobs = state.get("matched_jobs", state.get("scored_jobs", []))
+    response = state.get("final_response", "no strong matches found")
+    matched_jobs = matched_jobs_for(state, scored_jobs)
 
     return {
         "matched_jobs": matched_jobs,
         "response": response,
-    }
\ No newline at end of file
+        "incremental": state.get("incremental_since") is not None,
+        "rescored_jobs": len(state.get("candidate_jobs", [])),
+        "reused_matches": len(state.get("reused_matches", [])),
+        "rerank_cache": state.get("rerank_cache", {"hits": 0, "misses": 0}),
+        "rerank_chunks": state.get("rerank_chunks", {"total": 0, "failed": 0, "errors": []}),
+        "timings": {
+            "graph_setup_ms": round((setup - started) * 1000, 3),
+            "run_ms": round((finished - setup) * 1000, 3),
+        },
+    }
+
+
+def run_agent_for_users(user_ids: list[str] | None = None) -> dict:
+    """
+    Batch mode for a whole cohort: heuristic scores for every user in user_ids
+    (default: everyone with a profile) against every posting, written straight
+    to job_matches. Returns counts and users/sec + jobs/sec.
+    """
+    return run_batch(user_ids)
@@ -0,0 +1,351 @@
+"""Asynchronous agent runs.
+
+POST /agent with {"async": true} inserts a row into agent_runs and returns
+its id straight away. A bounded pool of worker threads claims queued rows
+with SELECT ... FOR UPDATE SKIP LOCKED (so several app processes can share
+the table), runs the pipeline, and writes progress after every graph node
+plus the final result. GET /agent/runs/<id> reports all of it.
+
+Postgres is the only dependency: runs survive restarts, and runs whose
+worker died mid-way are re-queued once their heartbeat (updated_at, bumped
+with every progress write) goes stale. Workers sweep for those while they
+poll. A run that has already been claimed AGENT_RUN_MAX_ATTEMPTS times is
+marked failed instead, so a run that keeps killing its worker isn't retried
+forever. Workers only hold a database connection while they read or write
+agent_runs, never for the whole run — the pipeline checks out its own.
+
+progress also keeps one event per finished graph node (with the current
+top matches after scoring and after the rerank); GET /agent/stream replays
+those as Server-Sent Events.
+"""
+import datetime
+import json
+import threading
+import time
+
+import psycopg2
+from flask import Blueprint, jsonify
+from psycopg2.extras import Json, RealDictCursor
+
+import config
+from database import connection
+
+agent_runs_bp = Blueprint("agent_runs", __name__)
+
+# how often workers look for runs whose worker died
+STALE_SWEEP_SECONDS = 60
+
+# nodes after which the ranking has changed and is worth recording
+RANKING_NODES = {"score_jobs", "llm_rerank"}
+# matches kept in those progress events (GET /agent/stream's top_k is capped at this)
+PROGRESS_TOP_K = 25
+
+
+class QueueFull(Exception):
+    pass
+
+
+def ensure_agent_runs_table():
+    """Run once at startup to create the agent run queue."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS agent_runs (
+                    id          UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                    user_id     UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    status      TEXT NOT NULL DEFAULT 'queued',
+                    progress    JSONB NOT NULL DEFAULT '{}'::jsonb,
+                    result      JSONB,
+                    error       TEXT,
+                    attempts    INT NOT NULL DEFAULT 0,
+                    created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    started_at  TIMESTAMPTZ,
+                    finished_at TIMESTAMPTZ,
+                    updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+
+                CREATE INDEX IF NOT EXISTS agent_runs_queued_idx
+                    ON agent_runs (created_at) WHERE status = 'queued';
+            """)
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=str)
+
+
+# ─── queue ────────────────────────────────────────────────────────────────────
+
+def enqueue_run(user_id: str, join_active: bool = False) -> str:
+    """
+    Queue a run for user_id and wake a worker. With join_active, a run of
+    this user's that is still queued or running is returned instead.
+    Raises QueueFull past AGENT_QUEUE_MAX, LookupError for an unknown user.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        try:
+            if join_active:
+                # two requests for the same user can't both miss and both insert
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"agent_runs:{user_id}",))
+                try:
+                    cur.execute("""
+                        SELECT id FROM agent_runs
+                        WHERE user_id = %s AND status IN ('queued', 'running')
+                        ORDER BY created_at DESC
+                        LIMIT 1
+                    """, (user_id,))
+                except psycopg2.DataError:
+                    raise LookupError("user not found")
+                row = cur.fetchone()
+                if row:
+                    conn.commit()
+                    return str(row[0])
+
+            cur.execute("SELECT count(*) FROM agent_runs WHERE status = 'queued'")
+            if cur.fetchone()[0] >= config.AGENT_QUEUE_MAX:
+                raise QueueFull(f"agent queue is full ({config.AGENT_QUEUE_MAX} runs waiting)")
+
+            try:
+                cur.execute("INSERT INTO agent_runs (user_id) VALUES (%s) RETURNING id", (user_id,))
+            except (psycopg2.IntegrityError, psycopg2.DataError):
+                raise LookupError("user not found")
+            run_id = str(cur.fetchone()[0])
+            conn.commit()
+        finally:
+            cur.close()
+
+    pool.start()
+    pool.notify()
+    return run_id
+
+
+def get_run(run_id: str) -> dict | None:
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("""
+            SELECT id, user_id, status, progress, result, error, attempts,
+                   created_at, started_at, finished_at, updated_at
+            FROM agent_runs
+            WHERE id = %s
+        """, (run_id,))
+        row = cur.fetchone()
+        cur.close()
+    return dict(row) if row else None
+
+
+def _claim_next(cur) -> tuple[str, str] | None:
+    cur.execute("""
+        UPDATE agent_runs SET
+            status = 'running',
+            attempts = attempts + 1,
+            started_at = now(),
+            updated_at = now()
+        WHERE id = (
+            SELECT id FROM agent_runs
+            WHERE status = 'queued'
+            ORDER BY created_at
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, user_id
+    """)
+    row = cur.fetchone()
+    return (str(row[0]), str(row[1])) if row else None
+
+
+def _requeue_stale(cur) -> int:
+    """
+    Runs left 'running' by a worker that died go back to the queue, or fail
+    once they've used up AGENT_RUN_MAX_ATTEMPTS. Returns how many were re-queued.
+    """
+    cur.execute("""
+        UPDATE agent_runs SET
+            status = CASE WHEN attempts >= %(max_attempts)s THEN 'failed' ELSE 'queued' END,
+            error = CASE WHEN attempts >= %(max_attempts)s
+                         THEN 'worker stopped responding after ' || attempts || ' attempts'
+                         ELSE error END,
+            finished_at = CASE WHEN attempts >= %(max_attempts)s THEN now() ELSE finished_at END,
+            updated_at = now()
+        WHERE status = 'running'
+          AND updated_at < now() - %(stale)s * interval '1 minute'
+        RETURNING status
+    """, {"max_attempts": config.AGENT_RUN_MAX_ATTEMPTS, "stale": config.AGENT_RUN_STALE_MINUTES})
+    return sum(1 for (status,) in cur.fetchall() if status == "queued")
+
+
+def _set_progress(cur, run_id: str, progress: dict):
+    cur.execute("""
+        UPDATE agent_runs SET progress = %s, updated_at = now()
+        WHERE id = %s
+    """, (Json(progress, dumps=_dumps), run_id))
+
+
+def _finish(cur, run_id: str, result: dict | None, error: str | None):
+    cur.execute("""
+        UPDATE agent_runs SET
+            status = %s,
+            result = %s,
+            error = %s,
+            finished_at = now(),
+            updated_at = now()
+        WHERE id = %s
+    """, (
+        "failed" if error else "succeeded",
+        Json(result, dumps=_dumps) if result is not None else None,
+        error,
+        run_id,
+    ))
+
+
+def _node_event(node: str, state: dict, completed: int, elapsed: float) -> dict:
+    from graph.graph_builder import PIPELINE
+    from services.agent import matched_jobs_for
+
+    event = {
+        "node": node,
+        "completed": completed,
+        "total": len(PIPELINE),
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+
+    if node == "load_jobs":
+        event["candidate_jobs"] = len(state.get("candidate_jobs", []))
+        event["reused_matches"] = len(state.get("reused_matches", []))
+
+    if node in RANKING_NODES:
+        scored = state.get("scored_jobs", [])
+        event["scored_jobs"] = len(scored)
+        event["top"] = matched_jobs_for(state, scored[:PROGRESS_TOP_K])
+
+    return event
+
+
+def _in_transaction(fn, *args):
+    """Run fn(cur, *args) on a freshly checked-out connection and commit."""
+    with connection() as conn:
+        cur = conn.cursor()
+        try:
+            result = fn(cur, *args)
+            conn.commit()
+            return result
+        finally:
+            cur.close()
+
+
+# ─── workers ──────────────────────────────────────────────────────────────────
+
+class WorkerPool:
+    """AGENT_WORKERS daemon threads pulling from agent_runs."""
+
+    def __init__(self):
+        self._threads: list[threading.Thread] = []
+        self._wake = threading.Condition()
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def start(self):
+        with self._lock:
+            # AGENT_WORKERS=0: this process only enqueues, another one executes
+            if self._threads or config.AGENT_WORKERS <= 0:
+                return
+
+            self._sweep(force=True)
+
+            for i in range(config.AGENT_WORKERS):
+                t = threading.Thread(target=self._work, name=f"agent-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def notify(self):
+        with self._wake:
+            self._wake.notify()
+
+    def _sweep(self, force: bool = False):
+        """_requeue_stale, at most once per STALE_SWEEP_SECONDS across this process's workers."""
+        with self._sweep_lock:
+            now = time.monotonic()
+            if not force and now < self._next_sweep:
+                return
+            self._next_sweep = now + STALE_SWEEP_SECONDS
+        _in_transaction(_requeue_stale)
+
+    def _work(self):
+        while True:
+            try:
+                self._sweep()
+                claimed = self._run_one()
+            except Exception:
+                claimed = False
+
+            if not claimed:
+                # runs queued by another process are picked up on the next poll
+                with self._wake:
+                    self._wake.wait(timeout=config.AGENT_QUEUE_POLL_SECONDS)
+
+    def _run_one(self) -> bool:
+        from graph.graph_builder import PIPELINE
+        from services.agent import run_agent_for_user
+
+        # short checkouts only: the pipeline takes its own connections, and a
+        # worker holding one for the whole run could starve the pool
+        claimed = _in_transaction(_claim_next)
+        if claimed is None:
+            return False
+
+        run_id, user_id = claimed
+        total = len(PIPELINE)
+        started = time.perf_counter()
+        events = []
+
+        def on_progress(node: str, state: dict):
+            events.append(_node_event(node, state, len(events) + 1, time.perf_counter() - started))
+            _in_transaction(_set_progress, run_id, {
+                "step": node,
+                "completed": len(events),
+                "total": total,
+                "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "events": events,
+            })
+
+        try:
+            result = run_agent_for_user(user_id, on_progress=on_progress)
+        except Exception as e:
+            _in_transaction(_finish, run_id, None, str(e))
+        else:
+            _in_transaction(_finish, run_id, result, None)
+
+        return True
+
+
+pool = WorkerPool()
+
+
+def start_workers():
+    """Start the worker pool at app startup so runs queued before a restart get picked up."""
+    try:
+        pool.start()
+    except Exception:
+        pass  # no database yet — enqueue_run starts the pool later
+
+
+# ─── routes ───────────────────────────────────────────────────────────────────
+
+@agent_runs_bp.route("/agent/runs/<run_id>", methods=["GET"])
+def agent_run_status(run_id):
+    try:
+        run = get_run(run_id)
+    except psycopg2.DataError:
+        run = None  # not a uuid
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    if not run:
+        return jsonify({"status": "error", "message": "run not found"}), 404
+
+    return jsonify({"status": "success", "run": run}), 200
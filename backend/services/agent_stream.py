@@ -0,0 +1,118 @@
+"""GET /agent/stream — Server-Sent Events for one agent run.
+
+The run goes through the agent_runs queue like POST /agent {"async": true},
+so it is executed by the bounded worker pool. A user who already has a run
+queued or running (a second tab, or an EventSource reconnecting) is attached
+to it instead of starting another. The stream polls the run's progress and
+sends each graph node that finishes as a "node" event. After score_jobs (and
+again after llm_rerank) the event also carries the current top-K, so the
+page can show heuristic matches before the Gemini rerank is done. The final
+"result" event has the same payload as POST /agent. Comment lines keep the
+connection alive while a slow node (usually the rerank) is running.
+
+Every stream ends with "result" or "error": after AGENT_STREAM_MAX_SECONDS,
+or MAX_POLL_ERRORS failed progress reads in a row, it sends an "error" event
+(with the run_id; the run itself carries on) instead of polling forever.
+"""
+import json
+import time
+
+import psycopg2
+from flask import Blueprint, Response, jsonify, request
+
+import config
+from graph.graph_builder import PIPELINE
+from services.agent_runs import PROGRESS_TOP_K, QueueFull, enqueue_run, get_run
+
+agent_stream_bp = Blueprint("agent_stream", __name__)
+
+KEEPALIVE_SECONDS = 15
+# how often the stream reads the run's progress
+POLL_SECONDS = 0.5
+# consecutive failed reads (database down) before the stream gives up
+MAX_POLL_ERRORS = 10
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _trim(event: dict, top_k: int) -> dict:
+    if "top" in event:
+        return {**event, "top": event["top"][:top_k]}
+    return event
+
+
+@agent_stream_bp.route("/agent/stream", methods=["GET"])
+def agent_stream():
+    user_id = request.args.get("user_id")
+    top_k = max(1, min(request.args.get("top_k", default=10, type=int), PROGRESS_TOP_K))
+
+    if not user_id:
+        return jsonify({
+            "status": "error",
+            "message": "user_id is required"
+        }), 400
+
+    try:
+        run_id = enqueue_run(user_id, join_active=True)
+    except QueueFull as e:
+        return jsonify({"status": "error", "message": str(e)}), 429
+    except LookupError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except psycopg2.Error as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    def generate():
+        yield _sse("start", {"user_id": user_id, "run_id": run_id, "nodes": [name for name, _ in PIPELINE]})
+
+        sent, attempt, errors = 0, None, 0
+        last_write = time.monotonic()
+        deadline = last_write + config.AGENT_STREAM_MAX_SECONDS
+        while True:
+            if time.monotonic() >= deadline:
+                yield _sse("error", {"status": "error", "run_id": run_id, "message": "stream timed out; the run is still going"})
+                return
+
+            try:
+                run = get_run(run_id)
+            except psycopg2.Error:
+                errors += 1
+                if errors >= MAX_POLL_ERRORS:
+                    yield _sse("error", {"status": "error", "run_id": run_id, "message": "could not read the run's progress"})
+                    return
+                # try again on the next poll
+                time.sleep(POLL_SECONDS)
+                continue
+            errors = 0
+
+            if run is None:
+                yield _sse("error", {"status": "error", "message": "run not found"})
+                return
+
+            # a re-queued run starts its progress over
+            if run.get("attempts") != attempt:
+                sent, attempt = 0, run.get("attempts")
+
+            events = (run.get("progress") or {}).get("events", [])
+            for event in events[sent:]:
+                yield _sse("node", _trim(event, top_k))
+                last_write = time.monotonic()
+            sent = max(sent, len(events))
+
+            if run["status"] == "succeeded":
+                yield _sse("result", {"status": "success", "user_id": user_id, **(run["result"] or {})})
+                return
+            if run["status"] == "failed":
+                yield _sse("error", {"status": "error", "message": run["error"]})
+                return
+
+            if time.monotonic() - last_write >= KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_write = time.monotonic()
+            time.sleep(POLL_SECONDS)
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
@@ -1,56 +1,37 @@
 import datetime
 import json
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from flask import Blueprint, jsonify, request
 
-from config import DATABASE_URL
+from database import connection
 from services.draft_generator import generate_application_packet
+from services.response_cache import bump_versions, cached_json, invalidate
 from services.storage import save_application_packet
 
 applications_bp = Blueprint("applications", __name__)
 
-# ─── db ───────────────────────────────────────────────────────────────────────
-
-def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
-
-
-# ─── utils ────────────────────────────────────────────────────────────────────
-
-def _serialize_record(record: dict | None) -> dict | None:
-    if not record:
-        return record
-
-    return {
-        k: (v.isoformat() if hasattr(v, "isoformat") else v)
-        for k, v in record.items()
-    }
-
-
 # ─── fetch helpers ────────────────────────────────────────────────────────────
 
 def fetch_profile(user_id: str) -> dict | None:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("""
-        SELECT
-            u.id as user_id,
-            u.email,
-            u.first_name,
-            u.last_name,
-            p.resume_text,
-            p.preferences_json
-        FROM users u
-        JOIN profiles p ON p.user_id = u.id
-        WHERE u.id = %s
-    """, (user_id,))
-
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute("""
+            SELECT
+                u.id as user_id,
+                u.email,
+                u.first_name,
+                u.last_name,
+                p.resume_text,
+                p.preferences_json
+            FROM users u
+            JOIN profiles p ON p.user_id = u.id
+            WHERE u.id = %s
+        """, (user_id,))
+
+        row = cur.fetchone()
+        cur.close()
 
     if not row:
         return None
@@ -66,99 +47,97 @@ def fetch_profile(user_id: str) -> dict | None:
 
 
 def fetch_job(job_posting_id: str) -> dict | None:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("""
-        SELECT
-            id,
-            external_id,
-            source,
-            title,
-            company,
-            COALESCE(location_normalized, location) AS location,
-            COALESCE(apply_url, url) AS url,
-            description,
-            raw_json,
-            ingested_at,
-            COALESCE(category, schedule_type) AS category
-        FROM job_postings
-        WHERE id = %s
-    """, (job_posting_id,))
-
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute("""
+            SELECT
+                id,
+                external_id,
+                source,
+                title,
+                company,
+                COALESCE(location_normalized, location) AS location,
+                COALESCE(apply_url, url) AS url,
+                description,
+                raw_json,
+                ingested_at,
+                COALESCE(category, schedule_type) AS category
+            FROM job_postings
+            WHERE id = %s
+        """, (job_posting_id,))
+
+        row = cur.fetchone()
+        cur.close()
 
     return dict(row) if row else None
 
 
 def fetch_best_match_for_user_job(user_id: str, job_posting_id: str) -> dict | None:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("""
-        SELECT user_id, job_posting_id, score, rationale, created_at
-        FROM job_matches
-        WHERE user_id = %s AND job_posting_id = %s
-        ORDER BY score DESC, created_at DESC
-        LIMIT 1
-    """, (user_id, job_posting_id))
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+        cur.execute("""
+            SELECT user_id, job_posting_id, score, rationale, created_at
+            FROM job_matches
+            WHERE user_id = %s AND job_posting_id = %s
+            ORDER BY score DESC, created_at DESC
+            LIMIT 1
+        """, (user_id, job_posting_id))
+
+        row = cur.fetchone()
+        cur.close()
 
     return dict(row) if row else None
 
 
 def fetch_top_matches_for_user(user_id: str, top_k: int = 1) -> list[dict]:
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("""
-        SELECT *
-        FROM (
-            SELECT DISTINCT ON (jm.job_posting_id)
-                jm.user_id,
-                jm.job_posting_id,
-                jm.score,
-                jm.rationale,
-                jm.created_at
-            FROM job_matches jm
-            WHERE jm.user_id = %s
-            ORDER BY jm.job_posting_id, jm.score DESC, jm.created_at DESC
-        ) ranked
-        ORDER BY ranked.score DESC, ranked.created_at DESC
-        LIMIT %s
-    """, (user_id, top_k))
-
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute("""
+            SELECT *
+            FROM (
+                SELECT DISTINCT ON (jm.job_posting_id)
+                    jm.user_id,
+                    jm.job_posting_id,
+                    jm.score,
+                    jm.rationale,
+                    jm.created_at
+                FROM job_matches jm
+                WHERE jm.user_id = %s
+                ORDER BY jm.job_posting_id, jm.score DESC, jm.created_at DESC
+            ) ranked
+            ORDER BY ranked.score DESC, ranked.created_at DESC
+            LIMIT %s
+        """, (user_id, top_k))
+
+        rows = cur.fetchall()
+        cur.close()
 
     return [dict(r) for r in rows]
 
 
 def upsert_application(user_id: str, job_posting_id: str, status: str, draft_path: str | None):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("""
-        INSERT INTO applications (user_id, job_posting_id, status, draft_path)
-        VALUES (%s, %s, %s, %s)
-        ON CONFLICT (user_id, job_posting_id)
-        DO UPDATE SET
-            status = EXCLUDED.status,
-            draft_path = EXCLUDED.draft_path
-        RETURNING id, user_id, job_posting_id, status, draft_path, created_at
-    """, (user_id, job_posting_id, status, draft_path))
-
-    row = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute("""
+            INSERT INTO applications (user_id, job_posting_id, status, draft_path)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (user_id, job_posting_id)
+            DO UPDATE SET
+                status = EXCLUDED.status,
+                draft_path = EXCLUDED.draft_path
+            RETURNING id, user_id, job_posting_id, status, draft_path, created_at
+        """, (user_id, job_posting_id, status, draft_path))
+
+        row = cur.fetchone()
+        bump_versions(cur, f"applications:{user_id}")
+        conn.commit()
+        cur.close()
 
+    invalidate(f"applications:{user_id}")
     return dict(row)
 
 
@@ -195,7 +174,7 @@ def generate_single_draft(profile: dict, user_id: str, match_row: dict) -> dict:
     )
 
     return {
-        "selected_match": _serialize_record(match_row),
+        "selected_match": match_row,
         "job": {
             "id": str(job["id"]),
             "title": job.get("title"),
@@ -204,7 +183,7 @@ def generate_single_draft(profile: dict, user_id: str, match_row: dict) -> dict:
             "url": job.get("url"),
             "category": job.get("category"),
         },
-        "application": _serialize_record(ready),
+        "application": ready,
         "files": {
             "manifest_path": saved["manifest_path"],
             "resume_path": saved["resume_path"],
@@ -214,36 +193,42 @@ def generate_single_draft(profile: dict, user_id: str, match_row: dict) -> dict:
             "resume_markdown": packet["resume_markdown"],
             "cover_letter_markdown": packet["cover_letter_markdown"],
         },
-        "drafting_row_before_finalize": _serialize_record(drafting),
+        "drafting_row_before_finalize": drafting,
     }
 
 
 # ─── routes ───────────────────────────────────────────────────────────────────
 
+def _applications_versions() -> list[str] | None:
+    user_id = request.args.get("user_id")
+    # rows carry job titles / companies, so ingest invalidates them too
+    return [f"applications:{user_id}", "jobs"] if user_id else None
+
+
 @applications_bp.route("/applications", methods=["GET"])
+@cached_json(_applications_versions)
 def list_applications():
     user_id = request.args.get("user_id")
     if not user_id:
         return jsonify({"status": "error", "message": "user_id is required"}), 400
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT a.id, a.user_id, a.job_posting_id, a.status,
-                   a.draft_path, a.created_at,
-                   jp.title, jp.company, jp.location, jp.remote_type
-            FROM applications a
-            JOIN job_postings jp ON jp.id = a.job_posting_id
-            WHERE a.user_id = %s
-            ORDER BY a.created_at DESC
-        """, (user_id,))
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
+        with connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("""
+                SELECT a.id, a.user_id, a.job_posting_id, a.status,
+                       a.draft_path, a.created_at,
+                       jp.title, jp.company, jp.location, jp.remote_type
+                FROM applications a
+                JOIN job_postings jp ON jp.id = a.job_posting_id
+                WHERE a.user_id = %s
+                ORDER BY a.created_at DESC
+            """, (user_id,))
+            rows = cur.fetchall()
+            cur.close()
         return jsonify({
             "status": "success",
-            "applications": [_serialize_record(dict(r)) for r in rows],
+            "applications": rows,
             "count": len(rows),
         }), 200
     except Exception as e:
@@ -261,7 +246,7 @@ def save_job():
 
     try:
         result = upsert_application(user_id, job_posting_id, "saved", None)
-        return jsonify({"status": "success", "application": _serialize_record(result)}), 200
+        return jsonify({"status": "success", "application": result}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -1,26 +1,20 @@
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from flask import Blueprint, jsonify, request, session
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from config import DATABASE_URL
+from database import connection
 
 auth_bp = Blueprint("auth", __name__)
 
 
-def _get_db():
-    return psycopg2.connect(DATABASE_URL)
-
-
 def ensure_password_column():
     """Run once at startup to add password_hash column if it doesn't exist."""
     try:
-        conn = _get_db()
-        cur = conn.cursor()
-        cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS password_hash TEXT;")
-        conn.commit()
-        cur.close()
-        conn.close()
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS password_hash TEXT;")
+            conn.commit()
+            cur.close()
     except Exception:
         pass
 
@@ -50,23 +44,23 @@ def signup():
     pw_hash = generate_password_hash(password)
 
     try:
-        conn = _get_db()
-        cur  = conn.cursor(cursor_factory=RealDictCursor)
+        with connection() as conn:
+            cur  = conn.cursor(cursor_factory=RealDictCursor)
 
-        cur.execute("SELECT id FROM users WHERE email = %s", (email,))
-        if cur.fetchone():
-            cur.close(); conn.close()
-            return jsonify({"status": "error", "message": "an account with this email already exists"}), 409
+            cur.execute("SELECT id FROM users WHERE email = %s", (email,))
+            if cur.fetchone():
+                cur.close()
+                return jsonify({"status": "error", "message": "an account with this email already exists"}), 409
 
-        cur.execute("""
-            INSERT INTO users (id, email, first_name, last_name, password_hash, created_at)
-            VALUES (gen_random_uuid(), %s, %s, %s, %s, now())
-            RETURNING id, email, first_name, last_name
-        """, (email, first_name, last_name, pw_hash))
+            cur.execute("""
+                INSERT INTO users (id, email, first_name, last_name, password_hash, created_at)
+                VALUES (gen_random_uuid(), %s, %s, %s, %s, now())
+                RETURNING id, email, first_name, last_name
+            """, (email, first_name, last_name, pw_hash))
 
-        row = dict(cur.fetchone())
-        conn.commit()
-        cur.close(); conn.close()
+            row = dict(cur.fetchone())
+            conn.commit()
+            cur.close()
 
         _set_session(row)
 
@@ -92,14 +86,14 @@ def login():
         return jsonify({"status": "error", "message": "email and password are required"}), 400
 
     try:
-        conn = _get_db()
-        cur  = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT id, email, first_name, last_name, password_hash
-            FROM users WHERE email = %s
-        """, (email,))
-        row = cur.fetchone()
-        cur.close(); conn.close()
+        with connection() as conn:
+            cur  = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("""
+                SELECT id, email, first_name, last_name, password_hash
+                FROM users WHERE email = %s
+            """, (email,))
+            row = cur.fetchone()
+            cur.close()
 
         if not row:
             return jsonify({"status": "error", "message": "invalid email or password"}), 401
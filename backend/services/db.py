@@ -1,8 +1,7 @@
 from flask import Blueprint, jsonify
 import datetime
-import psycopg2
 
-from config import DATABASE_URL
+from database import connection, get_pool
 
 
 db_bp = Blueprint('db', __name__)
@@ -12,19 +11,20 @@ db_bp = Blueprint('db', __name__)
 @db_bp.route('/health/db', methods=['GET'])
 def db_health():
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
-        cur.execute("SELECT 1;")
-        cur.close()
-        conn.close()
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT 1;")
+            cur.close()
         return jsonify({
             'status': 'success',
             'message': 'Database connected',
+            'pool': get_pool().stats(),
             'timestamp': datetime.datetime.now().isoformat()
         }), 200
     except Exception as e:
         return jsonify({
             'status': 'failure',
             'message': f'Database connection failed: {str(e)}',
+            'pool': get_pool().stats(),
             'timestamp': datetime.datetime.now().isoformat()
         }), 500
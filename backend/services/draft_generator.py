@@ -3,8 +3,7 @@ import re
 from datetime import datetime, timezone
 from typing import Any
 
-from google import genai
-from config import GEMINI_API_KEY, GEMINI_MODEL
+from services import llm
 
 # ─── helpers ──────────────────────────────────────────────────────────────────
 
@@ -112,27 +111,19 @@ def generate_application_packet(
     match_context: dict | None = None,
 ) -> dict:
 
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY is not set")
-
-    client = genai.Client(api_key=GEMINI_API_KEY)
-
-    response = client.models.generate_content(
-        model=GEMINI_MODEL,
-        contents=_build_prompt(profile, job, match_context),
-        config={
-            "response_mime_type": "application/json",
-            "response_json_schema": _response_schema(),
-        },
+    text = llm.generate(
+        _build_prompt(profile, job, match_context),
+        response_schema=_response_schema(),
+        purpose="draft",
     )
 
-    if not response.text:
-        raise ValueError("Empty response from Gemini")
+    if not text:
+        raise ValueError("Empty response from LLM")
 
     try:
-        payload = json.loads(response.text)
+        payload = json.loads(text)
     except json.JSONDecodeError:
-        payload = _safe_json_loads(response.text)
+        payload = _safe_json_loads(text)
 
     if not isinstance(payload, dict):
         raise ValueError("Response is not a JSON object")
@@ -151,8 +142,8 @@ def generate_application_packet(
         "status": "ready_for_review",
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "generator": {
-            "provider": "gemini",
-            "model": GEMINI_MODEL,
+            "provider": llm.provider_name(),
+            "model": llm.model_name(),
         },
         "match_score": match_context.get("score") if match_context else None,
         "match_rationale": match_context.get("rationale") if match_context else None,
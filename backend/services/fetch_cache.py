@@ -0,0 +1,243 @@
+"""On-disk cache for upstream job feed requests (Remotive, SerpApi).
+
+Response bodies are streamed to files under FETCH_CACHE_DIR (never held in
+memory whole), keyed by provider, URL and query parameters (api keys
+excluded), with a small metadata file next to each. Within the TTL a cached
+body is returned without touching the network. Once stale, the request is revalidated
+with If-None-Match / If-Modified-Since when the upstream sent validators, so
+a 304 costs no download (and no SerpApi credit). Identical requests that
+arrive while one is in flight wait for it instead of fetching again.
+
+After each download, and once at startup, the directory is pruned: entries
+not fetched or revalidated for FETCH_CACHE_MAX_AGE_HOURS go, then the
+oldest ones until the rest fit in FETCH_CACHE_MAX_TOTAL_MB.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import requests
+
+import config
+
+# never part of the cache key or written to disk
+SECRET_PARAMS = {"api_key"}
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# .tmp files (and bodies without metadata) older than this are left over from a crash
+STALE_TMP_SECONDS = 3600
+
+
+class UpstreamError(Exception):
+    pass
+
+
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+_stats = {"hits": 0, "revalidated": 0, "misses": 0, "coalesced": 0, "errors": 0, "pruned": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome: str):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def cache_key(provider: str, url: str, params: dict | None) -> str:
+    public = {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+    payload = json.dumps([provider, url, public], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _meta_path(key: str) -> Path:
+    return Path(config.FETCH_CACHE_DIR) / f"{key}.meta.json"
+
+
+def _body_path(key: str) -> Path:
+    return Path(config.FETCH_CACHE_DIR) / f"{key}.body"
+
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _read_meta(key: str) -> dict | None:
+    try:
+        with open(_meta_path(key), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if _body_path(key).exists() else None
+
+
+def _write_meta(key: str, meta: dict):
+    path = _meta_path(key)
+    tmp = _tmp_path(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    tmp.replace(path)
+
+
+def _fetch(provider: str, label: str, url: str, params: dict | None, ttl: float,
+           refresh: bool, http, timeout: float) -> Path:
+    key = cache_key(provider, url, params)
+    entry = _read_meta(key)
+
+    if entry and not refresh and time.time() - entry["fetched_at"] < ttl:
+        _count("hits")
+        return _body_path(key)
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    body = _body_path(key)
+    body.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        with http.get(url, params=params, headers=headers, timeout=timeout, stream=True) as r:
+            if r.status_code == 304 and entry:
+                entry["fetched_at"] = time.time()
+                _write_meta(key, entry)
+                _count("revalidated")
+                return body
+
+            if r.status_code != 200:
+                _count("errors")
+                raise UpstreamError(f"{label} returned {r.status_code}: {r.text[:300]}")
+
+            # straight to disk, one chunk at a time; readers parse the file
+            tmp = _tmp_path(body)
+            with open(tmp, "wb") as f:
+                for chunk in r.iter_content(DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+            tmp.replace(body)
+
+            _write_meta(key, {
+                "provider": provider,
+                "url": url,
+                "params": {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS},
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            })
+    except requests.RequestException:
+        _count("errors")
+        raise
+
+    _count("misses")
+    prune()
+    return body
+
+
+def prune():
+    """Drop entries older than FETCH_CACHE_MAX_AGE_HOURS, then the oldest past FETCH_CACHE_MAX_TOTAL_MB."""
+    root = Path(config.FETCH_CACHE_DIR)
+    if not root.is_dir():
+        return
+
+    with _inflight_lock:
+        busy = set(_inflight)
+
+    now = time.time()
+    entries = []
+    for path in root.iterdir():
+        name = path.name
+        try:
+            st = path.stat()
+            if name.endswith(".tmp") or (name.endswith(".body") and not _meta_path(name[:-len(".body")]).exists()):
+                if now - st.st_mtime > STALE_TMP_SECONDS:
+                    path.unlink()
+            elif name.endswith(".meta.json"):
+                key = name[:-len(".meta.json")]
+                body = _body_path(key)
+                # the metadata is rewritten on every download and revalidation
+                size = st.st_size + (body.stat().st_size if body.exists() else 0)
+                entries.append((st.st_mtime, size, key))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+
+    max_age = config.FETCH_CACHE_MAX_AGE_HOURS * 3600
+    budget = config.FETCH_CACHE_MAX_TOTAL_MB * 1024 * 1024
+    total = 0
+    for mtime, size, key in entries:
+        total += size
+        if key in busy or (now - mtime <= max_age and total <= budget):
+            continue
+        # metadata first: a reader in between sees a miss, never a half-deleted entry
+        _meta_path(key).unlink(missing_ok=True)
+        _body_path(key).unlink(missing_ok=True)
+        _count("pruned")
+
+
+def fetch(
+    provider: str,
+    url: str,
+    params: dict | None = None,
+    ttl: float = 0,
+    label: str | None = None,
+    refresh: bool = False,
+    http=requests,
+    timeout: float = 30,
+) -> Path:
+    """
+    GET url with params and return the path of the cached body file,
+    downloading it only when the entry is older than ttl seconds (and the
+    upstream doesn't answer 304). refresh=True skips the TTL but still
+    revalidates conditionally. Non-200 responses raise UpstreamError and are
+    never cached. http may be a requests.Session to reuse its connections.
+    """
+    key = cache_key(provider, url, params)
+
+    with _inflight_lock:
+        pending = _inflight.get(key)
+        if pending is None:
+            pending = _inflight[key] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        _count("coalesced")
+        return pending.result()
+
+    try:
+        path = _fetch(provider, label or provider, url, params, ttl, refresh, http, timeout)
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    else:
+        pending.set_result(path)
+        return path
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+@contextmanager
+def open_body(provider: str, url: str, params: dict | None = None, **kwargs) -> Iterator[BinaryIO]:
+    """fetch(), then open the body for streaming parsers (ijson)."""
+    with open(fetch(provider, url, params, **kwargs), "rb") as f:
+        yield f
+
+
+def get_json(provider: str, url: str, params: dict | None = None, **kwargs) -> dict:
+    """fetch() and decode the whole body — for small responses such as one SerpApi page."""
+    with open_body(provider, url, params, **kwargs) as f:
+        return json.load(f)
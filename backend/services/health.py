@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify
 import datetime
 
+from services import fetch_cache, response_cache, snapshots, warmup
+
 health_bp = Blueprint('health', __name__)
 
 
@@ -9,10 +11,23 @@ def health():
     return jsonify({
         'status': 'success',
         'message': 'Server is running',
+        'fetch_cache': fetch_cache.stats(),
+        'snapshots': snapshots.stats(),
+        'response_cache': response_cache.stats(),
         'timestamp': datetime.datetime.now().isoformat()
     }), 200
 
 
+@health_bp.route('/health/ready', methods=['GET'])
+def ready():
+    # 503 until the agent pipeline has been warmed up (see services/warmup.py)
+    state = warmup.status()
+    return jsonify({
+        **state,
+        'timestamp': datetime.datetime.now().isoformat()
+    }), 200 if state['ready'] else 503
+
+
 @health_bp.route('/debug/dburl', methods=['GET'])
 def debug_dburl():
     # this endpoint really belongs to config/diagnostics
@@ -1,15 +1,37 @@
 from flask import Blueprint, jsonify, request
+import base64
+import binascii
 import datetime
 import hashlib
 import json
+import itertools
+import queue
 import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
 from urllib.parse import urlparse, urlunparse
 
+import ijson
 import requests
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
-from config import DATABASE_URL, SERPAPI_API_KEY, SERPAPI_BASE_URL
+from config import (
+    INGEST_BATCH_SIZE,
+    NEAR_DUP_THRESHOLD,
+    REMOTIVE_CACHE_TTL_SECONDS,
+    SERPAPI_API_KEY,
+    SERPAPI_BASE_URL,
+    SERPAPI_CACHE_TTL_SECONDS,
+)
+from database import connection, copy_rows
+from graph.features import refresh_job_features
+from graph.job_index import refresh_job_index
+from graph.near_dups import near_dup_keys, pg_array
+from services import fetch_cache, snapshots
+from services.response_cache import bump_versions, cached_json, invalidate
 
 jobs_bp = Blueprint("jobs", __name__)
 
@@ -17,10 +39,6 @@ REMOTE_TERMS = ("remote", "anywhere", "work from home", "wfh", "worldwide")
 HYBRID_TERMS = ("hybrid",)
 
 
-def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
-
-
 def now_iso() -> str:
     return datetime.datetime.now().isoformat()
 
@@ -76,6 +94,35 @@ def extract_posted_at_text(parts: list[str], detected: dict) -> str | None:
     return None
 
 
+POSTED_AGO_PATTERN = re.compile(r"\b(\d+)\s+(minute|hour|day|week|month|year)s?\s+ago\b", re.I)
+POSTED_AGO_UNITS = {
+    "minute": datetime.timedelta(minutes=1),
+    "hour": datetime.timedelta(hours=1),
+    "day": datetime.timedelta(days=1),
+    "week": datetime.timedelta(weeks=1),
+    "month": datetime.timedelta(days=30),
+    "year": datetime.timedelta(days=365),
+}
+
+
+def parse_posted_at(posted_at_text: str | None, now: datetime.datetime | None = None) -> datetime.datetime | None:
+    """Timestamp for posted_at_text: ISO dates (Remotive) or "3 days ago" (Google Jobs)."""
+    if not posted_at_text:
+        return None
+
+    try:
+        posted = datetime.datetime.fromisoformat(posted_at_text.strip())
+        return posted if posted.tzinfo else posted.replace(tzinfo=datetime.timezone.utc)
+    except ValueError:
+        pass
+
+    match = POSTED_AGO_PATTERN.search(posted_at_text)
+    if match:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        return now - int(match.group(1)) * POSTED_AGO_UNITS[match.group(2).lower()]
+    return None
+
+
 def classify_google_remote(location_raw: str | None, extensions: list[str], detected: dict) -> tuple[bool | None, str, str]:
     location_raw = (location_raw or "").strip()
     location_lower = location_raw.lower()
@@ -111,25 +158,50 @@ def build_canonical_key(title: str | None, company: str | None, location_normali
     return hashlib.md5(payload.encode("utf-8")).hexdigest()
 
 
-def fetch_remotive_jobs(limit: int | None = None) -> list[dict]:
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while batch := list(itertools.islice(items, size)):
+        yield batch
+
+
+def iter_remotive_jobs(limit: int | None = None, refresh: bool = False) -> Iterator[dict]:
+    """Yield raw Remotive jobs one by one, parsed incrementally from the (cached) response body."""
     url = "https://remotive.com/api/remote-jobs"
     params = {}
     if limit:
         params["limit"] = limit
 
-    r = requests.get(url, params=params, timeout=30)
-    if r.status_code != 200:
-        raise Exception(f"Remotive API returned {r.status_code}: {r.text[:200]}")
+    with fetch_cache.open_body(
+        "remotive", url, params,
+        ttl=REMOTIVE_CACHE_TTL_SECONDS,
+        label="Remotive API",
+        refresh=refresh,
+    ) as body:
+        # use_float: plain floats instead of Decimal, so jobs stay json.dumps-able
+        yield from ijson.items(body, "jobs.item", use_float=True)
 
-    return r.json().get("jobs", [])
 
+def iter_remotive_job_pages(
+    limit: int | None = None,
+    refresh: bool = False,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> Iterator[list[dict]]:
+    # Remotive returns the whole feed in one response; hand it on in batches
+    yield from batched(iter_remotive_jobs(limit=limit, refresh=refresh), batch_size)
 
-def fetch_google_jobs(
+
+def iter_google_job_pages(
     job_type: str | None = None,
     location: str | None = None,
     remote_only: bool | None = None,
     pages: int = 1,
-) -> list[dict]:
+    refresh: bool = False,
+) -> Iterator[list[dict]]:
+    """
+    Yield SerpApi result pages as they arrive. Each page needs the previous
+    page's token, so pages are sequential; the caller processes page N while
+    this generator is already fetching page N+1 (see stream_provider_pages).
+    """
     if not SERPAPI_API_KEY:
         raise ValueError("SERPAPI_API_KEY is not set")
 
@@ -156,27 +228,115 @@ def fetch_google_jobs(
     if remote_only is True:
         params["ltype"] = 1
 
-    all_jobs: list[dict] = []
     next_page_token = None
 
-    for _ in range(pages):
-        page_params = dict(params)
-        if next_page_token:
-            page_params["next_page_token"] = next_page_token
+    # one keep-alive connection for every page instead of a TLS handshake each
+    with requests.Session() as http:
+        for _ in range(pages):
+            page_params = dict(params)
+            if next_page_token:
+                page_params["next_page_token"] = next_page_token
+
+            # identical searches (same query + page token) within the TTL cost no SerpApi credit
+            payload = fetch_cache.get_json(
+                "serpapi", SERPAPI_BASE_URL, page_params,
+                ttl=SERPAPI_CACHE_TTL_SECONDS,
+                label="SerpApi",
+                refresh=refresh,
+                http=http,
+            )
+            yield payload.get("jobs_results", []) or []
 
-        r = requests.get(SERPAPI_BASE_URL, params=page_params, timeout=30)
-        if r.status_code != 200:
-            raise Exception(f"SerpApi returned {r.status_code}: {r.text[:300]}")
+            next_page_token = payload.get("pagination", {}).get("next_page_token") or payload.get("next_page_token")
+            if not next_page_token:
+                break
 
-        payload = r.json()
-        page_jobs = payload.get("jobs_results", []) or []
-        all_jobs.extend(page_jobs)
 
-        next_page_token = payload.get("pagination", {}).get("next_page_token") or payload.get("next_page_token")
-        if not next_page_token:
-            break
+def fetch_google_jobs(
+    job_type: str | None = None,
+    location: str | None = None,
+    remote_only: bool | None = None,
+    pages: int = 1,
+    refresh: bool = False,
+) -> list[dict]:
+    return [
+        job
+        for page in iter_google_job_pages(job_type, location, remote_only, pages, refresh=refresh)
+        for job in page
+    ]
+
+
+# provider name → (zero-arg page iterator factory, normalizer)
+Provider = tuple[Callable[[], Iterable[list[dict]]], Callable[[dict], dict]]
+
+_PROVIDER_DONE = object()
+
+# pages a provider may fetch ahead of the DB writer
+PROVIDER_PREFETCH = 2
+
+
+def stream_provider_pages(providers: dict[str, Provider], source_counts: dict) -> Iterator[list[dict]]:
+    """
+    Fetch every provider on its own thread and yield normalized pages in
+    arrival order, so total fetch time is the slowest provider rather than
+    the sum. A provider that fails stops contributing pages; its error is
+    recorded in source_counts[name]["error"] and the others carry on.
+
+    The queue is bounded, so a fast provider waits for the writer instead
+    of buffering its whole feed.
+    """
+    pages: queue.Queue = queue.Queue(maxsize=PROVIDER_PREFETCH * max(len(providers), 1))
+    stopped = threading.Event()
+    started = time.perf_counter()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch(name: str, page_iter: Callable[[], Iterable[list[dict]]]):
+        try:
+            for page in page_iter():
+                if not put((name, page)):
+                    return  # the consumer is gone
+        except Exception as e:
+            put((name, e))
+        finally:
+            put((name, _PROVIDER_DONE))
+
+    for name in providers:
+        source_counts[name] = {"count": 0, "pages": 0}
+
+    executor = ThreadPoolExecutor(max_workers=max(len(providers), 1), thread_name_prefix="ingest-fetch")
+    try:
+        for name, (page_iter, _) in providers.items():
+            executor.submit(fetch, name, page_iter)
+
+        remaining = len(providers)
+        while remaining:
+            name, page = pages.get()
+            counts = source_counts[name]
+
+            if page is _PROVIDER_DONE:
+                counts["seconds"] = round(time.perf_counter() - started, 3)
+                remaining -= 1
+            elif isinstance(page, Exception):
+                counts["error"] = str(page)
+            else:
+                normalize = providers[name][1]
+                normalized = [normalize(job) for job in page]
+                counts["count"] += len(normalized)
+                counts["pages"] += 1
+                yield normalized
 
-    return all_jobs
+    finally:
+        # a failed DB write shouldn't wait out the remaining HTTP timeouts
+        stopped.set()
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def normalize_remotive_job(job: dict) -> dict:
@@ -280,118 +440,586 @@ def normalize_google_job(job: dict) -> dict:
     }
 
 
-def insert_job_posting(cur, job: dict) -> str:
-    cur.execute(
-        """
-        insert into public.job_postings (
-            external_id,
-            source,
-            title,
-            company,
-            location,
-            url,
-            description,
-            raw_json,
-            ingested_at,
-            category,
-            location_raw,
-            location_normalized,
-            is_remote,
-            remote_type,
-            salary_text,
-            schedule_type,
-            posted_at_text,
-            apply_url,
-            source_job_key,
-            canonical_key,
-            last_seen_at
-        ) values (
-            %s, %s, %s, %s, %s, %s, %s, %s::jsonb, now(), %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, now()
-        )
-        returning id
-        """,
-        (
-            job["external_id"],
-            job["source"],
-            job["title"],
-            job["company"],
-            job["location"],
-            job["url"],
-            job["description"],
-            json.dumps(job["raw_json"]),
-            job["category"],
-            job["location_raw"],
-            job["location_normalized"],
-            job["is_remote"],
-            job["remote_type"],
-            job["salary_text"],
-            job["schedule_type"],
-            job["posted_at_text"],
-            job["apply_url"],
-            job["source_job_key"],
-            job["canonical_key"],
-        ),
+# normalized job keys, in the order they're copied into the ingest stage
+STAGE_COLUMNS = [
+    "source",
+    "external_id",
+    "source_job_key",
+    "title",
+    "company",
+    "location",
+    "location_raw",
+    "location_normalized",
+    "is_remote",
+    "remote_type",
+    "url",
+    "apply_url",
+    "description",
+    "category",
+    "salary_text",
+    "schedule_type",
+    "posted_at_text",
+    "canonical_key",
+]
+
+
+def ensure_ingest_schema():
+    """Run once at startup: content hashes plus indexes on the columns ingest matches postings on."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                ALTER TABLE job_postings
+                    ADD COLUMN IF NOT EXISTS content_hash TEXT,
+                    ADD COLUMN IF NOT EXISTS content_updated_at TIMESTAMPTZ,
+                    ADD COLUMN IF NOT EXISTS posted_at TIMESTAMPTZ;
+
+                ALTER TABLE job_posting_sources
+                    ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+                CREATE INDEX IF NOT EXISTS job_postings_source_external_id_idx
+                    ON job_postings (source, external_id);
+
+                CREATE INDEX IF NOT EXISTS job_postings_canonical_key_idx
+                    ON job_postings (canonical_key, ingested_at DESC NULLS LAST);
+
+                -- batches waiting for their ingest's merge; unlogged, they're
+                -- only needed until then (a crash just loses that ingest)
+                CREATE UNLOGGED TABLE IF NOT EXISTS job_ingest_pending (
+                    run_id              UUID NOT NULL,
+                    ord                 INT NOT NULL,
+                    last_ord            INT,
+                    source              TEXT,
+                    external_id         TEXT,
+                    source_job_key      TEXT,
+                    title               TEXT,
+                    company             TEXT,
+                    location            TEXT,
+                    location_raw        TEXT,
+                    location_normalized TEXT,
+                    is_remote           BOOLEAN,
+                    remote_type         TEXT,
+                    url                 TEXT,
+                    apply_url           TEXT,
+                    description         TEXT,
+                    category            TEXT,
+                    salary_text         TEXT,
+                    schedule_type       TEXT,
+                    posted_at_text      TEXT,
+                    canonical_key       TEXT,
+                    raw_json            JSONB,
+                    content_hash        TEXT,
+                    source_hash         TEXT,
+                    posted_at           TIMESTAMPTZ,
+                    staged_at           TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    PRIMARY KEY (run_id, ord)
+                );
+
+                -- left behind by ingests that died before merging
+                DELETE FROM job_ingest_pending WHERE staged_at < now() - interval '1 day';
+            """)
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def create_job_stage(cur):
+    """Per-session temp table the ingest batches are COPYed into."""
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS job_ingest_stage (
+            ord                 INT,
+            last_ord            INT,
+            source              TEXT,
+            external_id         TEXT,
+            source_job_key      TEXT,
+            title               TEXT,
+            company             TEXT,
+            location            TEXT,
+            location_raw        TEXT,
+            location_normalized TEXT,
+            is_remote           BOOLEAN,
+            remote_type         TEXT,
+            url                 TEXT,
+            apply_url           TEXT,
+            description         TEXT,
+            category            TEXT,
+            salary_text         TEXT,
+            schedule_type       TEXT,
+            posted_at_text      TEXT,
+            canonical_key       TEXT,
+            raw_json            JSONB,
+            content_hash        TEXT,
+            source_hash         TEXT,
+            posted_at           TIMESTAMPTZ,
+            posting_id          UUID,
+            outcome             TEXT,
+            near_ord            INT,
+            near_dup            BOOLEAN NOT NULL DEFAULT false
+        ) ON COMMIT DELETE ROWS;
+
+        CREATE TEMP TABLE IF NOT EXISTS job_ingest_signatures (
+            ord          INT PRIMARY KEY,
+            company_key  TEXT,
+            location_key TEXT,
+            minhash      BIGINT[],
+            lsh_buckets  BIGINT[]
+        ) ON COMMIT DELETE ROWS;
+
+        TRUNCATE job_ingest_stage, job_ingest_signatures;
+    """)
+
+
+# stored, but not part of change detection: Google's "3 days ago" reads
+# differently every day without the posting changing
+HASH_COLUMNS = [c for c in STAGE_COLUMNS if c != "posted_at_text"]
+
+
+def _content_hash(values: list) -> str:
+    return hashlib.md5(json.dumps(values, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _hashable_raw_json(raw: dict) -> dict:
+    """raw_json without the relative posting age SerpApi repeats in detected_extensions / extensions."""
+    if not isinstance(raw, dict):
+        return raw
+    raw = dict(raw)
+    if isinstance(raw.get("detected_extensions"), dict):
+        raw["detected_extensions"] = {k: v for k, v in raw["detected_extensions"].items() if k != "posted_at"}
+    if isinstance(raw.get("extensions"), list):
+        raw["extensions"] = [x for x in raw["extensions"] if not POSTED_AGO_PATTERN.search(str(x))]
+    return raw
+
+
+def _stage_row(i: int, job: dict) -> tuple:
+    raw_json = json.dumps(job["raw_json"], sort_keys=True)
+    hashed_raw = json.dumps(_hashable_raw_json(job["raw_json"]), sort_keys=True, default=str)
+    # everything an update would write to the posting / to its source row, minus the posting age
+    content_hash = _content_hash([*(job[c] for c in HASH_COLUMNS), hashed_raw])
+    source_hash = _content_hash([job["source_job_key"], job["url"], job["apply_url"], hashed_raw])
+    posted_at = parse_posted_at(job["posted_at_text"])
+    return (i, i, *(job[c] for c in STAGE_COLUMNS), raw_json, content_hash, source_hash, posted_at)
+
+
+# columns of a _stage_row, shared by job_ingest_stage and job_ingest_pending
+STAGE_ROW_COLUMNS = ["ord", "last_ord", *STAGE_COLUMNS, "raw_json", "content_hash", "source_hash", "posted_at"]
+
+
+def stage_jobs(cur, normalized_jobs: list[dict], start: int = 0):
+    """COPY a batch into the stage, one row per job; start is its position in the whole feed."""
+    copy_rows(
+        cur,
+        "job_ingest_stage",
+        STAGE_ROW_COLUMNS,
+        (_stage_row(i, job) for i, job in enumerate(normalized_jobs, start)),
     )
-    row = cur.fetchone()
-    return str(row["id"])
-    
-def update_job_posting(cur, job_posting_id: str, job: dict):
-    cur.execute(
-        """
-        update public.job_postings
-        set
-            title = coalesce(%s, title),
-            company = coalesce(%s, company),
-            location = coalesce(%s, location),
-            url = coalesce(%s, url),
-            description = case
-                when coalesce(length(%s), 0) > coalesce(length(description), 0) then %s
-                else description
-            end,
-            raw_json = %s::jsonb,
-            category = coalesce(category, %s),
-            location_raw = coalesce(%s, location_raw),
-            location_normalized = coalesce(%s, location_normalized),
-            is_remote = coalesce(%s, is_remote),
-            remote_type = coalesce(%s, remote_type),
-            salary_text = coalesce(%s, salary_text),
-            schedule_type = coalesce(%s, schedule_type),
-            posted_at_text = coalesce(%s, posted_at_text),
-            apply_url = coalesce(%s, apply_url),
-            source_job_key = coalesce(%s, source_job_key),
-            canonical_key = coalesce(%s, canonical_key),
-            last_seen_at = now()
-        where id = %s
-        """,
-        (
-            job["title"],
-            job["company"],
-            job["location"],
-            job["url"],
-            job["description"],
-            job["description"],
-            json.dumps(job["raw_json"]),
-            job["category"],
-            job["location_raw"],
-            job["location_normalized"],
-            job["is_remote"],
-            job["remote_type"],
-            job["salary_text"],
-            job["schedule_type"],
-            job["posted_at_text"],
-            job["apply_url"],
-            job["source_job_key"],
-            job["canonical_key"],
-            job_posting_id,
-        ),
+
+
+def park_jobs(cur, run_id: str, normalized_jobs: list[dict], start: int = 0):
+    """Like stage_jobs, into job_ingest_pending — survives the commit that ends the batch's checkout."""
+    copy_rows(
+        cur,
+        "job_ingest_pending",
+        ["run_id", *STAGE_ROW_COLUMNS],
+        ((run_id, *_stage_row(i, job)) for i, job in enumerate(normalized_jobs, start)),
     )
 
 
-def upsert_source_row(cur, job_posting_id: str, job: dict):
-    cur.execute(
-        """
-        insert into public.job_posting_sources (
+def unpark_jobs(cur, run_id: str):
+    """Move an ingest's parked batches into the (fresh) stage for merge_staged_jobs."""
+    columns = ", ".join(STAGE_ROW_COLUMNS)
+    cur.execute(f"""
+        WITH parked AS (
+            DELETE FROM job_ingest_pending WHERE run_id = %s
+            RETURNING {columns}
+        )
+        INSERT INTO job_ingest_stage ({columns})
+        SELECT {columns} FROM parked
+    """, (run_id,))
+    cur.execute("ANALYZE job_ingest_stage")
+
+
+def drop_parked_jobs(run_id: str):
+    """Best effort: discard an ingest's parked batches after it failed."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM job_ingest_pending WHERE run_id = %s", (run_id,))
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def sign_staged_jobs(cur, where: str, params: dict | None = None):
+    """
+    MinHash the staged jobs matching where (SQL over the stage aliased s)
+    that don't have a signature yet, streaming them through a server-side
+    cursor so a large feed isn't pulled into memory at once.
+    """
+    reader = cur.connection.cursor(name="job_ingest_sign")
+    reader.itersize = INGEST_BATCH_SIZE
+    reader.execute(f"""
+        SELECT s.ord, s.title, s.company, s.location_normalized, s.remote_type, s.description
+        FROM job_ingest_stage s
+        WHERE ({where})
+          AND NOT EXISTS (SELECT 1 FROM job_ingest_signatures g WHERE g.ord = s.ord)
+    """, params)
+
+    while rows := reader.fetchmany(INGEST_BATCH_SIZE):
+        signed = []
+        for ord_, title, company, location, remote_type, description in rows:
+            key, where, signature, buckets = near_dup_keys(title, company, location, remote_type, description)
+            signed.append((ord_, key, where, pg_array(signature), pg_array(buckets)))
+        copy_rows(cur, "job_ingest_signatures", ["ord", "company_key", "location_key", "minhash", "lsh_buckets"], signed)
+
+    reader.close()
+    cur.execute("ANALYZE job_ingest_signatures")
+
+
+def merge_near_duplicates(cur) -> int:
+    """
+    Point unmatched staged jobs at an existing posting from the same company
+    and location whose signature is at least NEAR_DUP_THRESHOLD similar — candidates come
+    from the LSH buckets, never a scan. Jobs sharing a canonical_key with
+    such a job follow it. Returns the number of near-duplicate jobs.
+    """
+    sign_staged_jobs(cur, "s.posting_id IS NULL")
+
+    cur.execute("""
+        UPDATE job_ingest_stage s SET posting_id = best.posting_id, outcome = 'merged', near_dup = true
+        FROM (
+            SELECT DISTINCT ON (g.ord) g.ord, c.job_posting_id AS posting_id
+            FROM job_ingest_signatures g
+            JOIN job_ingest_stage st ON st.ord = g.ord AND st.posting_id IS NULL
+            JOIN LATERAL (
+                SELECT DISTINCT l.job_posting_id
+                FROM job_posting_lsh l
+                WHERE l.bucket = ANY(g.lsh_buckets)
+            ) c ON true
+            JOIN job_posting_minhash m
+              ON m.job_posting_id = c.job_posting_id
+             AND m.company_key = g.company_key
+             AND m.location_key = g.location_key
+            CROSS JOIN LATERAL minhash_similarity(g.minhash, m.signature) AS similarity
+            WHERE g.lsh_buckets IS NOT NULL
+              AND similarity >= %s
+            ORDER BY g.ord, similarity DESC, c.job_posting_id
+        ) best
+        WHERE s.ord = best.ord
+    """, (NEAR_DUP_THRESHOLD,))
+    near = cur.rowcount
+
+    cur.execute("""
+        UPDATE job_ingest_stage s SET posting_id = n.posting_id, outcome = 'merged'
+        FROM (
+            SELECT DISTINCT ON (canonical_key) canonical_key, posting_id
+            FROM job_ingest_stage
+            WHERE near_dup
+            ORDER BY canonical_key, ord
+        ) n
+        WHERE s.posting_id IS NULL
+          AND s.canonical_key = n.canonical_key
+    """)
+
+    return near
+
+
+def link_near_duplicate_leaders(cur):
+    """
+    Among the jobs about to be inserted (first per canonical_key), point
+    each one that is a near duplicate of an earlier one at it via near_ord,
+    so only the first of each group is inserted.
+    """
+    cur.execute("""
+        WITH leaders AS (
+            SELECT DISTINCT ON (s.canonical_key) s.ord, g.company_key, g.location_key, g.minhash, g.lsh_buckets
+            FROM job_ingest_stage s
+            JOIN job_ingest_signatures g ON g.ord = s.ord
+            WHERE s.posting_id IS NULL
+            ORDER BY s.canonical_key, s.ord
+        ), buckets AS (
+            SELECT ord, unnest(lsh_buckets) AS bucket
+            FROM leaders
+            WHERE lsh_buckets IS NOT NULL
+        ), pairs AS (
+            SELECT DISTINCT a.ord, b.ord AS earlier
+            FROM buckets a
+            JOIN buckets b ON b.bucket = a.bucket AND b.ord < a.ord
+        ), firsts AS (
+            SELECT DISTINCT ON (p.ord) p.ord, p.earlier
+            FROM pairs p
+            JOIN leaders a ON a.ord = p.ord
+            JOIN leaders b ON b.ord = p.earlier
+            WHERE a.company_key = b.company_key
+              AND a.location_key = b.location_key
+              AND minhash_similarity(a.minhash, b.minhash) >= %s
+            ORDER BY p.ord, p.earlier
+        )
+        UPDATE job_ingest_stage s SET near_ord = f.earlier
+        FROM firsts f
+        WHERE s.ord = f.ord
+    """, (NEAR_DUP_THRESHOLD,))
+
+    # a → b → c: everything points at the group's first job
+    while cur.rowcount:
+        cur.execute("""
+            UPDATE job_ingest_stage s SET near_ord = t.near_ord
+            FROM job_ingest_stage t
+            WHERE t.ord = s.near_ord
+              AND t.near_ord IS NOT NULL
+        """)
+
+
+def index_staged_postings(cur, posting_ids: list[str]):
+    """Store signatures + LSH buckets for postings this ingest inserted or rewrote."""
+    if not posting_ids:
+        return
+
+    # the stage row each posting was last written from (see the posting update)
+    applied = """
+        SELECT DISTINCT ON (posting_id) posting_id, ord
+        FROM job_ingest_stage
+        WHERE posting_id = ANY(%(ids)s::uuid[])
+        ORDER BY posting_id, last_ord DESC
+    """
+    sign_staged_jobs(cur, f"s.ord IN (SELECT ord FROM ({applied}) a)", {"ids": posting_ids})
+
+    cur.execute(f"""
+        DELETE FROM job_posting_lsh WHERE job_posting_id = ANY(%(ids)s::uuid[]);
+        DELETE FROM job_posting_minhash WHERE job_posting_id = ANY(%(ids)s::uuid[]);
+
+        INSERT INTO job_posting_minhash (job_posting_id, company_key, location_key, signature)
+        SELECT a.posting_id, g.company_key, g.location_key, g.minhash
+        FROM ({applied}) a
+        JOIN job_ingest_signatures g ON g.ord = a.ord
+        WHERE g.minhash IS NOT NULL;
+
+        INSERT INTO job_posting_lsh (bucket, job_posting_id)
+        SELECT DISTINCT unnest(g.lsh_buckets), a.posting_id
+        FROM ({applied}) a
+        JOIN job_ingest_signatures g ON g.ord = a.ord
+        WHERE g.lsh_buckets IS NOT NULL;
+    """, {"ids": posting_ids})
+
+
+def merge_staged_jobs(cur) -> tuple[dict, list[str]]:
+    """
+    Resolve every staged job to a posting and write it, set-based:
+
+      1. repeats of the same (source, external_id) in the batch collapse into one
+      2. exact match on (source, external_id)           → refreshed
+      3. otherwise newest posting with the canonical_key → merged
+      4. otherwise a near duplicate (MinHash / LSH, same company and
+         location) of an
+         existing posting → merged, along with the rest of its key
+      5. otherwise the first job per canonical_key is inserted unless it is
+         a near duplicate of an earlier one in the batch; the rest of the
+         batch merges into those
+      6. matched postings are rewritten from a job whose source row changed
+         (and whose content hash differs), the rest only get last_seen_at
+         bumped; source rows likewise
+
+    Exact and canonical matches come out as if the jobs were matched one at
+    a time in feed order. Returns the counts and the ids of postings that
+    were inserted or whose content changed — the only ones downstream
+    features, the TF-IDF index and the near-duplicate index need to recompute.
+    """
+    # temp tables are never auto-analyzed; without stats every join below is planned for ~50 rows
+    cur.execute("ANALYZE job_ingest_stage")
+
+    # a repeated job keeps its first position (which decides the insert
+    # below) with the values of its last occurrence: move the last one up,
+    # then drop the others (two statements — one would modify rows twice)
+    cur.execute("""
+        UPDATE job_ingest_stage s SET ord = f.first_ord
+        FROM (
+            SELECT source, external_id, min(ord) AS first_ord, max(last_ord) AS last_ord
+            FROM job_ingest_stage
+            GROUP BY source, external_id
+            HAVING count(*) > 1
+        ) f
+        WHERE f.source = s.source
+          AND f.external_id = s.external_id
+          AND f.last_ord = s.last_ord
+    """)
+    cur.execute("""
+        DELETE FROM job_ingest_stage s
+        USING job_ingest_stage t
+        WHERE t.source = s.source
+          AND t.external_id = s.external_id
+          AND t.last_ord > s.last_ord
+    """)
+    repeats = cur.rowcount
+
+    cur.execute("""
+        UPDATE job_ingest_stage s SET posting_id = jp.id, outcome = 'refreshed'
+        FROM (
+            SELECT DISTINCT ON (source, external_id) id, source, external_id
+            FROM job_postings
+            WHERE (source, external_id) IN (SELECT source, external_id FROM job_ingest_stage)
+            ORDER BY source, external_id, ingested_at DESC NULLS LAST
+        ) jp
+        WHERE jp.source = s.source
+          AND jp.external_id = s.external_id
+    """)
+
+    cur.execute("""
+        UPDATE job_ingest_stage s SET posting_id = jp.id, outcome = 'merged'
+        FROM (
+            SELECT DISTINCT ON (canonical_key) id, canonical_key
+            FROM job_postings
+            WHERE canonical_key IN (
+                SELECT canonical_key FROM job_ingest_stage WHERE posting_id IS NULL
+            )
+            ORDER BY canonical_key, ingested_at DESC NULLS LAST
+        ) jp
+        WHERE s.posting_id IS NULL
+          AND jp.canonical_key = s.canonical_key
+    """)
+
+    near_dups = 0
+    if NEAR_DUP_THRESHOLD > 0:
+        near_dups = merge_near_duplicates(cur)
+        link_near_duplicate_leaders(cur)
+
+    cur.execute("""
+        WITH leaders AS (
+            SELECT * FROM (
+                SELECT DISTINCT ON (canonical_key) *
+                FROM job_ingest_stage
+                WHERE posting_id IS NULL
+                ORDER BY canonical_key, ord
+            ) first_per_key
+            WHERE near_ord IS NULL
+        ), inserted AS (
+            INSERT INTO job_postings (
+                external_id,
+                source,
+                title,
+                company,
+                location,
+                url,
+                description,
+                raw_json,
+                ingested_at,
+                category,
+                location_raw,
+                location_normalized,
+                is_remote,
+                remote_type,
+                salary_text,
+                schedule_type,
+                posted_at_text,
+                apply_url,
+                source_job_key,
+                canonical_key,
+                last_seen_at,
+                content_hash,
+                content_updated_at,
+                posted_at
+            )
+            SELECT
+                external_id, source, title, company, location, url, description,
+                raw_json, now(), category, location_raw, location_normalized,
+                is_remote, remote_type, salary_text, schedule_type, posted_at_text,
+                apply_url, source_job_key, canonical_key, now(), content_hash, now(),
+                posted_at
+            FROM leaders
+            ORDER BY ord
+            RETURNING id, source, external_id
+        )
+        UPDATE job_ingest_stage s SET posting_id = i.id, outcome = 'inserted'
+        FROM inserted i
+        WHERE i.source = s.source
+          AND i.external_id = s.external_id
+    """)
+
+    cur.execute("""
+        UPDATE job_ingest_stage s SET posting_id = l.posting_id, outcome = 'merged', near_dup = true
+        FROM job_ingest_stage l
+        WHERE s.near_ord = l.ord
+    """)
+    near_dups += cur.rowcount
+
+    # the rest of each key follows its first job, inserted or near-merged
+    cur.execute("""
+        UPDATE job_ingest_stage s SET posting_id = l.posting_id, outcome = 'merged'
+        FROM job_ingest_stage l
+        WHERE s.posting_id IS NULL
+          AND (l.outcome = 'inserted' OR l.near_ord IS NOT NULL)
+          AND l.canonical_key = s.canonical_key
+    """)
+
+    # when several jobs land on one posting, the latest in the feed that
+    # changed at its source is applied (including a repeat of the job that
+    # inserted it). A job its source row already has, unchanged, is never
+    # applied: with two sources feeding one posting, each would otherwise
+    # overwrite the other's content (and hash) on every ingest.
+    cur.execute("""
+        UPDATE job_postings jp SET
+            title = coalesce(s.title, jp.title),
+            company = coalesce(s.company, jp.company),
+            location = coalesce(s.location, jp.location),
+            url = coalesce(s.url, jp.url),
+            description = case
+                when coalesce(length(s.description), 0) > coalesce(length(jp.description), 0) then s.description
+                else jp.description
+            end,
+            raw_json = s.raw_json,
+            category = coalesce(jp.category, s.category),
+            location_raw = coalesce(s.location_raw, jp.location_raw),
+            location_normalized = coalesce(s.location_normalized, jp.location_normalized),
+            is_remote = coalesce(s.is_remote, jp.is_remote),
+            remote_type = coalesce(s.remote_type, jp.remote_type),
+            salary_text = coalesce(s.salary_text, jp.salary_text),
+            schedule_type = coalesce(s.schedule_type, jp.schedule_type),
+            posted_at_text = coalesce(s.posted_at_text, jp.posted_at_text),
+            apply_url = coalesce(s.apply_url, jp.apply_url),
+            source_job_key = coalesce(s.source_job_key, jp.source_job_key),
+            canonical_key = coalesce(s.canonical_key, jp.canonical_key),
+            last_seen_at = now(),
+            content_hash = s.content_hash,
+            content_updated_at = now(),
+            posted_at = coalesce(jp.posted_at, s.posted_at)
+        FROM (
+            SELECT DISTINCT ON (st.posting_id) st.*
+            FROM job_ingest_stage st
+            LEFT JOIN job_posting_sources js
+              ON js.source = st.source
+             AND js.external_id = st.external_id
+            WHERE st.posting_id IN (SELECT posting_id FROM job_ingest_stage WHERE outcome <> 'inserted')
+              AND (js.job_posting_id, js.content_hash) IS DISTINCT FROM (st.posting_id, st.source_hash)
+            ORDER BY st.posting_id, st.last_ord DESC
+        ) s
+        WHERE jp.id = s.posting_id
+          AND jp.content_hash IS DISTINCT FROM s.content_hash
+        RETURNING jp.id::text
+    """)
+    changed_ids = [row["id"] for row in cur.fetchall()]
+
+    # everything else that was seen again: one narrow write (rows written
+    # above already have last_seen_at = now(), the transaction timestamp)
+    # (postings ingested before posted_at existed pick it up here; posted_at_text
+    # is refreshed in the same write but never counts as a change)
+    cur.execute("""
+        UPDATE job_postings jp SET
+            last_seen_at = now(),
+            posted_at_text = coalesce(s.posted_at_text, jp.posted_at_text),
+            posted_at = coalesce(jp.posted_at, s.posted_at)
+        FROM (
+            SELECT DISTINCT ON (posting_id) posting_id, posted_at_text, posted_at
+            FROM job_ingest_stage
+            WHERE outcome <> 'inserted'
+            ORDER BY posting_id, last_ord DESC
+        ) s
+        WHERE jp.id = s.posting_id
+          AND jp.last_seen_at IS DISTINCT FROM now()
+    """)
+    unchanged = cur.rowcount
+
+    cur.execute("""
+        INSERT INTO job_posting_sources (
             job_posting_id,
             source,
             external_id,
@@ -399,124 +1027,138 @@ def upsert_source_row(cur, job_posting_id: str, job: dict):
             source_url,
             apply_url,
             raw_json,
+            content_hash,
             fetched_at,
             created_at
-        ) values (
-            %s, %s, %s, %s, %s, %s, %s::jsonb, now(), now()
         )
-        on conflict (source, external_id)
-        do update set
+        SELECT posting_id, source, external_id, source_job_key, url, apply_url, raw_json, source_hash, now(), now()
+        FROM job_ingest_stage
+        ON CONFLICT (source, external_id)
+        DO UPDATE SET
             job_posting_id = excluded.job_posting_id,
             source_job_key = excluded.source_job_key,
             source_url = excluded.source_url,
             apply_url = excluded.apply_url,
             raw_json = excluded.raw_json,
+            content_hash = excluded.content_hash,
             fetched_at = now()
-        """,
-        (
-            job_posting_id,
-            job["source"],
-            job["external_id"],
-            job["source_job_key"],
-            job["url"],
-            job["apply_url"],
-            json.dumps(job["raw_json"]),
-        ),
-    )
+        WHERE (job_posting_sources.job_posting_id, job_posting_sources.content_hash)
+              IS DISTINCT FROM
+              (excluded.job_posting_id, excluded.content_hash)
+    """)
+
+    cur.execute("""
+        UPDATE job_posting_sources js SET fetched_at = now()
+        FROM job_ingest_stage s
+        WHERE js.source = s.source
+          AND js.external_id = s.external_id
+          AND js.fetched_at IS DISTINCT FROM now()
+    """)
+
+    cur.execute("""
+        SELECT outcome, count(*) AS n, array_agg(DISTINCT posting_id::text) AS ids
+        FROM job_ingest_stage
+        GROUP BY outcome
+    """)
+    counts = {"inserted": 0, "merged": 0, "refreshed": repeats, "unchanged": unchanged, "near_duplicates": near_dups}
+    touched_ids = set(changed_ids)
+    for row in cur.fetchall():
+        counts[row["outcome"]] += row["n"]
+        if row["outcome"] == "inserted":
+            touched_ids.update(row["ids"])
+
+    touched_ids = sorted(touched_ids)
+    if NEAR_DUP_THRESHOLD > 0:
+        index_staged_postings(cur, touched_ids)
+
+    return counts, touched_ids
+
+
+def ingest_job_batches(batches: Iterable[list[dict]]) -> dict:
+    """
+    COPY each batch into job_ingest_pending as it arrives, then merge all of
+    them at once — the writer side of stream_provider_pages.
+
+    Each batch gets its own short checkout and commit, so no pooled
+    connection or open transaction waits on the next upstream page. Only
+    the merge, once everything has arrived, holds one for longer.
+    """
+    run_id = str(uuid.uuid4())
+    received = 0
 
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            with connection() as conn:
+                cur = conn.cursor()
+                park_jobs(cur, run_id, batch, start=received)
+                conn.commit()
+                cur.close()
+            received += len(batch)
 
-def find_exact_posting(cur, job: dict):
-    cur.execute(
-        """
-        select id
-        from public.job_postings
-        where source = %s and external_id = %s
-        limit 1
-        """,
-        (job["source"], job["external_id"]),
-    )
-    return cur.fetchone()
-
-
-def find_canonical_posting(cur, job: dict):
-    cur.execute(
-        """
-        select id
-        from public.job_postings
-        where canonical_key = %s
-        order by ingested_at desc nulls last
-        limit 1
-        """,
-        (job["canonical_key"],),
-    )
-    return cur.fetchone()
+        if not received:
+            return {"received": 0, "inserted": 0, "merged": 0, "refreshed": 0, "unchanged": 0, "near_duplicates": 0}
 
+        with connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
 
-def ingest_normalized_jobs(normalized_jobs: list[dict], write_json: bool = True) -> dict:
-    if write_json:
-        with open("jobs_normalized.json", "w", encoding="utf-8") as f:
-            json.dump(normalized_jobs, f, indent=2)
+            try:
+                create_job_stage(cur)
+                unpark_jobs(cur, run_id)
 
-    received = len(normalized_jobs)
-    inserted = 0
-    merged = 0
-    refreshed = 0
+                # one COPY per batch + a handful of set-based statements instead of
+                # up to four round trips per job
+                counts, touched_ids = merge_staged_jobs(cur)
 
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+                # precompute cleaned text / skills / prefs once so agent runs don't have to
+                for ids in batched(touched_ids, INGEST_BATCH_SIZE):
+                    refresh_job_features(cur, ids)
 
-    try:
-        for job in normalized_jobs:
-            exact = find_exact_posting(cur, job)
-
-            if exact:
-                job_posting_id = str(exact["id"])
-                update_job_posting(cur, job_posting_id, job)
-                upsert_source_row(cur, job_posting_id, job)
-                refreshed += 1
-                continue
+                bump_versions(cur, "jobs")
+                conn.commit()
 
-            canonical = find_canonical_posting(cur, job)
-            if canonical:
-                job_posting_id = str(canonical["id"])
-                update_job_posting(cur, job_posting_id, job)
-                upsert_source_row(cur, job_posting_id, job)
-                merged += 1
-                continue
+            finally:
+                cur.close()
 
-            job_posting_id = insert_job_posting(cur, job)
-            upsert_source_row(cur, job_posting_id, job)
-            inserted += 1
+    except BaseException:
+        if received:
+            drop_parked_jobs(run_id)
+        raise
 
-        conn.commit()
+    invalidate("jobs")
 
-        return {
-            "received": received,
-            "inserted": inserted,
-            "merged": merged,
-            "refreshed": refreshed,
-        }
+    # keep the agent's TF-IDF index in step with the table (saved once, not per batch)
+    refresh_job_index(touched_ids, chunk_size=INGEST_BATCH_SIZE)
 
-    finally:
-        cur.close()
-        conn.close()
+    return {"received": received, **counts}
+
+
+def ingest_normalized_jobs(normalized_jobs: Iterable[dict], provider: str = "manual", snapshot: bool = True) -> dict:
+    batches = batched(normalized_jobs, INGEST_BATCH_SIZE)
+
+    # kept only once the merge has committed
+    with (snapshots.open_snapshot(provider) if snapshot else snapshots.Snapshot()) as sink:
+        summary = ingest_job_batches(snapshots.tee(batches, sink))
+    return {**summary, "snapshot": sink.name}
 
 
 @jobs_bp.route("/jobs/google/<user_id>", methods=["GET"])
 def fetch_google_jobs_for_user(user_id):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
     try:
-        cur.execute(
-            """
-            select preferences_json
-            from public.profiles
-            where user_id = %s
-            """,
-            (user_id,),
-        )
-        row = cur.fetchone()
+        # only the profile read needs a connection — don't hold one across SerpApi calls
+        with connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute(
+                """
+                select preferences_json
+                from public.profiles
+                where user_id = %s
+                """,
+                (user_id,),
+            )
+            row = cur.fetchone()
+            cur.close()
 
         if not row:
             return jsonify({
@@ -534,14 +1176,23 @@ def fetch_google_jobs_for_user(user_id):
         remote_only = prefs.get("remote")
         pages = max(1, min(request.args.get("pages", default=1, type=int), 5))
         ingest = str(request.args.get("ingest", "false")).lower() == "true"
+        refresh = str(request.args.get("refresh", "false")).lower() == "true"
 
-        raw_jobs = fetch_google_jobs(
-            job_type=job_type,
-            location=location,
-            remote_only=remote_only,
-            pages=pages,
-        )
-        normalized_jobs = [normalize_google_job(job) for job in raw_jobs]
+        normalized_jobs = []
+
+        def normalized_pages():
+            # each page is normalized (and, with ingest, staged) as it arrives
+            for page in iter_google_job_pages(job_type, location, remote_only, pages, refresh=refresh):
+                normalized = [normalize_google_job(job) for job in page]
+                normalized_jobs.extend(normalized)
+                yield normalized
+
+        summary = None
+        if ingest:
+            summary = ingest_job_batches(normalized_pages())
+        else:
+            for _ in normalized_pages():
+                pass
 
         response = {
             "status": "success",
@@ -555,8 +1206,7 @@ def fetch_google_jobs_for_user(user_id):
             "timestamp": now_iso(),
         }
 
-        if ingest:
-            summary = ingest_normalized_jobs(normalized_jobs, write_json=False)
+        if summary is not None:
             response["ingest_summary"] = summary
 
         return jsonify(response), 200
@@ -568,10 +1218,6 @@ def fetch_google_jobs_for_user(user_id):
             "timestamp": now_iso()
         }), 500
 
-    finally:
-        cur.close()
-        conn.close()
-
 
 @jobs_bp.route("/jobs/ingest", methods=["POST"])
 def jobs_ingest():
@@ -579,12 +1225,15 @@ def jobs_ingest():
 
     provider = str(data.get("provider", "remotive")).lower()
     limit = data.get("limit")
-    write_json = bool(data.get("write_json", True))
+    # "write_json" is the old name of the flag
+    snapshot = bool(data.get("snapshot", data.get("write_json", True)))
 
     job_type = data.get("job_type")
     location = data.get("location")
     remote_only = data.get("remote_only")
     pages = max(1, min(int(data.get("pages", 1)), 5))
+    # skip the fetch cache TTL (still revalidated with ETag / Last-Modified)
+    refresh = bool(data.get("refresh", False))
 
     if provider not in {"remotive", "google_jobs", "all"}:
         return jsonify({
@@ -593,41 +1242,55 @@ def jobs_ingest():
             "timestamp": now_iso()
         }), 400
 
-    try:
-        normalized_jobs: list[dict] = []
-        source_counts: dict[str, int] = {}
-
-        if provider in {"remotive", "all"}:
-            remotive_raw = fetch_remotive_jobs(limit=limit)
-            remotive_jobs = [normalize_remotive_job(job) for job in remotive_raw]
-            normalized_jobs.extend(remotive_jobs)
-            source_counts["Remotive"] = len(remotive_jobs)
-
-        if provider in {"google_jobs", "all"}:
-            if not job_type and not location:
-                return jsonify({
-                    "status": "failure",
-                    "message": "Google Jobs ingestion needs job_type or location",
-                    "timestamp": now_iso()
-                }), 400
-
-            google_raw = fetch_google_jobs(
+    if provider in {"google_jobs", "all"} and not job_type and not location:
+        return jsonify({
+            "status": "failure",
+            "message": "Google Jobs ingestion needs job_type or location",
+            "timestamp": now_iso()
+        }), 400
+
+    providers: dict[str, Provider] = {}
+    if provider in {"remotive", "all"}:
+        providers["Remotive"] = (lambda: iter_remotive_job_pages(limit=limit, refresh=refresh), normalize_remotive_job)
+    if provider in {"google_jobs", "all"}:
+        providers["GoogleJobs"] = (
+            lambda: iter_google_job_pages(
                 job_type=job_type,
                 location=location,
                 remote_only=remote_only,
                 pages=pages,
-            )
-            google_jobs = [normalize_google_job(job) for job in google_raw]
-            normalized_jobs.extend(google_jobs)
-            source_counts["GoogleJobs"] = len(google_jobs)
+                refresh=refresh,
+            ),
+            normalize_google_job,
+        )
 
-        summary = ingest_normalized_jobs(normalized_jobs, write_json=write_json)
+    try:
+        source_counts: dict[str, dict] = {}
+
+        # parse → normalize → COPY, one batch at a time: memory is bounded by
+        # INGEST_BATCH_SIZE, not by the size of the feeds
+        batches = stream_provider_pages(providers, source_counts)
+        # handed to a background writer — the request never waits on the disk;
+        # kept only once the merge has committed, discarded if the ingest fails
+        with (snapshots.open_snapshot(provider) if snapshot else snapshots.Snapshot()) as sink:
+            # pages are written to the stage while slower providers are still fetching
+            summary = ingest_job_batches(snapshots.tee(batches, sink))
+
+        if not summary["received"] and all("error" in counts for counts in source_counts.values()):
+            return jsonify({
+                "status": "failure",
+                "message": "; ".join(f"{name}: {counts['error']}" for name, counts in source_counts.items()),
+                "provider": provider,
+                "source_counts": source_counts,
+                "timestamp": now_iso()
+            }), 502
 
         return jsonify({
             "status": "success",
             "provider": provider,
             "source_counts": source_counts,
             **summary,
+            "snapshot": sink.name,
             "timestamp": now_iso()
         }), 200
 
@@ -639,51 +1302,213 @@ def jobs_ingest():
         }), 500
 
 
+def ensure_job_list_indexes():
+    """Run once at startup: indexes behind GET /jobs — its keyset order and each filter."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS job_postings_list_idx
+                    ON job_postings (ingested_at DESC, id DESC);
+
+                CREATE INDEX IF NOT EXISTS job_postings_list_remote_type_idx
+                    ON job_postings (remote_type, ingested_at DESC, id DESC);
+
+                CREATE INDEX IF NOT EXISTS job_postings_list_source_idx
+                    ON job_postings (source, ingested_at DESC, id DESC);
+
+                -- category is filtered as it is shown: falling back to schedule_type
+                DROP INDEX IF EXISTS job_postings_list_category_idx;
+                CREATE INDEX IF NOT EXISTS job_postings_list_shown_category_idx
+                    ON job_postings ((coalesce(category, schedule_type)), ingested_at DESC, id DESC);
+
+                CREATE INDEX IF NOT EXISTS job_postings_posted_at_idx
+                    ON job_postings (posted_at DESC);
+            """)
+            conn.commit()
+
+            backfill_ingested_at(cur)
+
+            # title / company substring filters still work without pg_trgm, just unindexed
+            try:
+                cur.execute("""
+                    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+                    CREATE INDEX IF NOT EXISTS job_postings_title_trgm_idx
+                        ON job_postings USING gin (title gin_trgm_ops);
+
+                    CREATE INDEX IF NOT EXISTS job_postings_company_trgm_idx
+                        ON job_postings USING gin (company gin_trgm_ops);
+                """)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+
+            cur.close()
+    except Exception:
+        pass
+
+
+def backfill_ingested_at(cur):
+    """
+    One-off: a NULL ingested_at would sit outside every keyset page, so fill
+    them in and default the column to now(). Once the default is set there
+    is nothing left to do, and later boots skip the table-wide UPDATE and
+    the ALTER's exclusive lock.
+    """
+    cur.execute("""
+        SELECT column_default FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'job_postings' AND column_name = 'ingested_at'
+    """)
+    row = cur.fetchone()
+    if not row or row[0] is not None:
+        return
+
+    try:
+        # don't hold up startup queued behind a long-running ingest
+        cur.execute("SET LOCAL lock_timeout = '5s'")
+        cur.execute("""
+            ALTER TABLE job_postings ALTER COLUMN ingested_at SET DEFAULT now();
+
+            UPDATE job_postings SET ingested_at = coalesce(last_seen_at, now())
+            WHERE ingested_at IS NULL;
+        """)
+        cur.connection.commit()
+    except Exception:
+        # tried again on the next start
+        cur.connection.rollback()
+
+
+def encode_cursor(ingested_at: datetime.datetime, job_id) -> str:
+    payload = json.dumps([ingested_at.isoformat(), str(job_id)])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, str]:
+    """Raises ValueError for anything encode_cursor didn't produce."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ingested_at, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(ingested_at), str(uuid.UUID(job_id))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def like_pattern(value: str) -> str:
+    """ILIKE pattern matching value as a plain substring."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
 @jobs_bp.route("/jobs", methods=["GET"])
+@cached_json(lambda: ["jobs"])
 def list_jobs():
+    """
+    Newest postings first, one keyset page at a time: pass the returned
+    next_cursor back as ?cursor= for the next page. Optional filters:
+    q (title or company), title, company (substrings), remote_type, source,
+    category (exact, against the category shown) and posted_after (ISO date).
+    """
     limit = request.args.get("limit", default=25, type=int)
     limit = max(1, min(limit, 200))
 
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    clauses, params = [], []
 
-    try:
-        cur.execute(
-            """
-            select
-                id,
-                external_id,
-                source,
-                title,
-                company,
-                coalesce(location_normalized, location) as location,
-                location_raw,
-                is_remote,
-                remote_type,
-                coalesce(category, schedule_type) as category,
-                coalesce(apply_url, url) as url,
-                salary_text,
-                posted_at_text,
-                ingested_at,
-                last_seen_at
-            from public.job_postings
-            order by ingested_at desc
-            limit %s
-            """,
-            (limit,),
-        )
-        rows = cur.fetchall()
+    q = (request.args.get("q") or "").strip()
+    if q:
+        clauses.append("(title ILIKE %s OR company ILIKE %s)")
+        params += [like_pattern(q)] * 2
 
-        return jsonify({
-            "status": "success",
-            "count": len(rows),
-            "jobs": rows,
-            "timestamp": now_iso()
-        }), 200
+    for column in ("title", "company"):
+        value = (request.args.get(column) or "").strip()
+        if value:
+            clauses.append(f"{column} ILIKE %s")
+            params.append(like_pattern(value))
 
-    finally:
-        cur.close()
-        conn.close()
+    # category as the response shows it, and as its index is built
+    for arg, column in (("remote_type", "remote_type"), ("source", "source"), ("category", "coalesce(category, schedule_type)")):
+        value = (request.args.get(arg) or "").strip()
+        if value:
+            clauses.append(f"{column} = %s")
+            params.append(value)
+
+    posted_after = (request.args.get("posted_after") or "").strip()
+    if posted_after:
+        try:
+            posted = datetime.datetime.fromisoformat(posted_after)
+        except ValueError:
+            return jsonify({
+                "status": "failure",
+                "message": "posted_after must be an ISO date, e.g. 2024-05-01",
+                "timestamp": now_iso()
+            }), 400
+        clauses.append("posted_at >= %s")
+        params.append(posted if posted.tzinfo else posted.replace(tzinfo=datetime.timezone.utc))
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            cursor_at, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({
+                "status": "failure",
+                "message": str(e),
+                "timestamp": now_iso()
+            }), 400
+        # seeks straight to the page in (ingested_at, id) order — no OFFSET
+        clauses.append("(ingested_at, id) < (%s, %s::uuid)")
+        params += [cursor_at, cursor_id]
+
+    where = f"where {' and '.join(clauses)}" if clauses else ""
+
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        try:
+            cur.execute(
+                f"""
+                select
+                    id,
+                    external_id,
+                    source,
+                    title,
+                    company,
+                    coalesce(location_normalized, location) as location,
+                    location_raw,
+                    is_remote,
+                    remote_type,
+                    coalesce(category, schedule_type) as category,
+                    coalesce(apply_url, url) as url,
+                    salary_text,
+                    posted_at_text,
+                    posted_at,
+                    ingested_at,
+                    last_seen_at
+                from public.job_postings
+                {where}
+                order by ingested_at desc, id desc
+                limit %s
+                """,
+                (*params, limit + 1),
+            )
+            rows = cur.fetchall()
+
+            # the extra row only says whether there is another page
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1]["ingested_at"], rows[-1]["id"])
+
+            return jsonify({
+                "status": "success",
+                "count": len(rows),
+                "jobs": rows,
+                "next_cursor": next_cursor,
+                "timestamp": now_iso()
+            }), 200
+
+        finally:
+            cur.close()
 
 
 @jobs_bp.route("/fetch-jobs", methods=["GET"])
@@ -0,0 +1,48 @@
+"""orjson-backed JSON for every jsonify / request.get_json in the app.
+
+orjson serializes datetimes, dates, UUIDs and numpy scalars itself, so rows
+straight from RealDictCursor can be returned as-is. Datetimes come out as
+ISO 8601, not Flask's default HTTP-date format. Decimals become strings,
+like Flask's own provider. Response bodies are built as bytes without
+going through a str first.
+"""
+import dataclasses
+import decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(o):
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def _dump_bytes(self, obj, sort_keys: bool = False, indent=None) -> bytes:
+        option = OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._dump_bytes(obj, kwargs.get("sort_keys", False), kwargs.get("indent")).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # pretty-printed in debug, like Flask's default provider
+        return self._app.response_class(self._dump_bytes(obj, indent=self._app.debug), mimetype=self.mimetype)
@@ -0,0 +1,148 @@
+"""Process-wide LLM client shared by the agent rerank, /tailor and drafts.
+
+One client per process keeps its HTTP connection pool (and TLS sessions)
+alive across calls. Every call gets the LLM_TIMEOUT_SECONDS timeout, and
+transient failures (timeouts, connection errors, 429 / 5xx) are retried
+LLM_MAX_RETRIES times with exponential backoff and jitter.
+
+LLM_BACKEND picks the implementation:
+- "gemini" (default): google-genai, model GEMINI_MODEL
+- "fake": canned, schema-shaped responses per purpose, no network — for
+  tests and offline benchmarks (LLM_FAKE_LATENCY_SECONDS simulates latency)
+"""
+import json
+import random
+import re
+import threading
+import time
+
+import httpx
+from google import genai
+from google.genai import errors, types
+
+import config
+
+
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self):
+        if not config.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY is not set")
+        self.client = genai.Client(
+            api_key=config.GEMINI_API_KEY,
+            http_options=types.HttpOptions(timeout=int(config.LLM_TIMEOUT_SECONDS * 1000)),
+        )
+
+    @property
+    def model(self) -> str:
+        return config.GEMINI_MODEL
+
+    def generate(self, prompt: str, response_schema: dict | None = None, purpose: str | None = None) -> str:
+        options = None
+        if response_schema is not None:
+            options = {
+                "response_mime_type": "application/json",
+                "response_json_schema": response_schema,
+            }
+
+        res = self.client.models.generate_content(model=self.model, contents=prompt, config=options)
+        return res.text or ""
+
+    @staticmethod
+    def is_transient(exc: Exception) -> bool:
+        if isinstance(exc, httpx.TransportError):
+            return True
+        return isinstance(exc, errors.APIError) and (exc.code == 429 or (exc.code or 0) >= 500)
+
+
+class FakeBackend:
+    name = "fake"
+    model = "fake"
+
+    def generate(self, prompt: str, response_schema: dict | None = None, purpose: str | None = None) -> str:
+        if config.LLM_FAKE_LATENCY_SECONDS:
+            time.sleep(config.LLM_FAKE_LATENCY_SECONDS)
+
+        if purpose == "rerank":
+            ids = re.findall(r'"id": "([^"]+)"', prompt)
+            return json.dumps([
+                {"job_postings_id": jid, "score": 50, "rationale": "fake rerank"}
+                for jid in ids
+            ])
+
+        if purpose == "tailor":
+            return json.dumps({
+                "tailored_resume": "fake tailored resume",
+                "cover_letter": "fake cover letter",
+                "rationale": "fake rationale",
+                "match_score": 50,
+            })
+
+        if purpose == "draft":
+            return json.dumps({
+                "resume_markdown": "# Fake resume",
+                "cover_letter_markdown": "Fake cover letter.",
+                "notes": {
+                    "job_title": "",
+                    "company": "",
+                    "match_summary": "fake draft",
+                    "key_skills_emphasized": [],
+                },
+            })
+
+        return "{}"
+
+    @staticmethod
+    def is_transient(exc: Exception) -> bool:
+        return False
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the process-wide backend, creating it on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = (config.LLM_BACKEND or "gemini").lower()
+            if name not in BACKENDS:
+                raise ValueError(f"unknown LLM_BACKEND: {name}")
+            _backend = BACKENDS[name]()
+        return _backend
+
+
+def model_name() -> str:
+    """Model id the current backend generates with (part of cache keys / manifests)."""
+    if (config.LLM_BACKEND or "gemini").lower() == "fake":
+        return FakeBackend.model
+    return config.GEMINI_MODEL
+
+
+def provider_name() -> str:
+    return (config.LLM_BACKEND or "gemini").lower()
+
+
+def generate(prompt: str, response_schema: dict | None = None, purpose: str | None = None) -> str:
+    """
+    Generate text for prompt with the configured backend, retrying transient
+    errors with exponential backoff. purpose ("rerank", "tailor", "draft")
+    only matters to the fake backend.
+    """
+    backend = get_backend()
+
+    for attempt in range(config.LLM_MAX_RETRIES + 1):
+        try:
+            return backend.generate(prompt, response_schema=response_schema, purpose=purpose)
+        except Exception as e:
+            if attempt >= config.LLM_MAX_RETRIES or not backend.is_transient(e):
+                raise
+            delay = config.LLM_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay))
@@ -1,10 +1,10 @@
 from flask import Blueprint, jsonify, request
 import datetime
 import json
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
-from config import DATABASE_URL
+from database import connection
+from services.response_cache import bump_versions, cached_json, invalidate
 
 
 profiles_bp = Blueprint("profiles", __name__)
@@ -28,36 +28,38 @@ def upsert_profile():
         }), 400
 
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
-
-        cur.execute(
-            """
-            INSERT INTO users (id, email, first_name, last_name, created_at)
-            VALUES (gen_random_uuid(), %s, %s, %s, now())
-            ON CONFLICT (email) DO UPDATE
-              SET first_name = COALESCE(EXCLUDED.first_name, users.first_name),
-                  last_name = COALESCE(EXCLUDED.last_name, users.last_name)
-            RETURNING id;
-            """,
-            (email, first_name, last_name),
-        )
-        user_id = cur.fetchone()[0]
-
-        cur.execute(
-            """
-            INSERT INTO profiles (user_id, resume_text, preferences_json)
-            VALUES (%s, %s, %s::jsonb)
-            ON CONFLICT (user_id) DO UPDATE
-              SET resume_text = EXCLUDED.resume_text,
-                  preferences_json = EXCLUDED.preferences_json;
-            """,
-            (user_id, resume_text, json.dumps(preferences)),
-        )
-
-        conn.commit()
-        cur.close()
-        conn.close()
+        with connection() as conn:
+            cur = conn.cursor()
+
+            cur.execute(
+                """
+                INSERT INTO users (id, email, first_name, last_name, created_at)
+                VALUES (gen_random_uuid(), %s, %s, %s, now())
+                ON CONFLICT (email) DO UPDATE
+                  SET first_name = COALESCE(EXCLUDED.first_name, users.first_name),
+                      last_name = COALESCE(EXCLUDED.last_name, users.last_name)
+                RETURNING id;
+                """,
+                (email, first_name, last_name),
+            )
+            user_id = cur.fetchone()[0]
+
+            cur.execute(
+                """
+                INSERT INTO profiles (user_id, resume_text, preferences_json)
+                VALUES (%s, %s, %s::jsonb)
+                ON CONFLICT (user_id) DO UPDATE
+                  SET resume_text = EXCLUDED.resume_text,
+                      preferences_json = EXCLUDED.preferences_json;
+                """,
+                (user_id, resume_text, json.dumps(preferences)),
+            )
+
+            bump_versions(cur, f"profile:{user_id}")
+            conn.commit()
+            cur.close()
+
+        invalidate(f"profile:{user_id}")
 
         return jsonify({
             "status": "success",
@@ -75,23 +77,23 @@ def upsert_profile():
 
 
 @profiles_bp.route("/profiles/<user_id>", methods=["GET"])
+@cached_json(lambda user_id: [f"profile:{user_id}"])
 def get_profile(user_id):
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        cur.execute(
-            """
-            SELECT user_id, resume_text, preferences_json
-            FROM profiles
-            WHERE user_id = %s
-            """,
-            (user_id,),
-        )
-        row = cur.fetchone()
-
-        cur.close()
-        conn.close()
+        with connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+
+            cur.execute(
+                """
+                SELECT user_id, resume_text, preferences_json
+                FROM profiles
+                WHERE user_id = %s
+                """,
+                (user_id,),
+            )
+            row = cur.fetchone()
+
+            cur.close()
 
         if not row:
             return jsonify({
@@ -0,0 +1,158 @@
+"""Conditional GETs and a small body cache for read-heavy JSON endpoints.
+
+Every cached resource is described by version keys ("jobs",
+"applications:<user_id>", "profile:<user_id>") whose counters live in
+resource_versions. Writers bump them in the same transaction as the write:
+
+    bump_versions(cur, f"applications:{user_id}")
+    conn.commit()
+    invalidate(f"applications:{user_id}")
+
+The ETag of a response is derived from its URL and the versions of its keys.
+Versions are read from Postgres at most once per RESPONSE_CACHE_TTL_SECONDS
+per process (a write made here is seen immediately, one made by another
+process within the TTL). Within that window a request whose If-None-Match
+still matches gets a 304 without touching the database, and a request
+without one is answered from the cached body while its versions are unchanged.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable
+
+from flask import Response, make_response, request
+
+import config
+from database import connection
+
+# cached bodies are re-rendered at least this often, even if no version moved
+BODY_MAX_AGE_SECONDS = 60
+
+
+def ensure_resource_versions_table():
+    """Run once at startup to create the version counters."""
+    try:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS resource_versions (
+                    key        TEXT PRIMARY KEY,
+                    version    BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+            """)
+            conn.commit()
+            cur.close()
+    except Exception:
+        pass
+
+
+def bump_versions(cur, *keys: str):
+    """Advance the version of each key inside the caller's transaction."""
+    cur.execute("""
+        INSERT INTO resource_versions (key, version)
+        SELECT unnest(%s::text[]), 1
+        ON CONFLICT (key) DO UPDATE SET
+            version = resource_versions.version + 1,
+            updated_at = now()
+    """, (sorted(set(keys)),))
+
+
+_lock = threading.Lock()
+_versions: dict[str, tuple[int, float]] = {}   # key → (version, read at)
+_bodies: OrderedDict[str, tuple[str, bytes, str, float]] = OrderedDict()  # url → (etag, body, mimetype, stored at)
+_stats = {"not_modified": 0, "hits": 0, "misses": 0, "version_reads": 0}
+
+
+def invalidate(*keys: str):
+    """Forget cached versions of keys, so the next request re-reads them (call after commit)."""
+    with _lock:
+        for key in keys:
+            _versions.pop(key, None)
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "bodies": len(_bodies)}
+
+
+def _current_versions(keys: list[str]) -> list[int]:
+    now = time.monotonic()
+    known = {}
+    with _lock:
+        for key in keys:
+            entry = _versions.get(key)
+            if entry and now - entry[1] < config.RESPONSE_CACHE_TTL_SECONDS:
+                known[key] = entry[0]
+
+    stale = [k for k in keys if k not in known]
+    if stale:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT key, version FROM resource_versions WHERE key = ANY(%s)", (stale,))
+            fetched = dict(cur.fetchall())
+            cur.close()
+
+        with _lock:
+            _stats["version_reads"] += 1
+            for key in stale:
+                known[key] = fetched.get(key, 0)
+                _versions[key] = (known[key], now)
+
+    return [known[k] for k in keys]
+
+
+def _tagged(response: Response, etag: str) -> Response:
+    # no-cache: browsers may keep the body but must revalidate it with If-None-Match
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def cached_json(version_keys: Callable[..., list[str] | None]):
+    """
+    Decorate a GET view whose 200 body depends only on the URL and the
+    resources named by version_keys(**view_args). Returning None from
+    version_keys (e.g. a required parameter is missing) bypasses the cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = version_keys(**kwargs)
+            if keys is None or config.RESPONSE_CACHE_TTL_SECONDS <= 0:
+                return view(*args, **kwargs)
+
+            url = request.full_path
+            versions = _current_versions(keys)
+            etag = hashlib.sha1(f"{url}|{keys}|{versions}".encode("utf-8")).hexdigest()[:20]
+
+            if request.if_none_match.contains_weak(etag):
+                with _lock:
+                    _stats["not_modified"] += 1
+                return _tagged(Response(status=304), etag)
+
+            now = time.monotonic()
+            with _lock:
+                entry = _bodies.get(url)
+                if entry and entry[0] == etag and now - entry[3] < BODY_MAX_AGE_SECONDS:
+                    _bodies.move_to_end(url)
+                    _stats["hits"] += 1
+                    return _tagged(Response(entry[1], mimetype=entry[2]), etag)
+                _stats["misses"] += 1
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                with _lock:
+                    _bodies[url] = (etag, response.get_data(), response.mimetype, now)
+                    _bodies.move_to_end(url)
+                    while len(_bodies) > config.RESPONSE_CACHE_MAX_ENTRIES:
+                        _bodies.popitem(last=False)
+                _tagged(response, etag)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,273 @@
+"""Ingest snapshots: a copy of every normalized job an ingest run wrote.
+
+Each run gets its own gzip-compressed NDJSON file under SNAPSHOT_DIR, named
+<UTC timestamp>-<provider>-<run id>.ndjson.gz. The request thread only hands
+batches to a queue. One background thread serializes, compresses and writes
+them, so ingest never waits on the disk. If the writer falls behind by more
+than SNAPSHOT_QUEUE_MAX batches, later batches are dropped from the snapshot
+rather than slowing the request down. Files are written under a .partial name
+and renamed only once the ingest's merge has committed; a run that fails
+discards its file, so every snapshot matches what the database took in.
+After each run the directory is pruned to the newest SNAPSHOT_KEEP files and
+SNAPSHOT_MAX_TOTAL_MB.
+
+The sink is chosen with SNAPSHOT_SINK ("ndjson", or "none" to turn snapshots
+off). Other sinks can be added with register_sink().
+"""
+import atexit
+import datetime
+import gzip
+import json
+import queue
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import config
+
+# finish-the-file / throw-it-away markers on the writer queue
+_CLOSE = object()
+_DISCARD = object()
+
+# .partial files older than this were left by a process that died mid-write
+STALE_PARTIAL_SECONDS = 24 * 3600
+
+_stats = {"files": 0, "jobs": 0, "dropped_batches": 0, "truncated": 0, "errors": 0, "discarded": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome: str, n: int = 1):
+    with _stats_lock:
+        _stats[outcome] += n
+
+
+def stats() -> dict:
+    with _stats_lock:
+        return {**_stats, "pending_batches": _writer.pending}
+
+
+class Snapshot:
+    """
+    Sink for one ingest run. write(), close() and discard() must not block
+    on I/O. Used as a context manager, it is closed when the block succeeds
+    and discarded when it raises. The base class discards everything
+    (SNAPSHOT_SINK=none).
+    """
+    name: str | None = None
+
+    def write(self, batch: list[dict]):
+        pass
+
+    def close(self):
+        pass
+
+    def discard(self):
+        """The run failed: drop whatever was written instead of keeping it."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class NDJSONSnapshot(Snapshot):
+    """One job per line, gzip-compressed, written by the background writer."""
+
+    def __init__(self, provider: str):
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        label = re.sub(r"[^a-z0-9_]+", "-", provider.lower()).strip("-") or "ingest"
+        self.name = f"{stamp}-{label}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+        self.path = Path(config.SNAPSHOT_DIR) / self.name
+        self.max_bytes = config.SNAPSHOT_MAX_FILE_MB * 1024 * 1024
+
+        # touched only by the writer thread
+        self._tmp = self.path.with_name(f"{self.name}.partial")
+        self._raw = None
+        self._gz = None
+        self._failed = False
+        self._truncated = False
+
+    def write(self, batch: list[dict]):
+        _writer.submit(self, batch)
+
+    def close(self):
+        _writer.submit(self, _CLOSE)
+
+    def discard(self):
+        _writer.submit(self, _DISCARD)
+
+    # ── writer thread ──
+
+    def _append(self, batch: list[dict]):
+        if self._failed or self._truncated:
+            return
+        if self._gz is None:
+            self._tmp.parent.mkdir(parents=True, exist_ok=True)
+            self._raw = open(self._tmp, "wb")
+            self._gz = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=5)
+
+        written = 0
+        for job in batch:
+            # compressed bytes on disk so far (lags the compressor by a block)
+            if self._raw.tell() >= self.max_bytes:
+                self._truncated = True
+                _count("truncated")
+                break
+            self._gz.write(json.dumps(job, default=str, separators=(",", ":")).encode("utf-8"))
+            self._gz.write(b"\n")
+            written += 1
+        _count("jobs", written)
+
+    def _finish(self):
+        if self._gz is None:
+            return  # nothing was ingested — no file
+        try:
+            self._gz.close()
+        finally:
+            self._raw.close()
+        if self._failed:
+            self._tmp.unlink(missing_ok=True)
+            return
+        self._tmp.replace(self.path)
+        _count("files")
+        prune()
+
+    def _fail(self):
+        self._failed = True
+        if self._gz is not None:
+            try:
+                self._finish()
+            except Exception:
+                self._tmp.unlink(missing_ok=True)
+            self._gz = None
+
+
+class _Writer:
+    """Single daemon thread draining (snapshot, batch) items in order."""
+
+    def __init__(self):
+        # unbounded so close markers always get through; batches are capped via pending
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.pending = 0
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, snapshot: NDJSONSnapshot, item):
+        self._start()
+        if item is not _CLOSE and item is not _DISCARD:
+            with self._lock:
+                if self.pending >= config.SNAPSHOT_QUEUE_MAX:
+                    _count("dropped_batches")
+                    return
+                self.pending += 1
+        self._queue.put((snapshot, item))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything submitted so far is on disk."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put((None, done))
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            snapshot, item = self._queue.get()
+            if snapshot is None:
+                item.set()
+                continue
+
+            try:
+                if item is _CLOSE:
+                    snapshot._finish()
+                elif item is _DISCARD:
+                    _count("discarded")
+                    snapshot._fail()
+                else:
+                    snapshot._append(item)
+            except Exception:
+                _count("errors")
+                snapshot._fail()
+            finally:
+                if item is not _CLOSE and item is not _DISCARD:
+                    with self._lock:
+                        self.pending -= 1
+
+
+_writer = _Writer()
+# give queued batches a moment to land on a clean shutdown
+atexit.register(_writer.flush, 5)
+
+flush = _writer.flush
+
+
+def prune():
+    """Keep the newest SNAPSHOT_KEEP snapshots within SNAPSHOT_MAX_TOTAL_MB."""
+    root = Path(config.SNAPSHOT_DIR)
+    if not root.is_dir():
+        return
+
+    now = time.time()
+    for partial in root.glob("*.partial"):
+        try:
+            if now - partial.stat().st_mtime > STALE_PARTIAL_SECONDS:
+                partial.unlink()
+        except OSError:
+            pass
+
+    files = []
+    for path in root.glob("*.ndjson.gz"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+    files.sort(reverse=True)
+
+    budget = config.SNAPSHOT_MAX_TOTAL_MB * 1024 * 1024
+    total = 0
+    for i, (_, size, path) in enumerate(files):
+        total += size
+        if i >= config.SNAPSHOT_KEEP or total > budget:
+            path.unlink(missing_ok=True)
+
+
+SINKS: dict[str, Callable[[str], Snapshot]] = {
+    "ndjson": NDJSONSnapshot,
+    "none": lambda provider: Snapshot(),
+}
+
+
+def register_sink(name: str, factory: Callable[[str], Snapshot]):
+    SINKS[name] = factory
+
+
+def open_snapshot(provider: str) -> Snapshot:
+    try:
+        factory = SINKS[config.SNAPSHOT_SINK]
+    except KeyError:
+        raise ValueError(f"unknown SNAPSHOT_SINK {config.SNAPSHOT_SINK!r} (one of: {', '.join(SINKS)})")
+    return factory(provider)
+
+
+def tee(batches: Iterable[list[dict]], snapshot: Snapshot) -> Iterator[list[dict]]:
+    """
+    Pass batches through, handing each one to snapshot. Leaves it open: the
+    caller closes it once the batches are committed, or discards it.
+    """
+    for batch in batches:
+        snapshot.write(batch)
+        yield batch
@@ -1,9 +1,8 @@
 from flask import Blueprint, jsonify, request
 import datetime
 import json
-import psycopg2
 
-from config import DATABASE_URL
+from database import connection
 
 
 submit_bp = Blueprint('submit', __name__)
@@ -26,32 +25,31 @@ def submit_user_info():
         }), 400
 
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
+        with connection() as conn:
+            cur = conn.cursor()
 
-        # 1. insert into users
-        cur.execute(
-            """
-            INSERT INTO users (id, email, first_name, last_name, created_at)
-            VALUES (gen_random_uuid(), %s, %s, %s, NOW())
-            RETURNING id
-            """,
-            (email, first_name, last_name)
-        )
-        user_id = cur.fetchone()[0]
+            # 1. insert into users
+            cur.execute(
+                """
+                INSERT INTO users (id, email, first_name, last_name, created_at)
+                VALUES (gen_random_uuid(), %s, %s, %s, NOW())
+                RETURNING id
+                """,
+                (email, first_name, last_name)
+            )
+            user_id = cur.fetchone()[0]
 
-        # 2. insert into profiles
-        cur.execute(
-            """
-            INSERT INTO profiles (user_id, resume_text, preferences_json)
-            VALUES (%s, %s, %s)
-            """,
-            (user_id, resume_text, json.dumps(preferences) if preferences else '{}')
-        )
+            # 2. insert into profiles
+            cur.execute(
+                """
+                INSERT INTO profiles (user_id, resume_text, preferences_json)
+                VALUES (%s, %s, %s)
+                """,
+                (user_id, resume_text, json.dumps(preferences) if preferences else '{}')
+            )
 
-        conn.commit()
-        cur.close()
-        conn.close()
+            conn.commit()
+            cur.close()
 
         return jsonify({
             "status": "success",
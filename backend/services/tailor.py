@@ -1,26 +1,14 @@
 import json
 import re
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from flask import Blueprint, jsonify, request
-from google import genai
-
-import config
+from database import connection
+from services import llm
 
 tailor_bp = Blueprint("tailor", __name__)
 
 
-def _get_db():
-    return psycopg2.connect(config.DATABASE_URL)
-
-
-def _gemini():
-    if not config.GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY is not set")
-    return genai.Client(api_key=config.GEMINI_API_KEY)
-
-
 def _strip_fences(text: str) -> str:
     text = text.strip()
     text = re.sub(r"^```[a-zA-Z0-9_-]*\n?", "", text)
@@ -44,17 +32,17 @@ def generate():
 
     # ── fetch profile ──
     try:
-        conn = _get_db()
-        cur  = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT u.first_name, u.last_name, u.email,
-                   p.resume_text
-            FROM users u
-            JOIN profiles p ON p.user_id = u.id
-            WHERE u.id = %s
-        """, (user_id,))
-        row = cur.fetchone()
-        cur.close(); conn.close()
+        with connection() as conn:
+            cur  = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("""
+                SELECT u.first_name, u.last_name, u.email,
+                       p.resume_text
+                FROM users u
+                JOIN profiles p ON p.user_id = u.id
+                WHERE u.id = %s
+            """, (user_id,))
+            row = cur.fetchone()
+            cur.close()
     except Exception as e:
         return jsonify({"status": "error", "message": f"db error: {e}"}), 500
 
@@ -110,12 +98,7 @@ Return a JSON object with exactly these keys:
 
 Output valid JSON only — no markdown, no code fences."""
     try:
-        client = _gemini()
-        res = client.models.generate_content(
-            model=config.GEMINI_MODEL,
-            contents=prompt,
-        )
-        text = _strip_fences(res.text or "")
+        text = _strip_fences(llm.generate(prompt, purpose="tailor"))
         try:
             payload = json.loads(text)
         except json.JSONDecodeError:
@@ -124,7 +107,7 @@ Output valid JSON only — no markdown, no code fences."""
                 raise ValueError("no JSON in response")
             payload = json.loads(m.group())
     except Exception as e:
-        return jsonify({"status": "error", "message": f"Gemini error: {e}"}), 500
+        return jsonify({"status": "error", "message": f"LLM error: {e}"}), 500
 
     return jsonify({
         "status":         "success",
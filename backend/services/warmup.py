@@ -0,0 +1,101 @@
+"""Startup warm-up for the agent pipeline.
+
+Loads everything the first /agent request would otherwise pay for — the
+compiled LangGraph, the skill matcher, the TF-IDF index + vectorizer, the
+first pooled database connections and the LLM client — in a background
+thread so the server starts accepting requests straight away. GET /health/ready reports progress and per-step timings.
+"""
+import threading
+import time
+
+# app import time, so /health/ready can report how long startup took
+PROCESS_STARTED = time.perf_counter()
+
+_state = {
+    "status": "pending",  # pending | warming | ready | failed
+    "steps": {},
+    "errors": {},
+    "startup_seconds": None,
+}
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+
+
+def _warm_graph():
+    from graph.graph_builder import get_graph
+    get_graph()
+
+
+def _warm_skill_matcher():
+    from graph.skills import extract_skills
+    extract_skills("warm up python")
+
+
+def _warm_job_index():
+    from graph.job_index import get_job_index
+    index = get_job_index()
+    # first transform pulls in the rest of scikit-learn / scipy
+    index.similarities("warm up", index.ids[:1])
+
+
+def _warm_db_pool():
+    from database import get_pool
+    get_pool().fill()
+
+
+def _warm_llm_client():
+    from services.llm import get_backend
+    get_backend()
+
+
+# (name, fn, required) — optional steps may fail without blocking readiness
+STEPS = [
+    ("graph", _warm_graph, True),
+    ("skill_matcher", _warm_skill_matcher, True),
+    ("job_index", _warm_job_index, True),
+    ("db_pool", _warm_db_pool, True),
+    ("llm_client", _warm_llm_client, False),
+]
+
+
+def warm_up() -> dict:
+    with _lock:
+        _state["status"] = "warming"
+
+    failed = False
+    for name, fn, required in STEPS:
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            with _lock:
+                _state["errors"][name] = str(e)
+            failed = failed or required
+        with _lock:
+            _state["steps"][name] = round(time.perf_counter() - started, 3)
+
+    with _lock:
+        _state["status"] = "failed" if failed else "ready"
+        _state["startup_seconds"] = round(time.perf_counter() - PROCESS_STARTED, 3)
+    return status()
+
+
+def start_warm_up():
+    """Kick off warm_up() in a daemon thread (once per process)."""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    _thread.start()
+
+
+def status() -> dict:
+    with _lock:
+        return {
+            "status": _state["status"],
+            "ready": _state["status"] == "ready",
+            "steps": dict(_state["steps"]),
+            "errors": dict(_state["errors"]),
+            "startup_seconds": _state["startup_seconds"],
+        }
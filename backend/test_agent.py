@@ -1,5 +1,6 @@
-from graph.graph_builder import extract_skills, clean_text
-from services.db import DATABASE_URL
+from graph.skills import extract_skills
+from graph.text import clean_text
+from config import DATABASE_URL
 import psycopg2
 
 
@@ -0,0 +1,101 @@
+import uuid
+
+import pytest
+
+import config
+from database import connection
+from services.agent_runs import _claim_next, _requeue_stale, enqueue_run
+
+
+def _queue(cur, user_id: str, created_at: str, **columns) -> str:
+    names = ["user_id", "created_at", *columns]
+    cur.execute(
+        f"INSERT INTO agent_runs ({', '.join(names)}) VALUES ({', '.join(['%s'] * len(names))}) RETURNING id",
+        (user_id, created_at, *columns.values()),
+    )
+    return str(cur.fetchone()[0])
+
+
+def _row(cur, run_id: str) -> tuple:
+    cur.execute("SELECT status, attempts, error, finished_at FROM agent_runs WHERE id = %s", (run_id,))
+    return cur.fetchone()
+
+
+def test_claim_takes_oldest_queued_run_once(db_cursor, test_user):
+    # older than anything a real queue holds, so these are claimed first
+    second = _queue(db_cursor, test_user, "1970-01-02")
+    first = _queue(db_cursor, test_user, "1970-01-01")
+    _queue(db_cursor, test_user, "1969-12-31", status="succeeded")
+
+    assert _claim_next(db_cursor) == (first, test_user)
+    assert _claim_next(db_cursor) == (second, test_user)
+    assert _row(db_cursor, first)[:2] == ("running", 1)
+
+
+def test_stale_running_run_is_requeued(db_cursor, test_user):
+    run_id = _queue(db_cursor, test_user, "1970-01-01", status="running", attempts=1)
+    fresh = _queue(db_cursor, test_user, "1970-01-01", status="running", attempts=1)
+    db_cursor.execute(
+        "UPDATE agent_runs SET updated_at = now() - %s * interval '2 minutes' WHERE id = %s",
+        (config.AGENT_RUN_STALE_MINUTES, run_id),
+    )
+
+    assert _requeue_stale(db_cursor) >= 1
+    assert _row(db_cursor, run_id)[:2] == ("queued", 1)
+    assert _row(db_cursor, fresh)[0] == "running"
+
+
+def test_run_out_of_attempts_fails_instead_of_requeueing(db_cursor, test_user):
+    run_id = _queue(db_cursor, test_user, "1970-01-01", status="running", attempts=config.AGENT_RUN_MAX_ATTEMPTS)
+    db_cursor.execute(
+        "UPDATE agent_runs SET updated_at = now() - %s * interval '2 minutes' WHERE id = %s",
+        (config.AGENT_RUN_STALE_MINUTES, run_id),
+    )
+
+    _requeue_stale(db_cursor)
+    status, attempts, error, finished_at = _row(db_cursor, run_id)
+    assert status == "failed"
+    assert "attempts" in error
+    assert finished_at is not None
+
+
+@pytest.fixture
+def committed_user(db_cursor, monkeypatch):
+    """A user enqueue_run's own connections can see; removed (with its runs) afterwards."""
+    monkeypatch.setattr(config, "AGENT_WORKERS", 0)
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO users (id, email, first_name, created_at) VALUES (gen_random_uuid(), %s, 'Test', now()) RETURNING id",
+            (f"pytest-{uuid.uuid4().hex}@example.com",),
+        )
+        user_id = str(cur.fetchone()[0])
+        conn.commit()
+
+    yield user_id
+
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
+        conn.commit()
+
+
+def test_join_active_reuses_the_users_unfinished_run(committed_user):
+    first = enqueue_run(committed_user, join_active=True)
+    assert enqueue_run(committed_user, join_active=True) == first
+    # POST /agent {"async": true} still queues a run of its own
+    assert enqueue_run(committed_user) != first
+
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("UPDATE agent_runs SET status = 'succeeded' WHERE user_id = %s", (committed_user,))
+        conn.commit()
+
+    assert enqueue_run(committed_user, join_active=True) != first
+
+
+def test_join_active_rejects_unknown_users(db_cursor):
+    with pytest.raises(LookupError):
+        enqueue_run("not-a-uuid", join_active=True)
+    with pytest.raises(LookupError):
+        enqueue_run(str(uuid.uuid4()), join_active=True)
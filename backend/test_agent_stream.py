@@ -0,0 +1,57 @@
+import psycopg2
+import pytest
+from flask import Flask
+
+import config
+from services import agent_stream
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """GET /agent/stream for one queued run, with get_run swapped per test."""
+    monkeypatch.setattr(agent_stream, "enqueue_run", lambda user_id, join_active=False: "run-1")
+    monkeypatch.setattr(agent_stream, "POLL_SECONDS", 0)
+
+    app = Flask(__name__)
+    app.register_blueprint(agent_stream.agent_stream_bp)
+    client = app.test_client()
+
+    def run(get_run) -> list[str]:
+        monkeypatch.setattr(agent_stream, "get_run", get_run)
+        body = client.get("/agent/stream?user_id=u").get_data(as_text=True)
+        return [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+
+    return run
+
+
+def test_stream_gives_up_after_consecutive_db_errors(stream):
+    calls = []
+
+    def get_run(run_id):
+        calls.append(run_id)
+        raise psycopg2.OperationalError("server closed the connection")
+
+    assert stream(get_run) == ["start", "error"]
+    assert len(calls) == agent_stream.MAX_POLL_ERRORS
+
+
+def test_stream_ends_with_an_error_after_its_deadline(stream, monkeypatch):
+    monkeypatch.setattr(config, "AGENT_STREAM_MAX_SECONDS", 0.05)
+    queued = {"status": "queued", "attempts": 0, "progress": None}
+
+    assert stream(lambda run_id: queued) == ["start", "error"]
+
+
+def test_a_recovered_read_resets_the_error_count(stream):
+    replies = iter([psycopg2.OperationalError("down")] * (agent_stream.MAX_POLL_ERRORS - 1)
+                   + [{"status": "running", "attempts": 1, "progress": None}]
+                   + [psycopg2.OperationalError("down")] * (agent_stream.MAX_POLL_ERRORS - 1)
+                   + [{"status": "succeeded", "attempts": 1, "progress": None, "result": {}}])
+
+    def get_run(run_id):
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    assert stream(get_run) == ["start", "result"]
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import config
+from services import fetch_cache
+
+URL = "https://example.com/feed"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: bytes = b"", headers: dict | None = None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.text = body.decode("utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), size):
+            yield self.body[i:i + size]
+
+
+class FakeHttp:
+    """Answers from a list of responses and records the headers of each request."""
+
+    def __init__(self, *responses: FakeResponse, gate: threading.Event | None = None):
+        self.responses = list(responses)
+        self.requests = []
+        self.gate = gate
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        self.requests.append(dict(headers or {}))
+        if self.gate:
+            self.gate.wait(5)
+        return self.responses.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "FETCH_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_within_the_ttl_no_request_is_sent():
+    http = FakeHttp(FakeResponse(200, b'{"jobs": [1]}'))
+    assert fetch_cache.get_json("p", URL, ttl=60, http=http) == {"jobs": [1]}
+    assert fetch_cache.get_json("p", URL, ttl=60, http=http) == {"jobs": [1]}
+    assert len(http.requests) == 1
+
+
+def test_stale_entries_are_revalidated_with_their_validators():
+    http = FakeHttp(
+        FakeResponse(200, b'{"jobs": [1]}', {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        FakeResponse(304),
+        FakeResponse(200, b'{"jobs": [2]}', {"ETag": '"v2"'}),
+    )
+    before = fetch_cache.stats()["revalidated"]
+
+    assert fetch_cache.get_json("p", URL, ttl=0, http=http) == {"jobs": [1]}
+    # 304: the cached body is served again
+    assert fetch_cache.get_json("p", URL, ttl=0, http=http) == {"jobs": [1]}
+    assert http.requests[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert fetch_cache.stats()["revalidated"] == before + 1
+
+    # changed upstream: the new body replaces the old one
+    assert fetch_cache.get_json("p", URL, ttl=0, http=http) == {"jobs": [2]}
+
+
+def test_errors_are_not_cached():
+    http = FakeHttp(FakeResponse(500, b"boom"), FakeResponse(200, b'{"ok": true}'))
+    with pytest.raises(fetch_cache.UpstreamError):
+        fetch_cache.get_json("p", URL, ttl=60, http=http)
+    assert fetch_cache.get_json("p", URL, ttl=60, http=http) == {"ok": True}
+
+
+def test_identical_requests_in_flight_share_one_fetch():
+    gate = threading.Event()
+    http = FakeHttp(FakeResponse(200, b'{"jobs": []}'), gate=gate)
+    before = fetch_cache.stats()["coalesced"]
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(fetch_cache.fetch("p", URL, ttl=60, http=http))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    # let the followers find the owner's fetch before it completes
+    deadline = time.monotonic() + 5
+    while fetch_cache.stats()["coalesced"] < before + 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    gate.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(http.requests) == 1
+    assert len(results) == 3 and len(set(results)) == 1
+
+
+def _entry(cache_dir, key: str, size: int, age_hours: float):
+    meta, body = cache_dir / f"{key}.meta.json", cache_dir / f"{key}.body"
+    body.write_bytes(b"x" * size)
+    meta.write_text(json.dumps({"fetched_at": 0}))
+    stamp = time.time() - age_hours * 3600
+    os.utime(meta, (stamp, stamp))
+    return meta, body
+
+
+def test_prune_drops_expired_and_over_budget_entries(cache_dir, monkeypatch):
+    monkeypatch.setattr(config, "FETCH_CACHE_MAX_AGE_HOURS", 24)
+    monkeypatch.setattr(config, "FETCH_CACHE_MAX_TOTAL_MB", 2.5)
+    mb = 1024 * 1024
+
+    newest = _entry(cache_dir, "newest", mb, 1)
+    newer = _entry(cache_dir, "newer", mb, 2)
+    over_budget = _entry(cache_dir, "over-budget", mb, 3)
+    expired = _entry(cache_dir, "expired", 10, 48)
+    orphan = cache_dir / "orphan.body"
+    orphan.write_bytes(b"x")
+    stamp = time.time() - 2 * fetch_cache.STALE_TMP_SECONDS
+    os.utime(orphan, (stamp, stamp))
+
+    fetch_cache.prune()
+
+    assert all(p.exists() for p in (*newest, *newer))
+    assert not any(p.exists() for p in (*over_budget, *expired, orphan))
+
+
+def test_every_download_prunes(cache_dir, monkeypatch):
+    monkeypatch.setattr(config, "FETCH_CACHE_MAX_AGE_HOURS", 24)
+    expired = _entry(cache_dir, "expired", 10, 48)
+
+    fetch_cache.fetch("p", URL, ttl=60, http=FakeHttp(FakeResponse(200, b"{}")))
+
+    assert not any(p.exists() for p in expired)
+    assert fetch_cache._read_meta(fetch_cache.cache_key("p", URL, None)) is not None
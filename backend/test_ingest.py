@@ -0,0 +1,161 @@
+import uuid
+
+from psycopg2.extras import RealDictCursor
+
+from services.jobs import STAGE_COLUMNS, _stage_row, create_job_stage, merge_staged_jobs, normalize_google_job, stage_jobs
+
+CONTENT_HASH = len(STAGE_COLUMNS) + 3
+
+
+def _google_job(
+    posted: str = "3 days ago",
+    description: str = "Build data pipelines in Python and SQL.",
+    job_id: str = "g-1",
+    title: str = "Data Engineer",
+) -> dict:
+    return normalize_google_job({
+        "job_id": job_id,
+        "title": title,
+        "company_name": "PerfCo Ingest",
+        "location": "Anywhere",
+        "description": description,
+        "extensions": [posted, "Full-time", "Work from home"],
+        "detected_extensions": {"posted_at": posted, "schedule_type": "Full-time", "work_from_home": True},
+        "share_link": f"https://example.com/jobs/{job_id}",
+    })
+
+
+def test_posting_age_is_not_part_of_the_content_hash():
+    today, tomorrow = _google_job("3 days ago"), _google_job("4 days ago")
+    assert today["posted_at_text"] != tomorrow["posted_at_text"]
+    assert _stage_row(0, today)[CONTENT_HASH] == _stage_row(0, tomorrow)[CONTENT_HASH]
+    assert _stage_row(0, today)[CONTENT_HASH + 1] == _stage_row(0, tomorrow)[CONTENT_HASH + 1]
+
+
+def test_real_changes_are_part_of_the_content_hash():
+    before, after = _google_job(), _google_job(description="Build data pipelines in Rust.")
+    assert _stage_row(0, before)[CONTENT_HASH] != _stage_row(0, after)[CONTENT_HASH]
+
+
+def _ingest(cur, jobs: list[dict]) -> dict:
+    create_job_stage(cur)
+    stage_jobs(cur, jobs)
+    counts, _ = merge_staged_jobs(cur)
+    return counts
+
+
+def test_reingesting_an_unchanged_posting_is_a_no_op(db_cursor):
+    cur = db_cursor.connection.cursor(cursor_factory=RealDictCursor)
+    job_id = f"pytest-{uuid.uuid4().hex}"
+
+    assert _ingest(cur, [_google_job("3 days ago", job_id=job_id)])["inserted"] == 1
+    # the whole test is one transaction (one now()), so move the first ingest back a day
+    cur.execute("""
+        UPDATE job_postings SET
+            last_seen_at = last_seen_at - interval '1 day',
+            content_updated_at = content_updated_at - interval '1 day'
+        WHERE external_id = %s
+        RETURNING content_updated_at
+    """, (job_id,))
+    first_update = cur.fetchone()["content_updated_at"]
+
+    # next day: only the posting age moved
+    counts = _ingest(cur, [_google_job("4 days ago", job_id=job_id)])
+    assert counts["unchanged"] == 1
+    assert counts["inserted"] == counts["merged"] == 0
+
+    cur.execute("SELECT content_updated_at, posted_at_text FROM job_postings WHERE external_id = %s", (job_id,))
+    row = cur.fetchone()
+    assert row["content_updated_at"] == first_update
+    assert row["posted_at_text"] == "4 days ago"
+
+    create_job_stage(cur)
+    stage_jobs(cur, [_google_job("4 days ago", description="Now with Kafka.", job_id=job_id)])
+    _, touched_ids = merge_staged_jobs(cur)
+    assert len(touched_ids) == 1
+
+    cur.execute("SELECT content_updated_at FROM job_postings WHERE external_id = %s", (job_id,))
+    assert cur.fetchone()["content_updated_at"] > first_update
+
+
+def test_no_connection_is_held_while_the_next_batch_is_fetched(db_cursor):
+    from database import connection, get_pool
+    from services.jobs import ensure_ingest_schema, ingest_job_batches
+
+    ensure_ingest_schema()
+    pool = get_pool()
+    job_ids = [f"pytest-{uuid.uuid4().hex}" for _ in range(3)]
+    titles = ["Data Engineer", "Site Reliability Engineer", "Frontend Developer"]
+    held_between_batches = []
+
+    def batches():
+        for job_id, title in zip(job_ids, titles):
+            # stands in for the upstream fetch of the next page
+            held_between_batches.append(pool.stats()["in_use"])
+            yield [_google_job(job_id=job_id, title=title, description=f"{title} work.")]
+
+    try:
+        summary = ingest_job_batches(batches())
+        assert summary["received"] == 3 and summary["inserted"] == 3
+        assert held_between_batches == [0, 0, 0]
+    finally:
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT id FROM job_postings WHERE external_id = ANY(%s)", (job_ids,))
+            ids = [r[0] for r in cur.fetchall()]
+            for table in ("job_matches", "job_posting_features", "job_posting_sources"):
+                cur.execute(f"DELETE FROM {table} WHERE job_posting_id = ANY(%s::uuid[])", (ids,))
+            cur.execute("DELETE FROM job_postings WHERE id = ANY(%s::uuid[])", (ids,))
+            cur.execute("SELECT count(*) FROM job_ingest_pending")
+            assert cur.fetchone()[0] == 0
+            conn.commit()
+            cur.close()
+
+
+def test_a_repeated_job_keeps_its_first_position_and_its_last_values(db_cursor):
+    cur = db_cursor.connection.cursor(cursor_factory=RealDictCursor)
+    first_id, other_id = f"pytest-{uuid.uuid4().hex}", f"pytest-{uuid.uuid4().hex}"
+    # same title / company / location: one canonical_key, so the earliest job in the feed is inserted
+    counts = _ingest(cur, [
+        _google_job(job_id=first_id, description="First version."),
+        _google_job(job_id=other_id, description="Another listing of the same job."),
+        _google_job(job_id=first_id, description="Second, longer version of the first job."),
+    ])
+    assert counts["inserted"] == 1 and counts["merged"] == 1 and counts["refreshed"] == 1
+
+    cur.execute("SELECT external_id, description FROM job_postings WHERE external_id = ANY(%s)", ([first_id, other_id],))
+    rows = cur.fetchall()
+    assert [(r["external_id"], r["description"]) for r in rows] == [(first_id, "Second, longer version of the first job.")]
+
+
+def test_a_posting_fed_by_two_sources_is_unchanged_when_neither_changed(db_cursor):
+    cur = db_cursor.connection.cursor(cursor_factory=RealDictCursor)
+    first_id, other_id = f"pytest-{uuid.uuid4().hex}", f"pytest-{uuid.uuid4().hex}"
+    first = _google_job(job_id=first_id, description="Build data pipelines in Python and SQL.")
+    other = _google_job(job_id=other_id, description="Build data pipelines in Python, SQL and dbt.")
+
+    # two feeds, one canonical_key: one posting with two source rows
+    assert _ingest(cur, [first])["inserted"] == 1
+    assert _ingest(cur, [other])["merged"] == 1
+    cur.execute("""
+        UPDATE job_postings SET content_updated_at = content_updated_at - interval '1 day'
+        WHERE external_id = %s
+        RETURNING content_updated_at
+    """, (first_id,))
+    first_update = cur.fetchone()["content_updated_at"]
+
+    # each feed comes round again, unchanged
+    for job in (first, other, first):
+        create_job_stage(cur)
+        stage_jobs(cur, [job])
+        counts, touched_ids = merge_staged_jobs(cur)
+        assert counts["inserted"] == 0 and touched_ids == []
+
+    cur.execute("SELECT content_updated_at FROM job_postings WHERE external_id = %s", (first_id,))
+    assert cur.fetchone()["content_updated_at"] == first_update
+
+    # a real change at either source is still applied
+    create_job_stage(cur)
+    stage_jobs(cur, [_google_job(job_id=first_id, description="Build data pipelines in Rust.")])
+    _, touched_ids = merge_staged_jobs(cur)
+    assert len(touched_ids) == 1
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+import config
+from graph import job_index
+from graph.job_index import JobIndex
+
+DOCS = [
+    ("a", "python backend engineer postgres"),
+    ("b", "frontend react typescript developer"),
+    ("c", "data engineer spark airflow python"),
+]
+
+
+@pytest.fixture(autouse=True)
+def index_path(tmp_path, monkeypatch):
+    path = tmp_path / "job_index.pkl"
+    monkeypatch.setattr(config, "JOB_INDEX_PATH", str(path))
+    monkeypatch.setattr(job_index, "_index", None)
+    monkeypatch.setattr(job_index, "_refit_pending", None)
+    return path
+
+
+def test_saves_during_upserts_are_consistent(index_path):
+    index = JobIndex()
+    index.fit(DOCS)
+    stop = threading.Event()
+
+    def churn():
+        i = 0
+        while not stop.is_set():
+            index.upsert([(f"new-{i}", "python engineer"), ("a", f"python backend {i}")])
+            i += 1
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(20):
+            index.save(index_path)
+            loaded = JobIndex.load(index_path)
+            assert loaded is not None
+            assert loaded.matrix.shape[0] == len(loaded.ids) == len(loaded.rows)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert not list(index_path.parent.glob("*.tmp"))
+
+
+def test_refit_runs_off_the_ingest_path(index_path, monkeypatch):
+    index = JobIndex()
+    index.fit(DOCS[:1])
+    job_index._index = index
+
+    corpus = dict(DOCS)
+    monkeypatch.setattr(job_index, "_fetch_documents", lambda ids=None: [
+        (jid, text) for jid, text in corpus.items() if ids is None or jid in ids
+    ])
+
+    release = threading.Event()
+    build = job_index.build_job_index
+
+    def slow_build():
+        release.wait(5)
+        return build()
+
+    monkeypatch.setattr(job_index, "build_job_index", slow_build)
+
+    started = time.perf_counter()
+    job_index.refresh_job_index(["b", "c"])
+    assert time.perf_counter() - started < 2
+    # the incremental index serves (and was saved) while the refit waits
+    assert job_index._index is index and "c" in index.rows
+    assert JobIndex.load(index_path).rows.keys() == {"a", "b", "c"}
+
+    # ingested while the refit runs: must survive the swap
+    corpus["d"] = "rust systems engineer"
+    job_index.refresh_job_index(["d"])
+    release.set()
+
+    deadline = time.monotonic() + 5
+    while job_index._refit_pending is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    refitted = job_index._index
+    assert refitted is not index
+    assert refitted.rows.keys() == {"a", "b", "c", "d"}
+    assert refitted.fitted_size >= 3
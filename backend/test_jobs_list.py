@@ -0,0 +1,105 @@
+import base64
+import datetime
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+
+import config
+from services import jobs
+from services.json_provider import OrjsonProvider
+
+
+def test_cursor_round_trip():
+    at = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    job_id = uuid.uuid4()
+    cursor = jobs.encode_cursor(at, job_id)
+
+    assert "=" not in cursor
+    assert jobs.decode_cursor(cursor) == (at, str(job_id))
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    base64.urlsafe_b64encode(b'["2024-05-01T00:00:00", "not-a-uuid"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "00000000-0000-0000-0000-000000000000"]').decode(),
+])
+def test_decode_cursor_rejects_anything_encode_cursor_did_not_make(cursor):
+    with pytest.raises(ValueError):
+        jobs.decode_cursor(cursor)
+
+
+def test_like_pattern_treats_wildcards_literally():
+    assert jobs.like_pattern("100%_c\\") == "%100\\%\\_c\\\\%"
+
+
+@pytest.fixture
+def client(db_cursor, monkeypatch):
+    """GET /jobs against the test transaction, with the response cache off."""
+    @contextmanager
+    def test_connection():
+        yield db_cursor.connection
+
+    monkeypatch.setattr(jobs, "connection", test_connection)
+    monkeypatch.setattr(config, "RESPONSE_CACHE_TTL_SECONDS", 0)
+
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    app.register_blueprint(jobs.jobs_bp)
+    return app.test_client()
+
+
+@pytest.fixture
+def postings(db_cursor) -> str:
+    company = f"PerfCo List {uuid.uuid4().hex[:8]}"
+    rows = [
+        ("Backend Engineer", "remote", "Remotive", "Software Development", None, "2024-05-03"),
+        ("Data Engineer", "onsite", "google_jobs", "Data", "Full-time", "2024-04-20"),
+        ("Frontend Engineer", "remote", "google_jobs", "Software Development", None, None),
+        ("QA Engineer", "onsite", "google_jobs", None, "Contractor", None),
+    ]
+    for title, remote_type, source, category, schedule_type, posted_at in rows:
+        db_cursor.execute("""
+            INSERT INTO job_postings (title, company, remote_type, source, category, schedule_type, posted_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (title, company, remote_type, source, category, schedule_type, posted_at))
+    return company
+
+
+def _titles(client, **args) -> list[str]:
+    r = client.get("/jobs", query_string={"limit": 200, **args})
+    assert r.status_code == 200, r.get_json()
+    return sorted(job["title"] for job in r.get_json()["jobs"])
+
+
+def test_filters(client, postings):
+    company = postings
+    assert _titles(client, company=company) == ["Backend Engineer", "Data Engineer", "Frontend Engineer", "QA Engineer"]
+    assert _titles(client, company=company, remote_type="remote") == ["Backend Engineer", "Frontend Engineer"]
+    assert _titles(client, company=company, source="google_jobs", category="Data") == ["Data Engineer"]
+    # category is matched as shown: schedule_type stands in when there is none
+    assert _titles(client, company=company, category="Contractor") == ["QA Engineer"]
+    assert _titles(client, company=company, category="Full-time") == []
+    assert _titles(client, q=company, title="end eng") == ["Backend Engineer", "Frontend Engineer"]
+    assert _titles(client, company=company, posted_after="2024-05-01") == ["Backend Engineer"]
+
+
+def test_keyset_pages_cover_every_row_once(client, postings):
+    # all three share one ingested_at (one transaction), so pages split on id
+    seen, cursor = [], None
+    while True:
+        args = {"company": postings, "limit": 1, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/jobs", query_string=args).get_json()
+        seen += [job["id"] for job in body["jobs"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 4
+
+
+def test_bad_parameters_are_rejected(client):
+    assert client.get("/jobs?cursor=nope").status_code == 400
+    assert client.get("/jobs?posted_after=last-week").status_code == 400
@@ -0,0 +1,83 @@
+import datetime
+from contextlib import contextmanager
+
+import pytest
+
+from services import llm  # noqa: F401  (services before graph_builder, as app.py imports them)
+from graph import graph_builder
+from graph.match_store import load_reusable_matches
+
+
+class _NoCommit:
+    """The test transaction, handed to code that commits — its commits are no-ops."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def persist(db_cursor, monkeypatch):
+    @contextmanager
+    def test_connection():
+        yield _NoCommit(db_cursor.connection)
+
+    monkeypatch.setattr(graph_builder, "connection", test_connection)
+
+    def run(user_id: str, fingerprint: str, scored: list[tuple[str, float]], incremental_since=None):
+        graph_builder.persist_results_node({
+            "user_id": user_id,
+            "user_profile": {"user_id": user_id},
+            "profile_fingerprint": fingerprint,
+            "watermark": datetime.datetime.now(datetime.timezone.utc),
+            "incremental_since": incremental_since,
+            "scored_jobs": [{
+                "job_postings_id": job_id,
+                "score": score,
+                "rationale": f"{fingerprint} rationale",
+                "heuristic_score": score,
+                "heuristic_rationale": f"{fingerprint} rationale",
+            } for job_id, score in scored],
+        })
+
+    return run
+
+
+def _postings(cur, n: int) -> list[str]:
+    ids = []
+    for i in range(n):
+        cur.execute(
+            "INSERT INTO job_postings (title, company, ingested_at) VALUES (%s, 'PerfCo Matches', now() - interval '1 day') RETURNING id",
+            (f"Posting {i}",),
+        )
+        ids.append(str(cur.fetchone()[0]))
+    return ids
+
+
+def test_profile_change_does_not_bring_back_old_matches(db_cursor, test_user, persist):
+    a, b = _postings(db_cursor, 2)
+    cutoff = datetime.datetime.now(datetime.timezone.utc)
+
+    persist(test_user, "old-profile", [(a, 70.0), (b, 60.0)])
+
+    # new resume: b is no longer a candidate, so the full run doesn't score it
+    persist(test_user, "new-profile", [(a, 55.0)])
+
+    reused, _ = load_reusable_matches(db_cursor, test_user, cutoff)
+    assert [(str(m["job_postings_id"]), m["heuristic_score"]) for m in reused] == [(a, 55.0)]
+
+
+def test_incremental_runs_keep_rows_they_did_not_rescore(db_cursor, test_user, persist):
+    a, b = _postings(db_cursor, 2)
+    cutoff = datetime.datetime.now(datetime.timezone.utc)
+
+    persist(test_user, "profile", [(a, 70.0), (b, 60.0)])
+    persist(test_user, "profile", [(a, 71.0)], incremental_since=cutoff)
+
+    reused, _ = load_reusable_matches(db_cursor, test_user, cutoff)
+    assert sorted(m["heuristic_score"] for m in reused) == [60.0, 71.0]
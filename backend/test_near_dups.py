@@ -0,0 +1,134 @@
+import random
+import re
+import uuid
+
+import pytest
+from psycopg2.extras import RealDictCursor
+
+from graph.near_dups import SHINGLE_WORDS, company_key, location_key, lsh_buckets, minhash_signature, near_dup_keys
+from services import jobs
+from services.jobs import create_job_stage, merge_staged_jobs, normalize_google_job, stage_jobs
+
+WORDS = ("build scale operate data platform services python postgres kafka team customers "
+         "reliable pipelines streaming batch analytics warehouse modelling cloud deploy monitor "
+         "incident review design mentor roadmap quality testing latency throughput storage").split()
+
+
+def _text(seed: int, n: int = 150) -> list[str]:
+    rng = random.Random(seed)
+    return [rng.choice(WORDS) for _ in range(n)]
+
+
+def _edit(words: list[str], every: int) -> list[str]:
+    return [f"edited{i}" if i % every == 0 else w for i, w in enumerate(words)]
+
+
+def _jaccard(a: str, b: str) -> float:
+    def shingles(text):
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        return {tuple(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def _similarity(a, b) -> float:
+    return float((a == b).mean())
+
+
+def test_signature_similarity_estimates_jaccard():
+    base = " ".join(_text(1))
+    near = " ".join(_edit(_text(1), 75))
+    far = " ".join(_text(2))
+
+    sig = minhash_signature("Data Engineer", base)
+    assert _similarity(sig, minhash_signature("Data Engineer", base)) == 1.0
+    assert abs(_similarity(sig, minhash_signature("Data Engineer", near)) - _jaccard(base, near)) < 0.12
+    assert _similarity(sig, minhash_signature("Data Engineer", far)) < 0.3
+
+
+def test_short_or_companyless_postings_are_never_matched():
+    assert minhash_signature("Engineer", "short text") is None
+    assert near_dup_keys("Data Engineer", None, "Remote", "remote", " ".join(_text(1)))[2:] == (None, None)
+    assert near_dup_keys("Data Engineer", "Acme", "Remote", "remote", "too short")[2:] == (None, None)
+
+
+def test_buckets_are_scoped_to_the_company_and_location():
+    sig = minhash_signature("Data Engineer", " ".join(_text(1)))
+    assert company_key("Acme, Inc.") == company_key("ACME inc") == "acme inc"
+    assert location_key("Remote, US", "remote") == location_key("Anywhere", "remote") == "remote"
+    assert location_key("New York, NY", "onsite") == "new york ny"
+    assert lsh_buckets("acme inc", "remote", sig) == lsh_buckets("acme inc", "remote", sig.copy())
+    assert not set(lsh_buckets("acme inc", "remote", sig)) & set(lsh_buckets("globex", "remote", sig))
+    assert not set(lsh_buckets("acme inc", "new york ny", sig)) & set(lsh_buckets("acme inc", "austin tx", sig))
+
+
+def _job(title: str, company: str, words: list[str], location: str = "Anywhere") -> dict:
+    return normalize_google_job({
+        "job_id": f"pytest-{uuid.uuid4().hex}",
+        "title": title,
+        "company_name": company,
+        "location": location,
+        "description": " ".join(words),
+        "extensions": [],
+        "detected_extensions": {},
+    })
+
+
+@pytest.fixture
+def ingest(db_cursor, monkeypatch):
+    monkeypatch.setattr(jobs, "NEAR_DUP_THRESHOLD", 0.8)
+    cur = db_cursor.connection.cursor(cursor_factory=RealDictCursor)
+
+    def run(batch: list[dict]) -> dict:
+        create_job_stage(cur)
+        stage_jobs(cur, batch)
+        counts, _ = merge_staged_jobs(cur)
+        return counts
+
+    return run
+
+
+def test_near_duplicates_merge_above_the_threshold_only(ingest):
+    company = f"PerfCo NearDup {uuid.uuid4().hex[:8]}"
+    words = _text(7)
+    assert ingest([_job("Senior Data Engineer", company, words)])["inserted"] == 1
+
+    # different title (another canonical_key), nearly the same text
+    near = ingest([_job("Sr. Data Engineer", company, _edit(words, 75))])
+    assert near["near_duplicates"] == 1 and near["inserted"] == 0
+
+    # heavily rewritten: below the threshold
+    assert ingest([_job("Data Engineer II", company, _edit(words, 4))])["inserted"] == 1
+
+    # same text from another employer is never a duplicate
+    other = ingest([_job("Senior Data Engineer", f"{company} Rival", words)])
+    assert other["inserted"] == 1 and other["near_duplicates"] == 0
+
+
+def test_the_same_role_in_other_offices_is_kept(ingest):
+    company = f"PerfCo NearDup {uuid.uuid4().hex[:8]}"
+    words = _text(13)
+    assert ingest([_job("Data Engineer", company, words, location="New York, NY")])["inserted"] == 1
+
+    # one template, posted per office (and once remote): all distinct postings
+    counts = ingest([
+        _job("Data Engineer - Austin", company, _edit(words, 75), location="Austin, TX"),
+        _job("Data Engineer - Denver", company, _edit(words, 75), location="Denver, CO"),
+        _job("Data Engineer (Remote)", company, _edit(words, 75), location="Remote, US"),
+    ])
+    assert counts["inserted"] == 3 and counts["near_duplicates"] == 0
+
+    # a repost at an office that already has it still merges
+    again = ingest([_job("Sr. Data Engineer", company, _edit(words, 75), location="Austin, TX")])
+    assert again["near_duplicates"] == 1 and again["inserted"] == 0
+
+
+def test_near_duplicates_within_one_feed_insert_once(ingest):
+    company = f"PerfCo NearDup {uuid.uuid4().hex[:8]}"
+    words = _text(11)
+    counts = ingest([
+        _job("Platform Engineer", company, words),
+        _job("Platform Engineer (Contract)", company, _edit(words, 75), location="Remote, US"),
+    ])
+    assert counts["inserted"] == 1
+    assert counts["near_duplicates"] == 1
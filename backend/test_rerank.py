@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+# services first, the way app.py imports them (agent_stream imports graph_builder)
+from services import llm
+from graph import graph_builder
+
+
+def _chunk(*ids):
+    return [{"id": i, "title": f"job {i}", "description": ""} for i in ids]
+
+
+def test_rerank_chunk_drops_items_without_a_numeric_score(monkeypatch):
+    reply = [
+        {"job_postings_id": "a", "score": 80, "rationale": "good"},
+        {"job_postings_id": "b", "score": "72.5"},
+        {"job_postings_id": "c"},
+        {"job_postings_id": "d", "score": "high"},
+        {"job_postings_id": "e", "score": None},
+        {"job_postings_id": "f", "score": True},
+        {"job_postings_id": "zzz", "score": 90},
+        "not an object",
+    ]
+    monkeypatch.setattr(llm, "generate", lambda prompt, purpose=None: json.dumps(reply))
+
+    result = graph_builder._rerank_chunk("resume", _chunk("a", "b", "c", "d", "e", "f"))
+
+    assert result == {
+        "a": {"job_postings_id": "a", "score": 80.0, "rationale": "good"},
+        "b": {"job_postings_id": "b", "score": 72.5, "rationale": ""},
+    }
+
+
+def test_rerank_chunk_rejects_non_list_reply(monkeypatch):
+    monkeypatch.setattr(llm, "generate", lambda prompt, purpose=None: '{"score": 1}')
+
+    with pytest.raises(ValueError):
+        graph_builder._rerank_chunk("resume", _chunk("a"))
@@ -0,0 +1,61 @@
+import uuid
+
+from psycopg2.extras import RealDictCursor
+
+from graph.features import refresh_job_features
+from graph.retrieval import candidate_clauses, skill_search_query, symbol_skills
+from services.jobs import create_job_stage, merge_staged_jobs, normalize_google_job, stage_jobs
+
+
+def test_symbol_skills_stay_out_of_the_tsquery():
+    query = skill_search_query({"c++", "c#", "node.js"})
+    assert '"cpp"' in query and '"csharp"' in query and '"node.js"' in query
+    assert '"c++"' not in query and '"c#"' not in query and '".net"' not in query
+    assert symbol_skills({"c++", "c#", "node.js", "python"}) == ["c#", "c++"]
+
+
+def _posting(title: str, description: str, location: str = "Anywhere") -> dict:
+    return normalize_google_job({
+        "job_id": f"pytest-{uuid.uuid4().hex}",
+        "title": title,
+        "company_name": f"PerfCo Retrieval {uuid.uuid4().hex[:8]}",
+        "location": location,
+        "description": description,
+        "extensions": [],
+        "detected_extensions": {},
+    })
+
+
+def _candidates(cur, skills, preferences, titles) -> set[str]:
+    where, order, params = candidate_clauses(skills, preferences)
+    cur.execute(f"""
+        SELECT jp.title FROM job_postings jp
+        WHERE ({where}) AND jp.title = ANY(%(titles)s)
+        ORDER BY {order}
+    """, {**params, "titles": titles})
+    return {r["title"] for r in cur.fetchall()}
+
+
+def test_candidates_match_symbol_skills_and_preferences(db_cursor):
+    cur = db_cursor.connection.cursor(cursor_factory=RealDictCursor)
+    tag = uuid.uuid4().hex[:8]
+    jobs = [
+        _posting(f"Game Engineer {tag}", "Modern C++ and graphics.", location="Austin, TX"),
+        _posting(f"Firmware Engineer {tag}", "Embedded C on microcontrollers.", location="Austin, TX"),
+        _posting(f"Store Manager {tag}", "Run a retail team.", location="Lisbon, Portugal"),
+    ]
+    titles = [job["title"] for job in jobs]
+
+    create_job_stage(cur)
+    stage_jobs(cur, jobs)
+    _, touched_ids = merge_staged_jobs(cur)
+    refresh_job_features(cur, touched_ids)
+
+    # "c++" is not the bare token c the tsvector holds for "Embedded C"
+    assert _candidates(cur, ["c++"], {}, titles) == {f"Game Engineer {tag}"}
+
+    # a posting that only matches the preferred location is still a candidate
+    assert _candidates(cur, ["c++"], {"location": "Lisbon, Portugal"}, titles) == {
+        f"Game Engineer {tag}",
+        f"Store Manager {tag}",
+    }
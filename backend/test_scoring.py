@@ -0,0 +1,88 @@
+import random
+
+import numpy as np
+
+from graph.scoring import JobMatrix, compute_composite_score, round2, score_batch
+from graph.skills import extract_skills, get_skill_matcher
+from mock.mock_data import MOCK_JOBS, MOCK_PROFILE
+
+
+LOCATIONS = ["", "remote", "new york", "new york, ny", "remote - us", "boston", "york", "san francisco"]
+CATEGORIES = ["", "software development", "software engineer", "data", "engineer", "qa"]
+
+
+def _per_job(jobs, resume_skills, prefs, sims):
+    scored = []
+    for job, cos_sim in zip(jobs, sims):
+        score, rationale = compute_composite_score(
+            "", "", resume_skills, set(job["skills"]), prefs,
+            {"location": job["location_norm"], "category": job["category_norm"]},
+            cos_sim=float(cos_sim),
+        )
+        if score > 0:
+            scored.append({"job_postings_id": job["id"], "score": score, "rationale": rationale})
+    return scored
+
+
+def _random_case(rng: random.Random, n_jobs: int):
+    vocab = get_skill_matcher().vocabulary
+    jobs = [{
+        "id": f"job-{i}",
+        "skills": rng.sample(vocab, rng.randint(0, 12)),
+        "location_norm": rng.choice(LOCATIONS),
+        "category_norm": rng.choice(CATEGORIES),
+    } for i in range(n_jobs)]
+
+    resume_skills = set(rng.sample(vocab, rng.randint(0, 25)))
+    prefs = {
+        "location": rng.choice(["", None, "New York", "Remote", "Boston, MA"]),
+        "remote": rng.choice([True, False, None]),
+        "job_type": rng.choice(["", None, "Software Engineer", "Data", "qa"]),
+    }
+    # mix of arbitrary floats and values that land exactly on rounding ties
+    sims = [rng.choice([rng.random(), rng.randint(0, 400) / 400, 0.0]) for _ in range(n_jobs)]
+    return jobs, resume_skills, prefs, sims
+
+
+def test_batch_matches_per_job_on_mock_data():
+    resume_skills = extract_skills(MOCK_PROFILE["resume_text"])
+    jobs = [{
+        "id": j["id"],
+        "skills": sorted(extract_skills(f"{j['title']} {j['description']}")),
+        "location_norm": j["location"].lower(),
+        "category_norm": "software development",
+    } for j in MOCK_JOBS]
+    sims = np.linspace(0, 1, len(jobs))
+
+    expected = _per_job(jobs, resume_skills, MOCK_PROFILE["preferences"], sims)
+    actual = score_batch(JobMatrix(jobs, get_skill_matcher().vocabulary), resume_skills, MOCK_PROFILE["preferences"], sims)
+
+    assert actual == expected
+
+
+def test_batch_matches_per_job_on_random_cases():
+    rng = random.Random(1234)
+    for _ in range(200):
+        jobs, resume_skills, prefs, sims = _random_case(rng, rng.randint(0, 60))
+        expected = _per_job(jobs, resume_skills, prefs, sims)
+        actual = score_batch(JobMatrix(jobs, get_skill_matcher().vocabulary), resume_skills, prefs, sims)
+        assert actual == expected
+
+
+def test_round2_matches_python_round():
+    rng = random.Random(42)
+    values = [rng.random() * 100 for _ in range(5000)]
+    values += [k / 8 for k in range(800)] + [k / 1000 for k in range(100000)]
+    assert round2(np.array(values)).tolist() == [round(v, 2) for v in values]
+
+
+def test_cohort_matched_counts_match_per_user():
+    rng = random.Random(7)
+    vocab = get_skill_matcher().vocabulary
+    jobs, _, _, _ = _random_case(rng, 80)
+    matrix = JobMatrix(jobs, vocab)
+    skill_sets = [set(rng.sample(vocab, rng.randint(0, 25))) | {"not-in-vocab"} for _ in range(30)]
+
+    cohort = matrix.cohort_matched_counts(skill_sets)
+    for u, skills in enumerate(skill_sets):
+        assert cohort[u].tolist() == matrix.matched_counts(skills).tolist()
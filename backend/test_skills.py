@@ -0,0 +1,19 @@
+import pytest
+
+from graph.skills import extract_skills
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Node.js and React.js services", {"node.js", "react"}),
+    ("Next.js front end", {"next.js"}),
+    ("asp.net and .NET Core", {"c#"}),
+    # a bare js is still javascript, including at the end of a sentence
+    ("JS and TypeScript", {"javascript", "typescript"}),
+    ("We mostly write js.", {"javascript"}),
+])
+def test_dotted_names_are_one_token(text, expected):
+    assert extract_skills(text) == expected
+
+
+def test_multi_word_terms_overlap():
+    assert {"django", "rest"} <= extract_skills("Django REST Framework")
@@ -0,0 +1,47 @@
+import gzip
+
+import pytest
+
+import config
+from services import jobs, snapshots
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "SNAPSHOT_SINK", "ndjson")
+    return tmp_path
+
+
+def _merge(fail: bool):
+    """Stands in for ingest_job_batches: reads every batch, then commits or fails."""
+    def ingest_job_batches(batches):
+        received = sum(len(batch) for batch in batches)
+        assert snapshots.flush(5)
+        if fail:
+            raise RuntimeError("merge failed")
+        return {"received": received}
+    return ingest_job_batches
+
+
+def test_snapshot_is_kept_once_the_merge_commits(snapshot_dir, monkeypatch):
+    monkeypatch.setattr(jobs, "ingest_job_batches", _merge(fail=False))
+
+    summary = jobs.ingest_normalized_jobs([{"title": "a"}, {"title": "b"}], provider="test")
+    assert snapshots.flush(5)
+
+    assert [p.name for p in snapshot_dir.iterdir()] == [summary["snapshot"]]
+    with gzip.open(snapshot_dir / summary["snapshot"], "rt") as f:
+        assert len(f.readlines()) == 2
+
+
+def test_failed_ingest_leaves_no_snapshot(snapshot_dir, monkeypatch):
+    monkeypatch.setattr(jobs, "ingest_job_batches", _merge(fail=True))
+    discarded = snapshots.stats()["discarded"]
+
+    with pytest.raises(RuntimeError):
+        jobs.ingest_normalized_jobs([{"title": "a"}, {"title": "b"}], provider="test")
+    assert snapshots.flush(5)
+
+    assert list(snapshot_dir.iterdir()) == []
+    assert snapshots.stats()["discarded"] == discarded + 1